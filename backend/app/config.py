@@ -1,8 +1,9 @@
 """Application settings powered by pydantic-settings."""
+import os
 from functools import lru_cache
-from typing import Sequence
+from typing import Literal, Sequence
 
-from pydantic import field_validator
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -23,7 +24,67 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_access_token_expires_minutes: int = 30
     jwt_refresh_token_expires_minutes: int = 60 * 24 * 7  # 7 dias
+    # bcrypt cost factor for new hashes (existing hashes keep their own); each +1 doubles the work.
+    bcrypt_rounds: int = 12
+    # Dedicated hashing pool: 0 workers means one per CPU. Requests beyond workers + max_pending,
+    # or waiting longer than the timeout, fail fast with 503 instead of piling up.
+    password_hash_workers: int = 0
+    password_hash_max_pending: int = 32
+    password_hash_timeout_seconds: float = 10.0
+    # Per-e-mail login attempts allowed inside the window (a success resets it); 0 disables.
+    login_max_attempts: int = 5
+    login_attempt_window_seconds: int = 300
+    # Rows accepted by one bulk user import (POST /users/{alunos,tutores}/importar).
+    user_import_max_rows: int = 2000
     cors_allowed_origins: Sequence[str] | str = ("http://localhost:3000",)
+    # "incremental" applies deltas on each presença write; "recount" re-aggregates every time.
+    attendance_stats_mode: Literal["incremental", "recount"] = "incremental"
+    # SQL instrumentation: statement count and DB time per request in the Server-Timing header,
+    # a JSON log line for a sample of requests (always for those with a slow statement), and a
+    # warning for every statement slower than db_slow_query_ms.
+    db_instrumentation_enabled: bool = True
+    db_slow_query_ms: float = 200.0
+    db_query_log_sample_rate: float = 0.0
+    db_slowest_statements: int = 3
+    # GET /metrics (Prometheus text format). When metrics_token is set, scrapers must send
+    # "Authorization: Bearer <token>".
+    metrics_enabled: bool = True
+    metrics_token: str | None = None
+    # Seconds a dashboard snapshot is served from memory; 0 disables the cache.
+    dashboard_cache_ttl_seconds: int = 30
+    # Public certificate validation (GET /certificados/validar/...): in-process LRU of serialized
+    # results; unknown hashes use the shorter negative TTL. Found certificates are sent with
+    # "Cache-Control: private, max-age=<validacao_http_max_age_seconds>" so a revocation is not
+    # hidden behind shared caches; not-found answers are sent with "no-store".
+    validacao_cache_ttl_seconds: int = 300
+    validacao_cache_negative_ttl_seconds: int = 30
+    validacao_cache_maxsize: int = 10_000
+    validacao_http_max_age_seconds: int = Field(default=60, ge=0)
+    # Authenticated user snapshots reused across requests with the same token; invalidated when a
+    # committed change touches the user. 0 disables the cache (one SELECT per request).
+    auth_user_cache_ttl_seconds: int = 30
+    auth_user_cache_maxsize: int = 10_000
+    # File storage for certificate PDFs: "supabase" or "local" (disk under storage_local_root,
+    # served by the API itself at /storage; works offline in dev and CI).
+    storage_backend: str = "supabase"
+    storage_bucket: str = "ellp-files"
+    storage_local_root: str = "./storage"
+    storage_local_base_url: str = "http://localhost:8000/storage"
+    # Local copy of rendered PDFs (named by content digest) used by the streaming download endpoint.
+    pdf_cache_dir: str = "./.cache/certificados"
+    # Background certificate PDF queue (certificado_pdf_jobs table).
+    pdf_worker_enabled: bool = True
+    pdf_worker_threads: int = 2
+    pdf_worker_poll_seconds: float = 2.0
+    # Jobs claimed per poll, each batch rendered across pdf_render_processes worker processes
+    # (default: up to 4, one per CPU); 0 renders in the worker thread instead.
+    pdf_worker_batch_size: int = 8
+    pdf_render_processes: int = Field(default_factory=lambda: min(4, os.cpu_count() or 1), ge=0)
+    pdf_job_max_attempts: int = 5
+    pdf_job_backoff_seconds: float = 10.0
+    pdf_job_backoff_max_seconds: float = 900.0
+    # A job left "processando" longer than this (crashed worker) is picked up again.
+    pdf_job_timeout_seconds: float = 300.0
 
     @field_validator("cors_allowed_origins", mode="before")
     @classmethod
@@ -1,14 +1,114 @@
 """SQLAlchemy engine/session helpers."""
-from collections.abc import Generator
+import heapq
+import logging
+import time
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import make_url
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .config import get_settings
+from .utils.metrics import counter, gauge, histogram
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Statements issued while a tracked block (normally one HTTP request) runs."""
+
+    keep: int = 3
+    count: int = 0
+    total_seconds: float = 0.0
+    # Min-heap of (seconds, statement) holding the ``keep`` slowest statements.
+    _slowest: list[tuple[float, str]] = field(default_factory=list, repr=False)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if self.keep <= 0:
+            return
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, (seconds, statement))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, statement))
+
+    @property
+    def slowest(self) -> list[tuple[float, str]]:
+        return sorted(self._slowest, reverse=True)
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(keep: int = 3) -> Iterator[QueryStats]:
+    """Collect every statement run in this context (and threads started from it)."""
+    stats = QueryStats(keep=keep)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    seconds = time.perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if seconds * 1000 >= get_settings().db_slow_query_ms:
+        logger.warning("Consulta lenta (%.1f ms): %s", seconds * 1000, " ".join(statement.split())[:1000])
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(target: Engine) -> None:
+    """Time every statement on ``target`` for track_queries and the slow-query log."""
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+        event.listen(target, "handle_error", _handle_error)
+
+
+POOL_WAIT_SECONDS = histogram(
+    "db_pool_wait_seconds",
+    "Time to get a connection from the SQLAlchemy pool (waiting or opening one).",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_TIMEOUTS = counter("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout.")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long every checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
 
 
 def _engine_kwargs(database_url: str) -> dict[str, Any]:
@@ -20,8 +120,12 @@ def _engine_kwargs(database_url: str) -> dict[str, Any]:
     if url.drivername.startswith("sqlite"):
         if url.database in {None, ":memory:"}:
             kwargs["connect_args"] = {"check_same_thread": False}
+        else:
+            kwargs["poolclass"] = TimedQueuePool
         return kwargs
 
+    kwargs["poolclass"] = TimedQueuePool
+
     host = (url.host or "").lower()
     if host.endswith("supabase.co"):
         connect_args = kwargs.setdefault("connect_args", {})
@@ -33,6 +137,23 @@ def _engine_kwargs(database_url: str) -> dict[str, Any]:
 
 
 engine = create_engine(settings.database_url, **_engine_kwargs(settings.database_url))
+if settings.db_instrumentation_enabled:
+    instrument_engine(engine)
+
+
+def _pool_stat(name: str) -> Callable[[], float | None]:
+    # Only QueuePool keeps these counters; other pools (in-memory SQLite) report nothing.
+    def collect() -> float | None:
+        return getattr(engine.pool, name)() if isinstance(engine.pool, QueuePool) else None
+
+    return collect
+
+
+gauge("db_pool_size", "Connections the pool keeps open (pool_size).", _pool_stat("size"))
+gauge("db_pool_checked_out", "Connections currently lent to sessions.", _pool_stat("checkedout"))
+gauge("db_pool_overflow", "Connections open beyond pool_size (negative while below it).", _pool_stat("overflow"))
+gauge("db_pool_checked_in", "Idle connections waiting in the pool.", _pool_stat("checkedin"))
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
@@ -1,8 +1,14 @@
 """FastAPI entrypoint."""
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 
 from .config import get_settings
+from .database import SessionLocal
+from .middlewares import SERVER_TIMING_HEADER, QueryInstrumentationMiddleware, RequestMetricsMiddleware
 from .routers import (
     auditorias,
     auth,
@@ -17,11 +23,43 @@ from .routers import (
     temas,
     users,
 )
+from .services.certificado_pdf_service import PdfWorkerPool
+from .utils import (
+    LOCAL_STORAGE_ROUTE,
+    METRICS_CONTENT_TYPE,
+    NEXT_CURSOR_HEADER,
+    NEXT_CURSOR_PENDENTES_HEADER,
+    REGISTRY,
+    LocalStorageBackend,
+    get_storage_backend,
+    shutdown_password_hashing,
+)
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """Run the certificate PDF workers for as long as the API process is up; stop the hashing pool on exit."""
+    settings = get_settings()
+    pool = None
+    if settings.pdf_worker_enabled:
+        pool = PdfWorkerPool(
+            SessionLocal,
+            workers=settings.pdf_worker_threads,
+            poll_seconds=settings.pdf_worker_poll_seconds,
+            batch_size=settings.pdf_worker_batch_size,
+        )
+        pool.start()
+    try:
+        yield
+    finally:
+        if pool is not None:
+            pool.stop()
+        shutdown_password_hashing()
 
 
 def create_app() -> FastAPI:
     """Instantiate FastAPI app with every router wired."""
-    application = FastAPI(title="ELLP Management System API", version="0.2.0")
+    application = FastAPI(title="ELLP Management System API", version="0.2.0", lifespan=lifespan)
     settings = get_settings()
     application.add_middleware(
         CORSMiddleware,
@@ -29,7 +67,12 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, NEXT_CURSOR_PENDENTES_HEADER, SERVER_TIMING_HEADER],
     )
+    if settings.db_instrumentation_enabled:
+        application.add_middleware(QueryInstrumentationMiddleware)
+    if settings.metrics_enabled:
+        application.add_middleware(RequestMetricsMiddleware)
     application.include_router(auth.router)
     application.include_router(certificados.router)
     application.include_router(dashboard.router)
@@ -43,6 +86,11 @@ def create_app() -> FastAPI:
     application.include_router(temas.router)
     application.include_router(users.router)
 
+    storage = get_storage_backend()
+    if isinstance(storage, LocalStorageBackend):
+        storage.root.mkdir(parents=True, exist_ok=True)
+        application.mount(LOCAL_STORAGE_ROUTE, StaticFiles(directory=storage.root), name="storage")
+
     @application.get("/health", tags=["health"])
     def health_check() -> dict[str, str]:
         """Return basic metadata so CI smoke tests have a deterministic endpoint."""
@@ -52,6 +100,15 @@ def create_app() -> FastAPI:
             "version": application.version,
         }
 
+    if settings.metrics_enabled:
+
+        @application.get("/metrics", include_in_schema=False)
+        def metrics(authorization: str | None = Header(default=None)) -> Response:
+            """Prometheus text exposition of request, DB pool and PDF metrics for this process."""
+            if settings.metrics_token and authorization != f"Bearer {settings.metrics_token}":
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+            return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
     return application
 
 
@@ -1,4 +1,12 @@
 """Middleware/depends exports."""
 from .auth_middleware import get_current_user, require_role
+from .metrics import RequestMetricsMiddleware
+from .query_instrumentation import SERVER_TIMING_HEADER, QueryInstrumentationMiddleware
 
-__all__ = ["get_current_user", "require_role"]
+__all__ = [
+    "QueryInstrumentationMiddleware",
+    "RequestMetricsMiddleware",
+    "SERVER_TIMING_HEADER",
+    "get_current_user",
+    "require_role",
+]
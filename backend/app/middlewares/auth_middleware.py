@@ -1,36 +1,127 @@
 """Reusable authentication dependencies."""
 from __future__ import annotations
 
+import itertools
+import threading
 import uuid
 from collections.abc import Sequence
+from typing import Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, joinedload
 
 from ..config import get_settings
 from ..database import get_db
-from ..models import User, UserRole
-from ..utils import InvalidTokenError, safe_decode
+from ..models import Pessoa, User, UserRole
+from ..utils import CacheBackend, InvalidTokenError, MemoryCache, safe_decode
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Detached User snapshots (with pessoa and its profiles loaded) keyed by "sub:iat:version".
+_user_cache: CacheBackend = MemoryCache(maxsize=settings.auth_user_cache_maxsize)
+# Per-user version, dropped when a committed change touches the user; old keys simply stop matching.
+# TTL- and LRU-bounded like the snapshots. A missing entry (dropped, expired or evicted) is replaced
+# with a fresh number from one process-wide counter, so it can never match a key cached before.
+_user_versions: CacheBackend = MemoryCache(maxsize=settings.auth_user_cache_maxsize)
+_version_counter = itertools.count(1)
+_versions_lock = threading.Lock()
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+_USER_LOAD_OPTIONS = (
+    joinedload(User.pessoa).joinedload(Pessoa.aluno),
+    joinedload(User.pessoa).joinedload(Pessoa.tutor),
+    joinedload(User.pessoa).joinedload(Pessoa.professor),
+)
+
+
+def configure_user_cache(backend: CacheBackend) -> None:
+    """Swap the in-process user cache for a shared backend."""
+    global _user_cache
+    _user_cache = backend
+
+
+def invalidar_usuario(user_id: uuid.UUID | str | None = None) -> None:
+    """Forget cached snapshots of one user (or all users)."""
+    with _versions_lock:
+        if user_id is None:
+            _user_versions.clear()
+            _user_cache.clear()
+        else:
+            _user_versions.delete(str(user_id))
+
+
+def _user_version(subject: str) -> int:
+    with _versions_lock:
+        version = _user_versions.get(subject)
+        if version is None:
+            version = next(_version_counter)
+            _user_versions.set(subject, version, settings.auth_user_cache_ttl_seconds)
+        return version
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, _flush_context) -> None:
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            session.info.setdefault("_usuarios_alterados", set()).add(instance.id)
+        elif isinstance(instance, Pessoa) and instance.user_id is not None:
+            session.info.setdefault("_usuarios_alterados", set()).add(instance.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    # After commit, so a concurrent request cannot re-cache the pre-commit row.
+    for user_id in session.info.pop("_usuarios_alterados", ()):
+        invalidar_usuario(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("_usuarios_alterados", None)
+
+
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict[str, Any]:
     try:
         payload = safe_decode(token)
     except InvalidTokenError as exc:  # pragma: no cover - fastapi handles response
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido") from exc
 
-    subject = payload.get("sub")
-    if subject is None:
+    if payload.get("sub") is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+    return payload
+
+
+def _load_user(db: Session, subject: str) -> User | None:
+    stmt = select(User).options(*_USER_LOAD_OPTIONS).where(User.id == uuid.UUID(subject))
+    return db.scalars(stmt).unique().first()
+
 
-    user = db.get(User, uuid.UUID(subject))
+def _cached_user(db: Session, claims: dict[str, Any]) -> User | None:
+    subject = str(claims["sub"])
+    ttl = settings.auth_user_cache_ttl_seconds
+    if ttl <= 0:
+        return _load_user(db, subject)
+
+    key = f"{subject}:{claims.get('iat')}:{_user_version(subject)}"
+    snapshot = _user_cache.get(key)
+    if snapshot is None:
+        # Loaded in a throwaway session so the cached instance is detached and never shared with a request.
+        with Session(bind=db.get_bind()) as loader:
+            snapshot = _load_user(loader, subject)
+        if snapshot is None or not snapshot.ativo:
+            return snapshot
+        _user_cache.set(key, snapshot, ttl)
+    # Attach a copy to this request's session without a SELECT.
+    return db.merge(snapshot, load=False)
+
+
+def get_current_user(
+    claims: dict[str, Any] = Depends(get_token_claims),
+    db: Session = Depends(get_db),
+) -> User:
+    user = _cached_user(db, claims)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
     if not user.ativo:
@@ -46,6 +137,8 @@ def require_role(roles: Sequence[UserRole | str]):
     }
 
     def _role_dependency(current_user: User = Depends(get_current_user)) -> User:
+        # Checked against the (cached) record, not the token's role claim, so a role change
+        # applies to tokens issued before it.
         if current_user.role not in allowed_roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sem permissão")
         return current_user
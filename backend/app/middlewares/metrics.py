@@ -0,0 +1,61 @@
+"""ASGI middleware feeding the request metrics served at ``/metrics``."""
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils import counter, histogram
+
+HTTP_REQUESTS = counter(
+    "http_requests_total",
+    "Requests answered, by route template and status code.",
+    labelnames=("method", "route", "status"),
+)
+HTTP_ERRORS = counter(
+    "http_request_errors_total",
+    "Requests that ended in a 5xx or an unhandled exception.",
+    labelnames=("method", "route"),
+)
+HTTP_LATENCY = histogram(
+    "http_request_duration_seconds",
+    "Time from receiving the request to the end of the response body.",
+    labelnames=("method", "route"),
+)
+
+
+def _route_label(scope: Scope) -> str:
+    # The route template (e.g. /oficinas/{oficina_id}) keeps label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            method, route = scope["method"], _route_label(scope)
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status_code))
+            if status_code >= 500:
+                HTTP_ERRORS.inc(method=method, route=route)
@@ -0,0 +1,86 @@
+"""ASGI middleware reporting the SQL work done by each request."""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import get_settings
+from ..database import QueryStats, track_queries
+from ..utils import get_query_budget
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+def server_timing(stats: QueryStats, elapsed_seconds: float) -> str:
+    return (
+        f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries", '
+        f"app;dur={elapsed_seconds * 1000:.1f}"
+    )
+
+
+class QueryInstrumentationMiddleware:
+    """Count statements and DB time per request.
+
+    The totals go out in a ``Server-Timing`` header (so they show in the browser's network
+    panel) and, for a sampled share of requests plus every request with a slow statement or
+    over its route's ``query_budget``, as one JSON log line with the slowest statements.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        started = time.perf_counter()
+        status_code = 500
+        with track_queries(settings.db_slowest_statements) as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append(SERVER_TIMING_HEADER, server_timing(stats, time.perf_counter() - started))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                _log_request(scope, status_code, stats, time.perf_counter() - started)
+
+
+def _log_request(scope: Scope, status_code: int, stats: QueryStats, elapsed_seconds: float) -> None:
+    settings = get_settings()
+    slowest = stats.slowest
+    has_slow = bool(slowest) and slowest[0][0] * 1000 >= settings.db_slow_query_ms
+    budget = get_query_budget(getattr(scope.get("route"), "endpoint", None))
+    over_budget = budget is not None and stats.count > budget
+    if not (has_slow or over_budget) and random.random() >= settings.db_query_log_sample_rate:
+        return
+    payload = {
+        "event": "request_queries",
+        "method": scope["method"],
+        "path": scope["path"],
+        "status": status_code,
+        "duration_ms": round(elapsed_seconds * 1000, 1),
+        "query_count": stats.count,
+        "query_budget": budget,
+        "db_ms": round(stats.total_seconds * 1000, 1),
+        "slowest": [
+            {"ms": round(seconds * 1000, 1), "statement": " ".join(statement.split())[:500]}
+            for seconds, statement in slowest
+        ],
+    }
+    log = logger.warning if has_slow or over_budget else logger.info
+    log(json.dumps(payload, ensure_ascii=False))
@@ -8,7 +8,8 @@ from .professor import Professor
 from .tema import Tema
 from .oficina import Oficina, OficinaStatus
 from .inscricao import Inscricao, InscricaoStatus
-from .certificado import Certificado, CertificadoTipo
+from .certificado import Certificado, CertificadoPdfStatus, CertificadoTipo
+from .certificado_pdf_job import CertificadoPdfJob, PdfJobStatus
 from .presenca import Presenca
 from .auditoria import Auditoria
 
@@ -27,6 +28,9 @@ __all__ = [
     "InscricaoStatus",
     "Certificado",
     "CertificadoTipo",
+    "CertificadoPdfStatus",
+    "CertificadoPdfJob",
+    "PdfJobStatus",
     "Presenca",
     "Auditoria",
 ]
@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from .base import Base
 
@@ -20,6 +20,19 @@ class CertificadoTipo(StrEnum):
     PARTICIPACAO_TUTOR = "participacao_tutor"
 
 
+class CertificadoPdfStatus(StrEnum):
+    """Where the certificate PDF is in the background generation queue."""
+
+    PENDENTE = "pdf_pendente"
+    PRONTO = "pdf_pronto"
+    FALHOU = "pdf_falhou"
+
+
+def normalizar_codigo(codigo: str) -> str:
+    """Canonical form of a typed verification code: no spaces or dashes, upper case."""
+    return "".join(codigo.split()).replace("-", "").upper()
+
+
 class Certificado(Base):
     __tablename__ = "certificados"
     __table_args__ = (
@@ -44,6 +57,13 @@ class Certificado(Base):
 
     arquivo_pdf_url: Mapped[str | None] = mapped_column(Text())
     arquivo_pdf_nome: Mapped[str | None] = mapped_column(String(255))
+    pdf_status: Mapped[CertificadoPdfStatus] = mapped_column(
+        Enum(CertificadoPdfStatus, native_enum=False),
+        default=CertificadoPdfStatus.PENDENTE,
+        nullable=False,
+    )
+    # sha256 of the rendering inputs; also the storage name of the PDF ("<digest>.pdf").
+    pdf_digest: Mapped[str | None] = mapped_column(String(64))
 
     data_emissao: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -67,9 +87,21 @@ class Certificado(Base):
     inscricao: Mapped["Inscricao | None"] = relationship("Inscricao", back_populates="certificado")
     tutor: Mapped["Tutor | None"] = relationship("Tutor")
     oficina: Mapped["Oficina"] = relationship("Oficina")
+    pdf_job: Mapped["CertificadoPdfJob | None"] = relationship(
+        "CertificadoPdfJob",
+        back_populates="certificado",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
+
+    @validates("codigo_verificacao")
+    def _normalizar_codigo_verificacao(self, _key: str, codigo: str) -> str:
+        # Stored canonical so the unique index on the plain column serves case-insensitive lookups.
+        return normalizar_codigo(codigo)
 
 
 if TYPE_CHECKING:  # pragma: no cover
+    from .certificado_pdf_job import CertificadoPdfJob
     from .inscricao import Inscricao
     from .oficina import Oficina
     from .tutor import Tutor
@@ -0,0 +1,59 @@
+"""DB-backed queue entry for rendering and uploading a certificate PDF."""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Integer, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from .base import Base
+
+
+class PdfJobStatus(StrEnum):
+    """Lifecycle of a queued PDF job."""
+
+    PENDENTE = "pendente"
+    PROCESSANDO = "processando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
+
+
+class CertificadoPdfJob(Base):
+    __tablename__ = "certificado_pdf_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    certificado_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("certificados.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    status: Mapped[PdfJobStatus] = mapped_column(
+        Enum(PdfJobStatus, native_enum=False),
+        default=PdfJobStatus.PENDENTE,
+        nullable=False,
+        index=True,
+    )
+    tentativas: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    proxima_tentativa_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    iniciado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    ultimo_erro: Mapped[str | None] = mapped_column(Text())
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    certificado: Mapped["Certificado"] = relationship("Certificado", back_populates="pdf_job")
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .certificado import Certificado
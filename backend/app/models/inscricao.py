@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import StrEnum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Numeric, Text, UniqueConstraint, func
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Numeric, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -27,6 +27,10 @@ class Inscricao(Base):
     __tablename__ = "inscricoes"
     __table_args__ = (
         UniqueConstraint("aluno_id", "oficina_id", name="uq_inscricao_aluno_oficina"),
+        # Per-oficina scans by status (emissão em lote, totals); covers the status aggregates.
+        Index("ix_inscricoes_oficina_status", "oficina_id", "status"),
+        # An aluno's history, newest first.
+        Index("ix_inscricoes_aluno_created", "aluno_id", "created_at"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
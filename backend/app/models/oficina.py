@@ -13,6 +13,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -63,6 +64,8 @@ class Oficina(Base):
         CheckConstraint("capacidade_maxima >= 1", name="ck_oficinas_capacidade"),
         CheckConstraint("carga_horaria >= 1", name="ck_oficinas_carga_horaria"),
         CheckConstraint("data_fim >= data_inicio", name="ck_oficinas_periodo"),
+        # list_oficinas filtered by status: equality on status, then the keyset sort order.
+        Index("ix_oficinas_status_data_inicio", "status", "data_inicio", "titulo", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -115,6 +118,14 @@ class Oficina(Base):
         cascade="all, delete-orphan",
     )
 
+    @property
+    def vagas_disponiveis(self) -> int:
+        return max(self.capacidade_maxima - (self.total_inscritos or 0), 0)
+
+    @property
+    def lotada(self) -> bool:
+        return self.vagas_disponiveis == 0
+
 
 if TYPE_CHECKING:  # pragma: no cover
     from .professor import Professor
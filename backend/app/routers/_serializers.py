@@ -53,6 +53,7 @@ def serialize_certificado(certificado: Certificado) -> CertificadoRead:
         codigo_verificacao=certificado.codigo_verificacao,
         arquivo_pdf_url=certificado.arquivo_pdf_url,
         arquivo_pdf_nome=certificado.arquivo_pdf_nome,
+        pdf_status=certificado.pdf_status,
         data_emissao=certificado.data_emissao,
         carga_horaria_certificada=certificado.carga_horaria_certificada,
         percentual_presenca_certificado=_to_float(certificado.percentual_presenca_certificado),
@@ -9,6 +9,7 @@ from ..middlewares import require_role
 from ..models import Auditoria, User, UserRole
 from ..schemas import AuditoriaRead
 from ..services import auditoria_service
+from ..utils import query_budget
 
 router = APIRouter(prefix="/auditorias", tags=["auditorias"])
 AdminOnly = Depends(require_role([UserRole.ADMIN]))
@@ -32,6 +33,7 @@ def _serialize(evento: Auditoria) -> AuditoriaRead:
 
 
 @router.get("", response_model=list[AuditoriaRead])
+@query_budget(2)
 def listar_auditorias(
     entidade: str | None = Query(None, description="Filtra por entidade"),
     acao: str | None = Query(None, description="Filtra por ação"),
@@ -1,17 +1,27 @@
 """Endpoints para emissão e download de certificados (RF-008/RF-033)."""
 from __future__ import annotations
 
+from collections.abc import Iterator
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
+from ..config import get_settings
 from ..database import get_db
 from ..middlewares import require_role
-from ..models import Pessoa, Tutor, User, UserRole
-from ..schemas import CertificadoRead, CertificadoValidacaoRead
-from ..services import auditoria_service, certificado_service
+from ..models import Certificado, CertificadoTipo, PdfJobStatus, Tutor, User, UserRole
+from ..schemas import CertificadoLoteRead, CertificadoPdfStatusRead, CertificadoRead, CertificadoValidacaoRead
+from ..services import auditoria_service, certificado_pdf_service, certificado_service
+from ..utils import (
+    NEXT_CURSOR_HEADER,
+    RangeNotSatisfiableError,
+    etag_matches,
+    iter_file_range,
+    parse_byte_range,
+    query_budget,
+)
 from ._serializers import serialize_certificado, serialize_certificado_validacao
 
 router = APIRouter(prefix="/certificados", tags=["certificados"])
@@ -22,19 +32,52 @@ TutorOnly = Depends(require_role([UserRole.TUTOR]))
 
 
 def _get_tutor_profile(db: Session, current_user: User) -> Tutor:
-    stmt = select(Tutor).join(Pessoa).where(Pessoa.user_id == current_user.id)
-    tutor = db.scalars(stmt).first()
+    # get_current_user loads pessoa and its profiles eagerly, so this normally costs no query.
+    pessoa = current_user.pessoa
+    tutor = pessoa.tutor if pessoa else None
     if not tutor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil de tutor não encontrado")
     return tutor
 
 
+def _ndjson_lines(certificados: Iterator[Certificado]) -> Iterator[str]:
+    for certificado in certificados:
+        yield serialize_certificado(certificado).model_dump_json() + "\n"
+
+
 @router.get("", response_model=list[CertificadoRead])
+@query_budget(2)
 def listar_certificados(
+    response: Response,
+    tipo: CertificadoTipo | None = None,
+    oficina_id: UUID | None = None,
+    revogado: bool | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    stream: bool = False,
     db: Session = Depends(get_db),
     _: User = AdminOrProfessor,
-) -> list[CertificadoRead]:
-    certificados = certificado_service.listar(db)
+) -> list[CertificadoRead] | StreamingResponse:
+    """Paginated listing; ``stream=true`` sends every match as NDJSON instead, ignoring limit/cursor."""
+    if stream:
+        certificados = certificado_service.iterar(
+            db.get_bind(),
+            tipo=tipo,
+            oficina_id=oficina_id,
+            revogado=revogado,
+        )
+        return StreamingResponse(_ndjson_lines(certificados), media_type="application/x-ndjson")
+
+    certificados, next_cursor = certificado_service.listar(
+        db,
+        tipo=tipo,
+        oficina_id=oficina_id,
+        revogado=revogado,
+        limit=limit,
+        cursor=cursor,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [serialize_certificado(item) for item in certificados]
 
 
@@ -43,21 +86,24 @@ def listar_certificados(
     response_model=CertificadoRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(10)
 def emitir_certificado_inscricao(
     inscricao_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = TutorOrHigher,
 ) -> CertificadoRead:
     certificado = certificado_service.emitir_para_inscricao(db, inscricao_id)
+    # Serialized before the audit commit expires the instance.
+    resultado = serialize_certificado(certificado)
     auditoria_service.registrar_evento(
         db,
         entidade="certificado",
-        entidade_id=certificado.id,
+        entidade_id=resultado.id,
         acao="emitido_aluno",
         usuario=current_user,
         detalhes={"inscricao_id": str(inscricao_id)},
     )
-    return serialize_certificado(certificado)
+    return resultado
 
 
 @router.post(
@@ -65,6 +111,7 @@ def emitir_certificado_inscricao(
     response_model=CertificadoRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(12)
 def emitir_certificado_tutor(
     oficina_id: UUID,
     tutor_id: UUID,
@@ -72,18 +119,52 @@ def emitir_certificado_tutor(
     current_user: User = AdminOnly,
 ) -> CertificadoRead:
     certificado = certificado_service.emitir_para_tutor(db, oficina_id, tutor_id)
+    # Serialized before the audit commit expires the instance.
+    resultado = serialize_certificado(certificado)
     auditoria_service.registrar_evento(
         db,
         entidade="certificado",
-        entidade_id=certificado.id,
+        entidade_id=resultado.id,
         acao="emitido_tutor",
         usuario=current_user,
         detalhes={"oficina_id": str(oficina_id), "tutor_id": str(tutor_id)},
     )
-    return serialize_certificado(certificado)
+    return resultado
+
+
+@router.post(
+    "/oficinas/{oficina_id}/emitir-lote",
+    response_model=CertificadoLoteRead,
+    status_code=status.HTTP_201_CREATED,
+)
+@query_budget(11)
+def emitir_certificados_lote(
+    oficina_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = AdminOnly,
+) -> CertificadoLoteRead:
+    certificados = certificado_service.emitir_lote_oficina(db, oficina_id)
+    alunos = sum(1 for item in certificados if item.tipo == CertificadoTipo.CONCLUSAO_ALUNO)
+    # Serialized before the audit commit expires the instances.
+    resultado = CertificadoLoteRead(
+        oficina_id=oficina_id,
+        alunos_emitidos=alunos,
+        tutores_emitidos=len(certificados) - alunos,
+        certificados=[serialize_certificado(item) for item in certificados],
+    )
+    auditoria_service.registrar_evento(
+        db,
+        entidade="oficina",
+        entidade_id=oficina_id,
+        acao="certificados_emitidos_lote",
+        usuario=current_user,
+        detalhes={"alunos": resultado.alunos_emitidos, "tutores": resultado.tutores_emitidos},
+    )
+    return resultado
 
 
 @router.get("/{certificado_id}", response_model=CertificadoRead)
+@query_budget(7)
 def obter_certificado(
     certificado_id: UUID,
     db: Session = Depends(get_db),
@@ -94,6 +175,7 @@ def obter_certificado(
 
 
 @router.get("/tutores/me", response_model=list[CertificadoRead])
+@query_budget(5)
 def listar_certificados_tutor(
     db: Session = Depends(get_db),
     current_user: User = TutorOnly,
@@ -103,18 +185,22 @@ def listar_certificados_tutor(
     return [serialize_certificado(item) for item in certificados]
 
 
+def _ensure_can_access(db: Session, certificado: Certificado, current_user: User) -> None:
+    if current_user.role == UserRole.TUTOR:
+        tutor = _get_tutor_profile(db, current_user)
+        if certificado.tutor_id != tutor.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sem permissão para este certificado")
+
+
 @router.get("/{certificado_id}/download")
+@query_budget(6)
 def download_certificado(
     certificado_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = TutorOrHigher,
 ) -> dict[str, str | None]:
     certificado = certificado_service.get_certificado(db, certificado_id)
-
-    if current_user.role == UserRole.TUTOR:
-        tutor = _get_tutor_profile(db, current_user)
-        if certificado.tutor_id != tutor.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sem permissão para este certificado")
+    _ensure_can_access(db, certificado, current_user)
 
     if not certificado.arquivo_pdf_url:
         raise HTTPException(
@@ -130,76 +216,121 @@ def download_certificado(
     }
 
 
+@router.get(
+    "/{certificado_id}/arquivo",
+    response_class=Response,
+    responses={
+        200: {"content": {"application/pdf": {}}},
+        206: {"content": {"application/pdf": {}}},
+        304: {"description": "PDF inalterado (If-None-Match)"},
+        416: {"description": "Intervalo fora do arquivo"},
+    },
+)
+@query_budget(4)
+def baixar_arquivo_certificado(
+    certificado_id: UUID,
+    range_header: str | None = Header(None, alias="Range", include_in_schema=False),
+    if_none_match: str | None = Header(None, include_in_schema=False),
+    if_range: str | None = Header(None, include_in_schema=False),
+    db: Session = Depends(get_db),
+    current_user: User = TutorOrHigher,
+) -> Response:
+    """Stream the certificate PDF from the local cache; the ETag is the content digest."""
+    certificado = certificado_service.get_certificado(db, certificado_id)
+    _ensure_can_access(db, certificado, current_user)
+    if not certificado.pdf_digest:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arquivo PDF ainda não disponível")
+
+    etag = f'"{certificado.pdf_digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    caminho = certificado_pdf_service.arquivo_local(certificado)
+    tamanho = caminho.stat().st_size
+    headers["Content-Disposition"] = f'inline; filename="{certificado.arquivo_pdf_nome}"'
+    if if_range and if_range.strip() != etag:
+        range_header = None
+    try:
+        intervalo = parse_byte_range(range_header, tamanho)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{tamanho}"},
+        )
+    if intervalo is None:
+        return FileResponse(caminho, media_type="application/pdf", headers=headers)
+
+    inicio, fim = intervalo
+    headers["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+    headers["Content-Length"] = str(fim - inicio + 1)
+    return StreamingResponse(
+        iter_file_range(caminho, inicio, fim),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="application/pdf",
+        headers=headers,
+    )
+
+
+@router.get("/{certificado_id}/pdf", response_model=CertificadoPdfStatusRead)
+@query_budget(8)
+def status_pdf_certificado(
+    certificado_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = TutorOrHigher,
+) -> CertificadoPdfStatusRead:
+    """Polling endpoint for the background PDF generation."""
+    certificado = certificado_service.get_certificado(db, certificado_id)
+    _ensure_can_access(db, certificado, current_user)
+    job = certificado_pdf_service.obter_job(db, certificado.id)
+    return CertificadoPdfStatusRead(
+        certificado_id=certificado.id,
+        pdf_status=certificado.pdf_status,
+        job_status=job.status,
+        tentativas=job.tentativas,
+        proxima_tentativa_em=job.proxima_tentativa_em if job.status == PdfJobStatus.PENDENTE else None,
+        ultimo_erro=job.ultimo_erro,
+        arquivo_pdf_url=certificado.arquivo_pdf_url,
+    )
+
+
 @router.post("/{certificado_id}/regenerar", response_model=CertificadoRead)
+@query_budget(14)
 def regenerar_pdf_certificado(
     certificado_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = AdminOrProfessor,
 ) -> CertificadoRead:
-    """Regenera o PDF de um certificado existente."""
-    from ..utils import (
-        formatar_cpf,
-        formatar_periodo,
-        gerar_certificado_aluno,
-        gerar_certificado_tutor,
-        upload_pdf_certificado,
+    """Reenfileira a geração do PDF de um certificado existente."""
+    certificado, reenfileirado = certificado_service.regenerar_pdf(db, certificado_id)
+    resultado = serialize_certificado(certificado)
+    auditoria_service.registrar_evento(
+        db,
+        entidade="certificado",
+        entidade_id=certificado.id,
+        acao="pdf_regenerado",
+        usuario=current_user,
+        detalhes={"reenfileirado": reenfileirado},
     )
-    
-    certificado = certificado_service.get_certificado(db, certificado_id)
-    
-    try:
-        if certificado.tipo.value == "conclusao_aluno":
-            inscricao = certificado.inscricao
-            aluno = inscricao.aluno
-            oficina = certificado.oficina
-            
-            pdf_bytes = gerar_certificado_aluno(
-                nome_aluno=aluno.pessoa.nome_completo,
-                cpf_aluno=formatar_cpf(aluno.pessoa.cpf),
-                titulo_oficina=oficina.titulo,
-                carga_horaria=oficina.carga_horaria,
-                periodo=formatar_periodo(str(oficina.data_inicio), str(oficina.data_fim)),
-                percentual_presenca=certificado.percentual_presenca_certificado,
-                hash_validacao=certificado.hash_validacao,
-                codigo_verificacao=certificado.codigo_verificacao,
-            )
-            folder = "certificados"
-        else:
-            tutor = certificado.tutor
-            oficina = certificado.oficina
-            
-            pdf_bytes = gerar_certificado_tutor(
-                nome_tutor=tutor.pessoa.nome_completo,
-                cpf_tutor=formatar_cpf(tutor.pessoa.cpf),
-                titulo_oficina=oficina.titulo,
-                carga_horaria=oficina.carga_horaria,
-                periodo=formatar_periodo(str(oficina.data_inicio), str(oficina.data_fim)),
-                hash_validacao=certificado.hash_validacao,
-                codigo_verificacao=certificado.codigo_verificacao,
-            )
-            folder = "certificados/tutores"
-        
-        pdf_url = upload_pdf_certificado(pdf_bytes, certificado.arquivo_pdf_nome, folder=folder)
-        
-        certificado.arquivo_pdf_url = pdf_url
-        db.commit()
-        db.refresh(certificado)
-        
-        auditoria_service.registrar_evento(
-            db,
-            entidade="certificado",
-            entidade_id=certificado.id,
-            acao="pdf_regenerado",
-            usuario=current_user,
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao regenerar PDF: {str(e)}",
-        )
-    
-    return serialize_certificado(certificado)
+    return resultado
+
+
+def _validacao_cache_control() -> str:
+    # Browser cache only: a shared cache would keep serving a revoked certificate as valid.
+    return f"private, max-age={get_settings().validacao_http_max_age_seconds}"
+
+
+@router.get("/validar/codigo/{codigo}", response_model=CertificadoValidacaoRead)
+@query_budget(6)
+def validar_certificado_por_codigo(
+    codigo: str,
+    response: Response,
+    db: Session = Depends(get_db),
+) -> CertificadoValidacaoRead:
+    """Validate by the short code printed on the PDF (case, spaces and dashes are ignored)."""
+    validacao = certificado_service.validar_por_codigo(db, codigo, serialize_certificado_validacao)
+    response.headers["Cache-Control"] = _validacao_cache_control()
+    return validacao
 
 
 @router.get(
@@ -207,6 +338,12 @@ def regenerar_pdf_certificado(
     response_model=CertificadoValidacaoRead,
     include_in_schema=True,
 )
-def validar_certificado(hash_certificado: str, db: Session = Depends(get_db)) -> CertificadoValidacaoRead:
-    certificado = certificado_service.get_por_hash(db, hash_certificado)
-    return serialize_certificado_validacao(certificado)
+@query_budget(6)
+def validar_certificado(
+    hash_certificado: str,
+    response: Response,
+    db: Session = Depends(get_db),
+) -> CertificadoValidacaoRead:
+    validacao = certificado_service.validar_por_hash(db, hash_certificado, serialize_certificado_validacao)
+    response.headers["Cache-Control"] = _validacao_cache_control()
+    return validacao
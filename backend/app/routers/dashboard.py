@@ -9,12 +9,14 @@ from ..middlewares import require_role
 from ..models import User, UserRole
 from ..schemas import DashboardMetricasRead
 from ..services import dashboard_service
+from ..utils import query_budget
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 AdminOnly = Depends(require_role([UserRole.ADMIN]))
 
 
 @router.get("/metricas", response_model=DashboardMetricasRead)
+@query_budget(2)
 def dashboard_metricas(
     db: Session = Depends(get_db),
     _: User = AdminOnly,
@@ -11,6 +11,7 @@ from ..middlewares import require_role
 from ..models import User, UserRole
 from ..schemas import HistoricoParticipacaoRead
 from ..services import historico_service
+from ..utils import query_budget
 
 router = APIRouter(prefix="/historicos", tags=["historicos"])
 AdminOrAluno = Depends(require_role([UserRole.ADMIN, UserRole.ALUNO]))
@@ -31,6 +32,7 @@ def _assert_self_or_admin(current_user: User, attr_name: str, entity_id: UUID) -
 
 
 @router.get("/alunos/{aluno_id}", response_model=HistoricoParticipacaoRead)
+@query_budget(5)
 def historico_alunos(
     aluno_id: UUID,
     db: Session = Depends(get_db),
@@ -42,6 +44,7 @@ def historico_alunos(
 
 
 @router.get("/tutores/{tutor_id}", response_model=HistoricoParticipacaoRead)
+@query_budget(3)
 def historico_tutores(
     tutor_id: UUID,
     db: Session = Depends(get_db),
@@ -53,6 +56,7 @@ def historico_tutores(
 
 
 @router.get("/professores/{professor_id}", response_model=HistoricoParticipacaoRead)
+@query_budget(3)
 def historico_professores(
     professor_id: UUID,
     db: Session = Depends(get_db),
@@ -11,6 +11,7 @@ from ..middlewares import require_role
 from ..models import User, UserRole
 from ..schemas import InscricaoRead, InscricaoStatusUpdate
 from ..services import auditoria_service, inscricao_service
+from ..utils import query_budget
 from ._serializers import serialize_inscricao
 
 router = APIRouter(prefix="/inscricoes", tags=["inscricoes"])
@@ -18,6 +19,7 @@ TutorOrHigher = Depends(require_role([UserRole.ADMIN, UserRole.PROFESSOR, UserRo
 
 
 @router.patch("/{inscricao_id}/status", response_model=InscricaoRead)
+@query_budget(12)
 def atualizar_status(
     inscricao_id: UUID,
     payload: InscricaoStatusUpdate,
@@ -26,12 +28,14 @@ def atualizar_status(
 ) -> InscricaoRead:
     inscricao_service.update_status(db, inscricao_id, payload.status)
     atualizado = inscricao_service.get_inscricao(db, inscricao_id)
+    # Serialized before the audit commit expires the instance.
+    resultado = serialize_inscricao(atualizado)
     auditoria_service.registrar_evento(
         db,
         entidade="inscricao",
-        entidade_id=atualizado.id,
+        entidade_id=inscricao_id,
         acao="status_atualizado",
         usuario=current_user,
         detalhes={"status": payload.status},
     )
-    return serialize_inscricao(atualizado)
+    return resultado
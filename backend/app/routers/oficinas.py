@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -16,10 +16,12 @@ from ..schemas import (
     InscricaoRead,
     OficinaCreate,
     OficinaRead,
+    OficinaRecalculoRead,
     OficinaUpdate,
     TutorAssignmentRead,
 )
 from ..services import auditoria_service, inscricao_service, oficina_service
+from ..utils import NEXT_CURSOR_HEADER, query_budget
 from ._serializers import serialize_inscricao
 
 router = APIRouter(prefix="/oficinas", tags=["oficinas"])
@@ -30,30 +32,42 @@ AdminOnly = Depends(require_role([UserRole.ADMIN]))
 
 
 @router.get("", response_model=list[OficinaRead])
+@query_budget(3)
 def list_oficinas(
+    response: Response,
     status: OficinaStatus | None = None,
     tema_id: UUID | None = None,
     data_inicio: date | None = None,
     data_fim: date | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     _: None = TutorOrHigher,
 ) -> list[OficinaRead]:
-    return oficina_service.list_oficinas(
+    oficinas, next_cursor = oficina_service.list_oficinas(
         db,
         status_filter=status,
         tema_id=tema_id,
         start_date=data_inicio,
         end_date=data_fim,
+        limit=limit,
+        cursor=cursor,
     )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return oficinas
 
 
 @router.post("", response_model=OficinaRead, status_code=status.HTTP_201_CREATED)
+@query_budget(10)
 def create_oficina(
     payload: OficinaCreate,
     db: Session = Depends(get_db),
     current_user: User = AdminOrProfessor,
 ) -> OficinaRead:
     oficina = oficina_service.create_oficina(db, payload)
+    # Serialized before the audit commit expires the instance.
+    resultado = OficinaRead.model_validate(oficina)
     auditoria_service.registrar_evento(
         db,
         entidade="oficina",
@@ -62,10 +76,22 @@ def create_oficina(
         usuario=current_user,
         detalhes=payload.model_dump(),
     )
-    return oficina
+    return resultado
+
+
+@router.post("/estatisticas/recalcular", response_model=OficinaRecalculoRead)
+@query_budget(3)
+def recalcular_totais(
+    oficina_id: UUID | None = None,
+    db: Session = Depends(get_db),
+    _: User = AdminOnly,
+) -> OficinaRecalculoRead:
+    total = oficina_service.recalcular_totais(db, oficina_id=oficina_id)
+    return OficinaRecalculoRead(oficinas_recalculadas=total)
 
 
 @router.get("/{oficina_id}", response_model=OficinaRead)
+@query_budget(3)
 def retrieve_oficina(
     oficina_id: UUID,
     db: Session = Depends(get_db),
@@ -75,6 +101,7 @@ def retrieve_oficina(
 
 
 @router.patch("/{oficina_id}", response_model=OficinaRead)
+@query_budget(8)
 def update_oficina(
     oficina_id: UUID,
     payload: OficinaUpdate,
@@ -82,18 +109,20 @@ def update_oficina(
     current_user: User = AdminOrProfessor,
 ) -> OficinaRead:
     oficina = oficina_service.update_oficina(db, oficina_id, payload)
+    resultado = OficinaRead.model_validate(oficina)
     auditoria_service.registrar_evento(
         db,
         entidade="oficina",
-        entidade_id=oficina.id,
+        entidade_id=oficina_id,
         acao="atualizada",
         usuario=current_user,
         detalhes=payload.model_dump(exclude_unset=True),
     )
-    return oficina
+    return resultado
 
 
 @router.delete("/{oficina_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(14)
 def delete_oficina(
     oficina_id: UUID,
     db: Session = Depends(get_db),
@@ -122,6 +151,7 @@ def _serialize_tutor_assignment(tutor) -> TutorAssignmentRead:
 
 
 @router.get("/{oficina_id}/tutores", response_model=list[TutorAssignmentRead])
+@query_budget(7)
 def list_oficina_tutores(
     oficina_id: UUID,
     db: Session = Depends(get_db),
@@ -136,6 +166,7 @@ def list_oficina_tutores(
     response_model=TutorAssignmentRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(13)
 def assign_tutor(
     oficina_id: UUID,
     tutor_id: UUID,
@@ -143,6 +174,7 @@ def assign_tutor(
     current_user: User = AdminOrProfessor,
 ) -> TutorAssignmentRead:
     tutor = oficina_service.assign_tutor_to_oficina(db, oficina_id, tutor_id)
+    resultado = _serialize_tutor_assignment(tutor)
     auditoria_service.registrar_evento(
         db,
         entidade="oficina_tutor",
@@ -151,10 +183,11 @@ def assign_tutor(
         usuario=current_user,
         detalhes={"tutor_id": str(tutor_id)},
     )
-    return _serialize_tutor_assignment(tutor)
+    return resultado
 
 
 @router.delete("/{oficina_id}/tutores/{tutor_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(10)
 def remove_tutor(
     oficina_id: UUID,
     tutor_id: UUID,
@@ -174,6 +207,7 @@ def remove_tutor(
 
 
 @router.post("/{oficina_id}/professor/{professor_id}", response_model=OficinaRead)
+@query_budget(9)
 def set_responsavel_professor(
     oficina_id: UUID,
     professor_id: UUID,
@@ -181,6 +215,7 @@ def set_responsavel_professor(
     current_user: User = AdminOnly,
 ) -> OficinaRead:
     oficina = oficina_service.update_oficina_professor(db, oficina_id, professor_id)
+    resultado = OficinaRead.model_validate(oficina)
     auditoria_service.registrar_evento(
         db,
         entidade="oficina",
@@ -189,10 +224,11 @@ def set_responsavel_professor(
         usuario=current_user,
         detalhes={"professor_id": str(professor_id)},
     )
-    return oficina
+    return resultado
 
 
 @router.get("/{oficina_id}/inscricoes", response_model=list[InscricaoRead])
+@query_budget(6)
 def list_oficina_inscricoes(
     oficina_id: UUID,
     db: Session = Depends(get_db),
@@ -207,6 +243,7 @@ def list_oficina_inscricoes(
     response_model=InscricaoRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(14)
 def create_oficina_inscricao(
     oficina_id: UUID,
     payload: InscricaoCreate,
@@ -214,12 +251,13 @@ def create_oficina_inscricao(
     current_user: User = TutorOrHigher,
 ) -> InscricaoRead:
     inscricao = inscricao_service.create_inscricao(db, oficina_id, payload)
+    resultado = serialize_inscricao(inscricao)
     auditoria_service.registrar_evento(
         db,
         entidade="inscricao",
-        entidade_id=inscricao.id,
+        entidade_id=resultado.id,
         acao="criada",
         usuario=current_user,
         detalhes={"oficina_id": str(oficina_id), "aluno_id": str(payload.aluno_id)},
     )
-    return serialize_inscricao(inscricao)
+    return resultado
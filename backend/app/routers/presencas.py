@@ -10,12 +10,20 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..middlewares import require_role
 from ..models import User, UserRole
-from ..schemas import PresencaBatchCreate, PresencaRead, PresencaUpdate
+from ..schemas import (
+    PresencaBatchCreate,
+    PresencaRead,
+    PresencaRecalculoRead,
+    PresencaReconciliacaoRead,
+    PresencaUpdate,
+)
 from ..services import presenca_service
+from ..utils import query_budget
 
 router = APIRouter(prefix="/presencas", tags=["presencas"])
 
 TutorOrHigher = Depends(require_role([UserRole.ADMIN, UserRole.PROFESSOR, UserRole.TUTOR]))
+AdminOnly = Depends(require_role([UserRole.ADMIN]))
 
 
 def _serialize_presenca(entry) -> PresencaRead:
@@ -42,6 +50,7 @@ def _serialize_presenca(entry) -> PresencaRead:
 
 
 @router.get("/oficinas/{oficina_id}", response_model=list[PresencaRead])
+@query_budget(7)
 def list_presencas_oficina(
     oficina_id: UUID,
     data_aula: date | None = None,
@@ -53,6 +62,7 @@ def list_presencas_oficina(
 
 
 @router.get("/inscricoes/{inscricao_id}", response_model=list[PresencaRead])
+@query_budget(7)
 def list_presencas_inscricao(
     inscricao_id: UUID,
     db: Session = Depends(get_db),
@@ -67,6 +77,7 @@ def list_presencas_inscricao(
     response_model=list[PresencaRead],
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(14)
 def registrar_presencas(
     oficina_id: UUID,
     payload: PresencaBatchCreate,
@@ -83,7 +94,30 @@ def registrar_presencas(
     return [_serialize_presenca(item) for item in presencas]
 
 
+@router.post("/reconciliar", response_model=PresencaReconciliacaoRead)
+@query_budget(3)
+def reconciliar_estatisticas(
+    oficina_id: UUID | None = None,
+    db: Session = Depends(get_db),
+    _: User = AdminOnly,
+) -> PresencaReconciliacaoRead:
+    resultado = presenca_service.reconciliar_estatisticas(db, oficina_id=oficina_id)
+    return PresencaReconciliacaoRead(**resultado)
+
+
+@router.post("/recalcular", response_model=PresencaRecalculoRead)
+@query_budget(4)
+def recalcular_estatisticas(
+    oficina_id: UUID | None = None,
+    db: Session = Depends(get_db),
+    _: User = AdminOnly,
+) -> PresencaRecalculoRead:
+    total = presenca_service.recalcular_estatisticas(db, oficina_id=oficina_id)
+    return PresencaRecalculoRead(inscricoes_recalculadas=total)
+
+
 @router.patch("/{presenca_id}", response_model=PresencaRead)
+@query_budget(15)
 def atualizar_presenca(
     presenca_id: UUID,
     payload: PresencaUpdate,
@@ -100,6 +134,7 @@ def atualizar_presenca(
 
 
 @router.delete("/{presenca_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(8)
 def remover_presenca(
     presenca_id: UUID,
     db: Session = Depends(get_db),
@@ -11,6 +11,7 @@ from ..middlewares import require_role
 from ..models import UserRole
 from ..schemas import ProfessorDetailRead, ProfessorRead
 from ..services import professor_service
+from ..utils import query_budget
 
 router = APIRouter(prefix="/professores", tags=["professores"])
 
@@ -18,6 +19,7 @@ TutorOrHigher = Depends(require_role([UserRole.ADMIN, UserRole.PROFESSOR, UserRo
 
 
 @router.get("", response_model=list[ProfessorRead])
+@query_budget(4)
 def list_professores(
     db: Session = Depends(get_db),
     _: None = TutorOrHigher,
@@ -37,6 +39,7 @@ def list_professores(
 
 
 @router.get("/{professor_id}", response_model=ProfessorDetailRead)
+@query_budget(5)
 def retrieve_professor(
     professor_id: UUID,
     db: Session = Depends(get_db),
@@ -1,9 +1,12 @@
 """Endpoints para RF-014/RF-015 (Relatórios)."""
 from __future__ import annotations
 
+from collections.abc import Iterator
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -17,6 +20,15 @@ from ..schemas import (
     RelatorioFrequenciaResumo,
 )
 from ..services import relatorio_service
+from ..utils import (
+    CSV_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    NEXT_CURSOR_PENDENTES_HEADER,
+    XLSX_MEDIA_TYPE,
+    query_budget,
+    stream_csv,
+    stream_xlsx,
+)
 from ._serializers import serialize_certificado, serialize_inscricao
 
 router = APIRouter(prefix="/relatorios", tags=["relatorios"])
@@ -46,6 +58,7 @@ def _serialize_frequencia_entries(inscricoes: list[Inscricao]) -> list[Relatorio
 
 
 @router.get("/frequencia/{oficina_id}", response_model=RelatorioFrequenciaRead)
+@query_budget(6)
 def relatorio_frequencia(
     oficina_id: UUID,
     db: Session = Depends(get_db),
@@ -63,12 +76,69 @@ def relatorio_frequencia(
     )
 
 
+def _resumo_rows(export: relatorio_service.FrequenciaExport) -> list[tuple]:
+    return [("oficina", export.oficina_titulo), *export.resumo.items()]
+
+
+def _frequencia_rows(export: relatorio_service.FrequenciaExport) -> Iterator[tuple]:
+    yield relatorio_service.FREQUENCIA_EXPORT_COLUMNS
+    yield from export
+
+
+def _frequencia_csv(export: relatorio_service.FrequenciaExport) -> Iterator[str]:
+    yield from stream_csv(_frequencia_rows(export))
+    # The summary is only known after the last row, so it closes the file.
+    yield from stream_csv([(), *_resumo_rows(export)])
+
+
+@router.get("/frequencia/{oficina_id}/export")
+@query_budget(3)
+def exportar_frequencia(
+    oficina_id: UUID,
+    formato: Literal["csv", "xlsx"] = Query("csv", alias="format"),
+    db: Session = Depends(get_db),
+    _: User = AdminOrProfessor,
+) -> StreamingResponse:
+    export = relatorio_service.exportar_frequencia(db, oficina_id)
+    headers = {"Content-Disposition": f'attachment; filename="frequencia-{oficina_id}.{formato}"'}
+    if formato == "xlsx":
+        body = stream_xlsx(
+            [
+                ("Frequencia", lambda: _frequencia_rows(export)),
+                ("Resumo", lambda: _resumo_rows(export)),
+            ]
+        )
+        return StreamingResponse(body, media_type=XLSX_MEDIA_TYPE, headers=headers)
+    return StreamingResponse(_frequencia_csv(export), media_type=CSV_MEDIA_TYPE, headers=headers)
+
+
 @router.get("/certificados", response_model=RelatorioCertificadosRead)
+@query_budget(9)
 def relatorio_certificados(
+    response: Response,
+    detalhes: bool = True,
+    limit: int | None = Query(None, ge=1, le=500),
+    cursor: str | None = None,
+    cursor_pendentes: str | None = None,
     db: Session = Depends(get_db),
     _: User = AdminOnly,
 ) -> RelatorioCertificadosRead:
-    payload = relatorio_service.relatorio_certificados(db)
+    """``detalhes=false`` returns only the summary; ``limit`` pages both lists (complete by default).
+
+    The next pages come from the ``X-Next-Cursor`` (certificados) and
+    ``X-Next-Cursor-Pendentes`` headers, passed back as ``cursor`` / ``cursor_pendentes``.
+    """
+    payload = relatorio_service.relatorio_certificados(
+        db,
+        incluir_detalhes=detalhes,
+        limit=limit,
+        cursor=cursor,
+        cursor_pendentes=cursor_pendentes,
+    )
+    if payload["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = payload["next_cursor"]
+    if payload["next_cursor_pendentes"]:
+        response.headers[NEXT_CURSOR_PENDENTES_HEADER] = payload["next_cursor_pendentes"]
     resumo = RelatorioCertificadosResumo(**payload["resumo"])
     certificados = [serialize_certificado(item) for item in payload["certificados"]]
     pendentes = [serialize_inscricao(item) for item in payload["pendentes"]]
@@ -11,6 +11,7 @@ from ..middlewares import require_role
 from ..models import UserRole
 from ..schemas import TemaCreate, TemaRead, TemaUpdate
 from ..services import tema_service
+from ..utils import query_budget
 
 router = APIRouter(prefix="/temas", tags=["temas"])
 
@@ -18,6 +19,7 @@ AdminAndProfessor = Depends(require_role([UserRole.ADMIN, UserRole.PROFESSOR]))
 
 
 @router.get("", response_model=list[TemaRead])
+@query_budget(2)
 def list_temas(
     db: Session = Depends(get_db),
     _: None = AdminAndProfessor,
@@ -26,6 +28,7 @@ def list_temas(
 
 
 @router.post("", response_model=TemaRead, status_code=status.HTTP_201_CREATED)
+@query_budget(4)
 def create_tema(
     payload: TemaCreate,
     db: Session = Depends(get_db),
@@ -35,6 +38,7 @@ def create_tema(
 
 
 @router.get("/{tema_id}", response_model=TemaRead)
+@query_budget(2)
 def retrieve_tema(
     tema_id: UUID,
     db: Session = Depends(get_db),
@@ -44,6 +48,7 @@ def retrieve_tema(
 
 
 @router.patch("/{tema_id}", response_model=TemaRead)
+@query_budget(4)
 def update_tema(
     tema_id: UUID,
     payload: TemaUpdate,
@@ -54,6 +59,7 @@ def update_tema(
 
 
 @router.delete("/{tema_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(5)
 def delete_tema(
     tema_id: UUID,
     db: Session = Depends(get_db),
@@ -1,20 +1,69 @@
 """User CRUD endpoints for admin flows."""
-from fastapi import APIRouter, Depends
+import json
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..middlewares import require_role
 from ..models import UserRole
-from ..schemas import AdminCreate, AlunoCreate, TutorCreate, ProfessorCreate, UserRead
+from ..schemas import AdminCreate, AlunoCreate, TutorCreate, ProfessorCreate, UserImportRead, UserRead
 from ..services import user_service
+from ..utils import query_budget
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 AdminOnly = Depends(require_role([UserRole.ADMIN]))
 AdminAndProfessor = Depends(require_role([UserRole.ADMIN, UserRole.PROFESSOR]))
 
+_IMPORT_BODY: dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            "text/csv": {"schema": {"type": "string"}},
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"arquivo": {"type": "string", "format": "binary"}},
+                    "required": ["arquivo"],
+                }
+            },
+        },
+    }
+}
+
+
+async def _ler_importacao(request: Request) -> list[tuple[int, dict[str, Any]]]:
+    """Accept a JSON list, a raw CSV body or a CSV uploaded as the ``arquivo`` form field."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        arquivo = form.get("arquivo")
+        if arquivo is None or isinstance(arquivo, str):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Envie o CSV no campo arquivo")
+        return user_service.ler_importacao_csv(await arquivo.read())
+    if content_type == "text/csv":
+        return user_service.ler_importacao_csv(await request.body())
+    if content_type in ("", "application/json"):
+        try:
+            dados = json.loads(await request.body())
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSON inválido") from exc
+        return user_service.ler_importacao_json(dados)
+    raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Use JSON ou CSV")
+
+
+async def _importar(request: Request, db: Session, role: UserRole, dry_run: bool) -> UserImportRead:
+    linhas = await _ler_importacao(request)
+    # Hashing a whole batch takes seconds; keep it off the event loop.
+    return await run_in_threadpool(user_service.importar_usuarios, db, role, linhas, dry_run=dry_run)
+
 
 @router.post("/admins", response_model=UserRead, status_code=201)
+@query_budget(6)
 def create_admin(
     payload: AdminCreate,
     db: Session = Depends(get_db),
@@ -25,6 +74,7 @@ def create_admin(
 
 
 @router.get("/admins", response_model=list[UserRead])
+@query_budget(3)
 def list_admins(
     db: Session = Depends(get_db),
     _: None = AdminOnly,
@@ -34,6 +84,7 @@ def list_admins(
 
 
 @router.post("/alunos", response_model=UserRead, status_code=201)
+@query_budget(7)
 def create_aluno(
     payload: AlunoCreate,
     db: Session = Depends(get_db),
@@ -43,7 +94,20 @@ def create_aluno(
     return user_service.to_user_read(user)
 
 
+@router.post("/alunos/importar", response_model=UserImportRead, openapi_extra=_IMPORT_BODY)
+@query_budget(5)
+async def importar_alunos(
+    request: Request,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    _: None = AdminOnly,
+) -> UserImportRead:
+    """Bulk-create alunos from JSON or CSV; ``dry_run=true`` only validates."""
+    return await _importar(request, db, UserRole.ALUNO, dry_run)
+
+
 @router.get("/alunos", response_model=list[UserRead])
+@query_budget(3)
 def list_alunos(
     db: Session = Depends(get_db),
     _: None = AdminAndProfessor,
@@ -53,6 +117,7 @@ def list_alunos(
 
 
 @router.post("/tutores", response_model=UserRead, status_code=201)
+@query_budget(7)
 def create_tutor(
     payload: TutorCreate,
     db: Session = Depends(get_db),
@@ -62,7 +127,20 @@ def create_tutor(
     return user_service.to_user_read(user)
 
 
+@router.post("/tutores/importar", response_model=UserImportRead, openapi_extra=_IMPORT_BODY)
+@query_budget(5)
+async def importar_tutores(
+    request: Request,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    _: None = AdminOnly,
+) -> UserImportRead:
+    """Bulk-create tutores from JSON or CSV; ``dry_run=true`` only validates."""
+    return await _importar(request, db, UserRole.TUTOR, dry_run)
+
+
 @router.get("/tutores", response_model=list[UserRead])
+@query_budget(3)
 def list_tutores(
     db: Session = Depends(get_db),
     _: None = AdminAndProfessor,
@@ -72,6 +150,7 @@ def list_tutores(
 
 
 @router.post("/professores", response_model=UserRead, status_code=201)
+@query_budget(7)
 def create_professor(
     payload: ProfessorCreate,
     db: Session = Depends(get_db),
@@ -82,6 +161,7 @@ def create_professor(
 
 
 @router.get("/professores", response_model=list[UserRead])
+@query_budget(3)
 def list_professores(
     db: Session = Depends(get_db),
     _: None = AdminAndProfessor,
@@ -1,12 +1,39 @@
 """Schema exports."""
 from .auth import AuthenticatedUser, LoginRequest, TokenPair, TokenRefreshRequest
-from .user import AdminCreate, AlunoCreate, ProfessorCreate, TutorCreate, UserRead
+from .user import (
+    AdminCreate,
+    AlunoCreate,
+    ProfessorCreate,
+    TutorCreate,
+    UserImportRead,
+    UserImportResultado,
+    UserRead,
+)
 from .tema import TemaCreate, TemaRead, TemaUpdate
-from .oficina import OficinaCreate, OficinaRead, OficinaUpdate, TutorAssignmentRead, OficinaSummary
+from .oficina import (
+    OficinaCreate,
+    OficinaRead,
+    OficinaRecalculoRead,
+    OficinaUpdate,
+    OficinaSummary,
+    TutorAssignmentRead,
+)
 from .professor import ProfessorRead, ProfessorDetailRead
 from .inscricao import InscricaoCreate, InscricaoRead, InscricaoStatusUpdate
-from .presenca import PresencaBatchCreate, PresencaRead, PresencaRegistro, PresencaUpdate
-from .certificado import CertificadoRead, CertificadoValidacaoRead
+from .presenca import (
+    PresencaBatchCreate,
+    PresencaRead,
+    PresencaRecalculoRead,
+    PresencaReconciliacaoRead,
+    PresencaRegistro,
+    PresencaUpdate,
+)
+from .certificado import (
+    CertificadoLoteRead,
+    CertificadoPdfStatusRead,
+    CertificadoRead,
+    CertificadoValidacaoRead,
+)
 from .relatorio import (
     RelatorioCertificadosRead,
     RelatorioCertificadosResumo,
@@ -28,11 +55,14 @@ __all__ = [
     "ProfessorCreate",
     "TutorCreate",
     "UserRead",
+    "UserImportRead",
+    "UserImportResultado",
     "TemaCreate",
     "TemaRead",
     "TemaUpdate",
     "OficinaCreate",
     "OficinaRead",
+    "OficinaRecalculoRead",
     "OficinaUpdate",
     "OficinaSummary",
     "TutorAssignmentRead",
@@ -43,9 +73,13 @@ __all__ = [
     "InscricaoStatusUpdate",
     "PresencaBatchCreate",
     "PresencaRead",
+    "PresencaRecalculoRead",
+    "PresencaReconciliacaoRead",
     "PresencaRegistro",
     "PresencaUpdate",
     "CertificadoRead",
+    "CertificadoLoteRead",
+    "CertificadoPdfStatusRead",
     "CertificadoValidacaoRead",
     "RelatorioFrequenciaResumo",
     "RelatorioFrequenciaAluno",
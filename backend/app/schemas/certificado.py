@@ -6,7 +6,8 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
-from ..models.certificado import CertificadoTipo
+from ..models.certificado import CertificadoPdfStatus, CertificadoTipo
+from ..models.certificado_pdf_job import PdfJobStatus
 
 
 class CertificadoRead(BaseModel):
@@ -19,6 +20,7 @@ class CertificadoRead(BaseModel):
     codigo_verificacao: str
     arquivo_pdf_url: str | None
     arquivo_pdf_nome: str | None
+    pdf_status: CertificadoPdfStatus
     data_emissao: datetime
     carga_horaria_certificada: int | None
     percentual_presenca_certificado: float | None
@@ -28,6 +30,23 @@ class CertificadoRead(BaseModel):
         from_attributes = True
 
 
+class CertificadoLoteRead(BaseModel):
+    oficina_id: UUID
+    alunos_emitidos: int
+    tutores_emitidos: int
+    certificados: list[CertificadoRead]
+
+
+class CertificadoPdfStatusRead(BaseModel):
+    certificado_id: UUID
+    pdf_status: CertificadoPdfStatus
+    job_status: PdfJobStatus
+    tentativas: int
+    proxima_tentativa_em: datetime | None
+    ultimo_erro: str | None
+    arquivo_pdf_url: str | None
+
+
 class CertificadoValidacaoRead(BaseModel):
     hash_validacao: str
     codigo_verificacao: str
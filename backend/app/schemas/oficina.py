@@ -64,6 +64,10 @@ class OficinaRead(OficinaBase):
         from_attributes = True
 
 
+class OficinaRecalculoRead(BaseModel):
+    oficinas_recalculadas: int
+
+
 class TutorAssignmentRead(BaseModel):
     tutor_id: UUID
     nome: str
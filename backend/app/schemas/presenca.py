@@ -43,4 +43,13 @@ class PresencaRead(BaseModel):
     observacao_tutor: str | None
     registrado_por: UUID | None
     registrado_por_email: RelaxedEmailStr | None
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+
+class PresencaReconciliacaoRead(BaseModel):
+    inscricoes_verificadas: int
+    inscricoes_corrigidas: list[UUID]
+
+
+class PresencaRecalculoRead(BaseModel):
+    inscricoes_recalculadas: int
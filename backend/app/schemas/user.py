@@ -1,5 +1,6 @@
 """Schemas for user-facing payloads."""
 from datetime import date
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -56,3 +57,22 @@ class UserRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UserImportResultado(BaseModel):
+    """Outcome of one row of a bulk import (``linha`` is the CSV line or the 1-based JSON index)."""
+
+    linha: int
+    email: str | None = None
+    status: Literal["criado", "valido", "erro"]
+    user_id: UUID | None = None
+    erros: list[str] = Field(default_factory=list)
+
+
+class UserImportRead(BaseModel):
+    role: str
+    dry_run: bool
+    total: int
+    criados: int
+    com_erro: int
+    resultados: list[UserImportResultado]
@@ -37,7 +37,7 @@ def registrar_evento(
     )
     db.add(evento)
     db.commit()
-    db.refresh(evento)
+    # Not refreshed: callers do not read the event back, so created_at loads only on access.
     return evento
 
 
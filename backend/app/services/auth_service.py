@@ -1,6 +1,9 @@
 """Business logic for authentication flows."""
 from __future__ import annotations
 
+import math
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 
@@ -8,16 +11,71 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ..config import get_settings
 from ..models import User
 from ..schemas import AuthenticatedUser, LoginRequest, TokenPair, TokenRefreshRequest
 from ..utils import (
+    CacheBackend,
     InvalidTokenError,
+    MemoryCache,
+    PasswordHashingBusyError,
     create_access_token,
     create_refresh_token,
     safe_decode,
     verify_password,
 )
 
+settings = get_settings()
+
+# (attempts, window end as epoch seconds) per normalized e-mail; checked before any bcrypt work.
+_login_attempts: CacheBackend = MemoryCache(maxsize=100_000)
+_login_attempts_lock = threading.Lock()
+
+
+def configure_login_throttle(backend: CacheBackend) -> None:
+    """Swap the in-process login attempt store for a shared backend."""
+    global _login_attempts
+    _login_attempts = backend
+
+
+def reset_login_throttle(email: str | None = None) -> None:
+    """Forget login attempts for one e-mail (or all of them)."""
+    if email is None:
+        _login_attempts.clear()
+    else:
+        _login_attempts.delete(_throttle_key(email))
+
+
+def _throttle_key(email: str) -> str:
+    return email.strip().lower()
+
+
+def _reserve_login_attempt(email: str) -> None:
+    limit = settings.login_max_attempts
+    if limit <= 0:
+        return
+    key = _throttle_key(email)
+    now = time.time()
+    # Reserved up front (not on failure) so concurrent attempts cannot all slip past the limit.
+    with _login_attempts_lock:
+        attempts, window_end = _login_attempts.get(key) or (0, now + settings.login_attempt_window_seconds)
+        if attempts >= limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas tentativas de login, tente novamente mais tarde",
+                headers={"Retry-After": str(max(1, math.ceil(window_end - now)))},
+            )
+        _login_attempts.set(key, (attempts + 1, window_end), window_end - now)
+
+
+def _release_login_attempt(email: str) -> None:
+    # An attempt the server could not evaluate does not count against the user.
+    key = _throttle_key(email)
+    with _login_attempts_lock:
+        entry = _login_attempts.get(key)
+        if entry is not None and entry[0] > 0:
+            _login_attempts.set(key, (entry[0] - 1, entry[1]), max(entry[1] - time.time(), 0.001))
+
 
 def _get_user_by_email(db: Session, email: str) -> User | None:
     stmt = select(User).where(User.email == email)
@@ -36,9 +94,20 @@ def _build_token_pair(user: User) -> TokenPair:
 
 
 def login(db: Session, payload: LoginRequest) -> TokenPair:
+    _reserve_login_attempt(payload.email)
     user = _get_user_by_email(db, payload.email)
-    if not user or not verify_password(payload.password, user.senha_hash):
+    try:
+        valid = user is not None and verify_password(payload.password, user.senha_hash)
+    except PasswordHashingBusyError as exc:
+        _release_login_attempt(payload.email)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"},
+        ) from exc
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais inválidas")
+    reset_login_throttle(payload.email)
     if not user.ativo:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário desativado")
 
@@ -0,0 +1,395 @@
+"""Background generation of certificate PDFs through the ``certificado_pdf_jobs`` queue."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from ..config import get_settings
+from ..models import (
+    Aluno,
+    Certificado,
+    CertificadoPdfJob,
+    CertificadoPdfStatus,
+    CertificadoTipo,
+    Inscricao,
+    PdfJobStatus,
+    Tutor,
+)
+from ..utils import (
+    PDF_RENDER_SECONDS,
+    PDF_TEMPLATE_VERSION,
+    LocalStorageBackend,
+    delete_pdf_certificado,
+    download_pdf_certificado,
+    formatar_periodo,
+    gerar_certificado_aluno,
+    gerar_certificado_tutor,
+    upload_pdf_certificado,
+)
+
+logger = logging.getLogger(__name__)
+
+PDF_RELATIONS = (
+    selectinload(Certificado.inscricao).selectinload(Inscricao.aluno).selectinload(Aluno.pessoa),
+    selectinload(Certificado.tutor).selectinload(Tutor.pessoa),
+    selectinload(Certificado.oficina),
+)
+
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _render_args(certificado: Certificado) -> tuple[str, dict]:
+    """Plain, picklable arguments for ``_renderizar`` so rendering can run in another process."""
+    oficina = certificado.oficina
+    comuns = {
+        "titulo_oficina": oficina.titulo,
+        "carga_horaria": oficina.carga_horaria,
+        "periodo": formatar_periodo(str(oficina.data_inicio), str(oficina.data_fim)),
+        "hash_validacao": certificado.hash_validacao,
+        "codigo_verificacao": certificado.codigo_verificacao,
+        "data_emissao": certificado.data_emissao,
+    }
+    if certificado.tipo == CertificadoTipo.CONCLUSAO_ALUNO:
+        return "aluno", {
+            **comuns,
+            "nome_aluno": certificado.inscricao.aluno.pessoa.nome_completo,
+            "cpf_aluno": None,
+            "percentual_presenca": certificado.percentual_presenca_certificado,
+        }
+    return "tutor", {
+        **comuns,
+        "nome_tutor": certificado.tutor.pessoa.nome_completo,
+        "cpf_tutor": None,
+    }
+
+
+def _renderizar(tipo: str, kwargs: dict) -> bytes:
+    if tipo == "aluno":
+        return gerar_certificado_aluno(**kwargs)
+    return gerar_certificado_tutor(**kwargs)
+
+
+def _renderizar_cronometrado(tipo: str, kwargs: dict) -> tuple[bytes, float]:
+    # Pool processes are not scraped, so the render time travels back with the PDF.
+    inicio = time.perf_counter()
+    pdf = _renderizar(tipo, kwargs)
+    return pdf, time.perf_counter() - inicio
+
+
+def _pasta(certificado: Certificado) -> str:
+    if certificado.tipo == CertificadoTipo.CONCLUSAO_ALUNO:
+        return "certificados"
+    return "certificados/tutores"
+
+
+def calcular_digest(certificado: Certificado) -> str:
+    """sha256 of everything that ends up in the PDF: equal digests mean byte-for-byte equivalent content."""
+    tipo, kwargs = _render_args(certificado)
+    payload = json.dumps([PDF_TEMPLATE_VERSION, tipo, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _nome_arquivo(digest: str) -> str:
+    return f"{digest}.pdf"
+
+
+def pdf_atualizado(certificado: Certificado) -> bool:
+    """Whether the stored PDF already reflects the current rendering inputs."""
+    return (
+        certificado.pdf_status == CertificadoPdfStatus.PRONTO
+        and certificado.pdf_digest is not None
+        and certificado.pdf_digest == calcular_digest(certificado)
+    )
+
+
+def _cache_local() -> LocalStorageBackend:
+    return LocalStorageBackend(get_settings().pdf_cache_dir, base_url="")
+
+
+def _gravar_cache(digest: str, pdf_bytes: bytes) -> None:
+    try:
+        _cache_local().upload(pdf_bytes, _nome_arquivo(digest), "application/pdf")
+    except OSError as exc:  # the cache is an optimisation; storage stays the source of truth
+        logger.warning("Não foi possível gravar o PDF %s no cache local: %s", digest, exc)
+
+
+def arquivo_local(certificado: Certificado) -> Path:
+    """Path of the certificate's last generated PDF in the local cache, fetched from storage on a miss."""
+    if not certificado.pdf_digest:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arquivo PDF ainda não disponível")
+    nome = _nome_arquivo(certificado.pdf_digest)
+    caminho = _cache_local().resolve(nome)
+    if not caminho.is_file():
+        try:
+            conteudo = download_pdf_certificado(nome, folder=_pasta(certificado))
+        except Exception as exc:
+            logger.error("Falha ao baixar o PDF %s do armazenamento: %s", nome, exc)
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Arquivo PDF indisponível no armazenamento",
+            ) from exc
+        _cache_local().upload(conteudo, nome, "application/pdf")
+    return caminho
+
+
+def renderizar_pdf(certificado: Certificado) -> tuple[bytes, str]:
+    """Render the PDF of a certificado in the calling process; returns the bytes and the storage folder."""
+    return _renderizar(*_render_args(certificado)), _pasta(certificado)
+
+
+_render_pool: ProcessPoolExecutor | None = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> ProcessPoolExecutor | None:
+    """Shared process pool for ReportLab (CPU-bound, holds the GIL); ``None`` renders in-thread."""
+    global _render_pool
+    processos = get_settings().pdf_render_processes
+    if processos <= 0:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: forking a process that already runs worker threads can deadlock.
+            _render_pool = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool
+
+
+def encerrar_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=True, cancel_futures=True)
+            _render_pool = None
+
+
+def _renderizar_lote(certificados: list[Certificado]) -> list[bytes | Exception]:
+    """Render every certificado, fanning out to the process pool when configured; errors are returned, not raised."""
+    argumentos = [_render_args(certificado) for certificado in certificados]
+    pool = _get_render_pool()
+    if pool is None or len(argumentos) == 1:
+        resultados: list[bytes | Exception] = []
+        for tipo, kwargs in argumentos:
+            try:
+                resultados.append(_renderizar(tipo, kwargs))
+            except Exception as exc:  # reported per job
+                resultados.append(exc)
+        return resultados
+
+    futures = [pool.submit(_renderizar_cronometrado, tipo, kwargs) for tipo, kwargs in argumentos]
+    resultados = []
+    for future in futures:
+        try:
+            pdf, segundos = future.result()
+        except Exception as exc:  # reported per job
+            resultados.append(exc)
+            continue
+        PDF_RENDER_SECONDS.observe(segundos)
+        resultados.append(pdf)
+    return resultados
+
+
+def enfileirar(db: Session, certificado: Certificado) -> CertificadoPdfJob:
+    """Queue (or re-queue) the PDF of ``certificado``; committed together with the caller's transaction."""
+    job = certificado.pdf_job
+    if job is None:
+        job = CertificadoPdfJob(certificado=certificado)
+    job.status = PdfJobStatus.PENDENTE
+    job.tentativas = 0
+    job.proxima_tentativa_em = _agora()
+    job.iniciado_em = None
+    job.ultimo_erro = None
+    certificado.pdf_status = CertificadoPdfStatus.PENDENTE
+    db.add(job)
+    return job
+
+
+def obter_job(db: Session, certificado_id: UUID) -> CertificadoPdfJob:
+    job = db.scalars(select(CertificadoPdfJob).where(CertificadoPdfJob.certificado_id == certificado_id)).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Geração de PDF não encontrada")
+    return job
+
+
+def reservar_lote(db: Session, limite: int = 1) -> list[UUID]:
+    """Claim up to ``limite`` due jobs (or ones abandoned by a crashed worker) and mark them ``processando``.
+
+    ``FOR UPDATE SKIP LOCKED`` keeps Postgres workers off each other's rows;
+    the UPDATE re-checks the same condition, which is the guard on
+    databases without row locks.
+    """
+    settings = get_settings()
+    agora = _agora()
+    abandonado_em = agora - timedelta(seconds=settings.pdf_job_timeout_seconds)
+    disponivel = or_(
+        and_(
+            CertificadoPdfJob.status == PdfJobStatus.PENDENTE,
+            CertificadoPdfJob.proxima_tentativa_em <= agora,
+        ),
+        and_(
+            CertificadoPdfJob.status == PdfJobStatus.PROCESSANDO,
+            CertificadoPdfJob.iniciado_em < abandonado_em,
+        ),
+    )
+    candidatos = db.scalars(
+        select(CertificadoPdfJob.id)
+        .where(disponivel)
+        .order_by(CertificadoPdfJob.proxima_tentativa_em.asc())
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not candidatos:
+        db.rollback()
+        return []
+
+    reservados = db.scalars(
+        update(CertificadoPdfJob)
+        .where(CertificadoPdfJob.id.in_(candidatos), disponivel)
+        .values(status=PdfJobStatus.PROCESSANDO, iniciado_em=agora)
+        .returning(CertificadoPdfJob.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return list(reservados)
+
+
+def _backoff(tentativas: int) -> timedelta:
+    settings = get_settings()
+    segundos = settings.pdf_job_backoff_seconds * 2 ** max(tentativas - 1, 0)
+    return timedelta(seconds=min(segundos, settings.pdf_job_backoff_max_seconds))
+
+
+def _concluir(job: CertificadoPdfJob, certificado: Certificado) -> None:
+    job.status = PdfJobStatus.CONCLUIDO
+    job.ultimo_erro = None
+    certificado.pdf_status = CertificadoPdfStatus.PRONTO
+
+
+def _registrar_resultado(
+    job: CertificadoPdfJob,
+    certificado: Certificado,
+    digest: str,
+    resultado: bytes | Exception,
+) -> None:
+    job.tentativas += 1
+    job.iniciado_em = None
+    try:
+        if isinstance(resultado, Exception):
+            raise resultado
+        certificado.arquivo_pdf_url = upload_pdf_certificado(
+            resultado, _nome_arquivo(digest), folder=_pasta(certificado)
+        )
+    except Exception as exc:  # any render/storage error is retried
+        logger.warning("Falha ao gerar PDF do certificado %s (tentativa %s): %s", certificado.id, job.tentativas, exc)
+        job.ultimo_erro = str(exc)[:2000]
+        if job.tentativas >= get_settings().pdf_job_max_attempts:
+            job.status = PdfJobStatus.FALHOU
+            certificado.pdf_status = CertificadoPdfStatus.FALHOU
+        else:
+            job.status = PdfJobStatus.PENDENTE
+            job.proxima_tentativa_em = _agora() + _backoff(job.tentativas)
+        return
+
+    anterior = certificado.pdf_digest
+    certificado.pdf_digest = digest
+    _gravar_cache(digest, resultado)
+    if anterior and anterior != digest:
+        # Content-addressed names are never shared between certificados (the hash is an input).
+        delete_pdf_certificado(_nome_arquivo(anterior), folder=_pasta(certificado))
+    _concluir(job, certificado)
+
+
+def processar_jobs(db: Session, job_ids: list[UUID]) -> None:
+    """Render and upload claimed jobs, scheduling retries with exponential backoff on failure."""
+    if not job_ids:
+        return
+    jobs = db.scalars(
+        select(CertificadoPdfJob)
+        .options(selectinload(CertificadoPdfJob.certificado).options(*PDF_RELATIONS))
+        .where(CertificadoPdfJob.id.in_(job_ids))
+    ).all()
+    pendentes: list[tuple[CertificadoPdfJob, str]] = []
+    for job in jobs:
+        digest = calcular_digest(job.certificado)
+        if job.certificado.pdf_digest == digest and job.certificado.arquivo_pdf_url:
+            # Same inputs as the stored file: nothing to render or upload.
+            _concluir(job, job.certificado)
+        else:
+            pendentes.append((job, digest))
+
+    resultados = _renderizar_lote([job.certificado for job, _ in pendentes])
+    for (job, digest), resultado in zip(pendentes, resultados):
+        _registrar_resultado(job, job.certificado, digest, resultado)
+    db.commit()
+
+
+def processar_pendentes(db: Session, *, limite: int = 100) -> int:
+    """Drain up to ``limite`` due jobs from the calling thread (scripts, cron, tests)."""
+    processados = 0
+    lote = max(get_settings().pdf_worker_batch_size, 1)
+    while processados < limite:
+        job_ids = reservar_lote(db, min(lote, limite - processados))
+        if not job_ids:
+            break
+        processar_jobs(db, job_ids)
+        processados += len(job_ids)
+    return processados
+
+
+class PdfWorkerPool:
+    """Threads that poll the queue, each with its own session, until ``stop`` is called."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        workers: int,
+        poll_seconds: float,
+        batch_size: int = 1,
+    ) -> None:
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.batch_size = max(batch_size, 1)
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"pdf-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+        encerrar_render_pool()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            job_ids: list[UUID] = []
+            try:
+                with self.session_factory() as db:
+                    job_ids = reservar_lote(db, self.batch_size)
+                    processar_jobs(db, job_ids)
+            except Exception:  # keep the worker alive; the jobs are reclaimed after the timeout
+                logger.exception("Erro inesperado no worker de PDFs")
+            if not job_ids:
+                self._stop.wait(self.poll_seconds)
@@ -1,26 +1,33 @@
 """Rules for issuing certificates (RF-008/RF-033)."""
 from __future__ import annotations
 
-import logging
 import secrets
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from typing import TypeVar
 from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Connection, Engine, exists, select, tuple_
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from ..config import get_settings
 from ..models import Aluno, Certificado, CertificadoTipo, Inscricao, Oficina, Tutor
+from ..models.certificado import normalizar_codigo
 from ..models.inscricao import InscricaoStatus
-from ..models.oficina import OficinaStatus
-from ..utils import (
-    formatar_cpf,
-    formatar_periodo,
-    gerar_certificado_aluno,
-    gerar_certificado_tutor,
-    upload_pdf_certificado,
-)
+from ..models.oficina import OficinaStatus, oficina_tutor_table
+from ..utils import CacheBackend, InvalidCursorError, MemoryCache, decode_cursor, encode_cursor
+from . import certificado_pdf_service, dashboard_service
 
-logger = logging.getLogger(__name__)
+STREAM_BATCH_SIZE = 500
+
+T = TypeVar("T")
+
+# Public validation results keyed by "hash:<hash>" / "codigo:<codigo>"; misses are cached too.
+_validacao_cache: CacheBackend = MemoryCache(maxsize=get_settings().validacao_cache_maxsize)
+_NAO_ENCONTRADO = object()
+# Bumped on every invalidation so a result read before a write is never stored after it.
+_validacao_generation = 0
 
 CERTIFICADO_RELATIONS = [
     selectinload(Certificado.inscricao).selectinload(Inscricao.oficina),
@@ -34,9 +41,32 @@ def _generate_hash() -> str:
     return uuid4().hex
 
 
-def _generate_code() -> str:
-    alphabet = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
-    return "".join(secrets.choice(alphabet) for _ in range(10))
+_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+_CODE_LENGTH = 10
+
+
+def _random_code() -> str:
+    return "".join(secrets.choice(_CODE_ALPHABET) for _ in range(_CODE_LENGTH))
+
+
+def _generate_codes(db: Session, quantidade: int) -> list[str]:
+    """Draw ``quantidade`` distinct codes, redrawing any already taken (one indexed IN lookup per round)."""
+    codigos: set[str] = set()
+    while len(codigos) < quantidade:
+        candidatos = set()
+        while len(codigos) + len(candidatos) < quantidade:
+            candidato = _random_code()
+            if candidato not in codigos:
+                candidatos.add(candidato)
+        usados = set(
+            db.scalars(select(Certificado.codigo_verificacao).where(Certificado.codigo_verificacao.in_(candidatos)))
+        )
+        codigos |= candidatos - usados
+    return list(codigos)
+
+
+def _generate_code(db: Session) -> str:
+    return _generate_codes(db, 1)[0]
 
 
 def _inscricao_ready(inscricao: Inscricao) -> None:
@@ -88,7 +118,7 @@ def _ensure_tutor_assigned(oficina: Oficina, tutor: Tutor) -> None:
 
 
 def emitir_para_inscricao(db: Session, inscricao_id: UUID) -> Certificado:
-    inscricao = db.get(Inscricao, inscricao_id)
+    inscricao = db.get(Inscricao, inscricao_id, options=[joinedload(Inscricao.oficina)])
     if not inscricao:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inscrição não encontrada")
 
@@ -96,44 +126,25 @@ def emitir_para_inscricao(db: Session, inscricao_id: UUID) -> Certificado:
     _ensure_not_exists(db, inscricao_id=inscricao_id, tutor_id=None)
 
     oficina: Oficina = inscricao.oficina
-    aluno: Aluno = inscricao.aluno
 
     hash_validacao = _generate_hash()
-    codigo_verificacao = _generate_code()
+    codigo_verificacao = _generate_code(db)
 
-    try:
-        pdf_bytes = gerar_certificado_aluno(
-            nome_aluno=aluno.pessoa.nome_completo,
-            cpf_aluno=formatar_cpf(aluno.pessoa.cpf),
-            titulo_oficina=oficina.titulo,
-            carga_horaria=oficina.carga_horaria,
-            periodo=formatar_periodo(str(oficina.data_inicio), str(oficina.data_fim)),
-            percentual_presenca=inscricao.percentual_presenca,
-            hash_validacao=hash_validacao,
-            codigo_verificacao=codigo_verificacao,
-        )
-
-        filename = f"aluno-{inscricao_id}.pdf"
-        pdf_url = upload_pdf_certificado(pdf_bytes, filename, folder="certificados")
-        
-    except Exception as e:
-        logger.error(f"Erro ao gerar/upload PDF: {e}")
-        filename = f"aluno-{inscricao_id}.pdf"
-        pdf_url = f"https://storage.dev/certificados/{filename}"
-    
+    # Foreign key rather than ``inscricao=``, which would lazy-load the (empty) backref.
     certificado = Certificado(
-        inscricao=inscricao,
+        inscricao_id=inscricao.id,
         oficina_id=oficina.id,
         tipo=CertificadoTipo.CONCLUSAO_ALUNO,
         hash_validacao=hash_validacao,
         codigo_verificacao=codigo_verificacao,
-        arquivo_pdf_url=pdf_url,
-        arquivo_pdf_nome=filename,
+        arquivo_pdf_nome=f"aluno-{inscricao_id}.pdf",
         carga_horaria_certificada=oficina.carga_horaria,
         percentual_presenca_certificado=inscricao.percentual_presenca,
     )
     db.add(certificado)
+    certificado_pdf_service.enfileirar(db, certificado)
     db.commit()
+    dashboard_service.invalidar_cache()
     db.refresh(certificado)
     return certificado
 
@@ -152,26 +163,7 @@ def emitir_para_tutor(db: Session, oficina_id: UUID, tutor_id: UUID) -> Certific
     _ensure_not_exists(db, inscricao_id=None, tutor_id=tutor_id, oficina_id=oficina_id)
 
     hash_validacao = _generate_hash()
-    codigo_verificacao = _generate_code()
-
-    try:
-        pdf_bytes = gerar_certificado_tutor(
-            nome_tutor=tutor.pessoa.nome_completo,
-            cpf_tutor=formatar_cpf(tutor.pessoa.cpf),
-            titulo_oficina=oficina.titulo,
-            carga_horaria=oficina.carga_horaria,
-            periodo=formatar_periodo(str(oficina.data_inicio), str(oficina.data_fim)),
-            hash_validacao=hash_validacao,
-            codigo_verificacao=codigo_verificacao,
-        )
-
-        filename = f"tutor-{tutor_id}-{oficina_id}.pdf"
-        pdf_url = upload_pdf_certificado(pdf_bytes, filename, folder="certificados/tutores")
-        
-    except Exception as e:
-        logger.error(f"Erro ao gerar/upload PDF tutor: {e}")
-        filename = f"tutor-{tutor_id}-{oficina_id}.pdf"
-        pdf_url = f"https://storage.dev/certificados/tutores/{filename}"
+    codigo_verificacao = _generate_code(db)
 
     certificado = Certificado(
         tutor_id=tutor.id,
@@ -179,19 +171,158 @@ def emitir_para_tutor(db: Session, oficina_id: UUID, tutor_id: UUID) -> Certific
         tipo=CertificadoTipo.PARTICIPACAO_TUTOR,
         hash_validacao=hash_validacao,
         codigo_verificacao=codigo_verificacao,
-        arquivo_pdf_url=pdf_url,
-        arquivo_pdf_nome=filename,
+        arquivo_pdf_nome=f"tutor-{tutor_id}-{oficina_id}.pdf",
         carga_horaria_certificada=oficina.carga_horaria,
     )
     db.add(certificado)
+    certificado_pdf_service.enfileirar(db, certificado)
     db.commit()
+    dashboard_service.invalidar_cache()
     db.refresh(certificado)
     return certificado
 
 
-def listar(db: Session) -> list[Certificado]:
-    stmt = select(Certificado).options(*CERTIFICADO_RELATIONS).order_by(Certificado.created_at.desc())
-    return db.scalars(stmt).all()
+def emitir_lote_oficina(db: Session, oficina_id: UUID) -> list[Certificado]:
+    """Issue every missing certificate of a concluded oficina in one transaction.
+
+    Eligibility is resolved with two set-wise queries (apt inscrições without
+    a certificate, assigned tutors without one) instead of the per-row checks
+    of the single-issue endpoints; PDFs are rendered by the queue workers.
+    """
+    oficina = _get_oficina_or_404(db, oficina_id)
+    if oficina.status != OficinaStatus.CONCLUIDA:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Oficina precisa estar concluída",
+        )
+
+    inscricoes = db.scalars(
+        select(Inscricao)
+        .where(
+            Inscricao.oficina_id == oficina_id,
+            Inscricao.status == InscricaoStatus.CONCLUIDO,
+            Inscricao.apto_certificado.is_(True),
+            ~Inscricao.certificado.has(),
+        )
+        .order_by(Inscricao.created_at, Inscricao.id)
+    ).all()
+    tutor_ids = db.scalars(
+        select(oficina_tutor_table.c.tutor_id)
+        .where(
+            oficina_tutor_table.c.oficina_id == oficina_id,
+            ~exists().where(
+                Certificado.tutor_id == oficina_tutor_table.c.tutor_id,
+                Certificado.oficina_id == oficina_id,
+            ),
+        )
+        .order_by(oficina_tutor_table.c.tutor_id)
+    ).all()
+
+    codigos = iter(_generate_codes(db, len(inscricoes) + len(tutor_ids)))
+    # Set the foreign key rather than ``inscricao=``: assigning the relationship lazy-loads
+    # each inscrição's (empty) ``certificado`` backref, one SELECT per row.
+    certificados = [
+        Certificado(
+            inscricao_id=inscricao.id,
+            oficina_id=oficina.id,
+            tipo=CertificadoTipo.CONCLUSAO_ALUNO,
+            hash_validacao=_generate_hash(),
+            codigo_verificacao=next(codigos),
+            arquivo_pdf_nome=f"aluno-{inscricao.id}.pdf",
+            carga_horaria_certificada=oficina.carga_horaria,
+            percentual_presenca_certificado=inscricao.percentual_presenca,
+        )
+        for inscricao in inscricoes
+    ]
+    certificados += [
+        Certificado(
+            tutor_id=tutor_id,
+            oficina_id=oficina.id,
+            tipo=CertificadoTipo.PARTICIPACAO_TUTOR,
+            hash_validacao=_generate_hash(),
+            codigo_verificacao=next(codigos),
+            arquivo_pdf_nome=f"tutor-{tutor_id}-{oficina_id}.pdf",
+            carga_horaria_certificada=oficina.carga_horaria,
+        )
+        for tutor_id in tutor_ids
+    ]
+    if not certificados:
+        return []
+
+    db.add_all(certificados)
+    for certificado in certificados:
+        certificado_pdf_service.enfileirar(db, certificado)
+    db.flush()
+    ids = [certificado.id for certificado in certificados]
+    db.commit()
+    dashboard_service.invalidar_cache()
+    # One reload instead of a refresh per expired instance.
+    emitidos = {item.id: item for item in db.scalars(select(Certificado).where(Certificado.id.in_(ids)))}
+    return [emitidos[certificado_id] for certificado_id in ids]
+
+
+def _listar_stmt(
+    *,
+    tipo: CertificadoTipo | None,
+    oficina_id: UUID | None,
+    revogado: bool | None,
+):
+    # serialize_certificado only reads columns, so the listing loads no relations.
+    stmt = select(Certificado).order_by(Certificado.created_at.desc(), Certificado.id.desc())
+    if tipo:
+        stmt = stmt.where(Certificado.tipo == tipo)
+    if oficina_id:
+        stmt = stmt.where(Certificado.oficina_id == oficina_id)
+    if revogado is not None:
+        stmt = stmt.where(Certificado.revogado.is_(revogado))
+    return stmt
+
+
+def _decode_certificado_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, certificado_id = decode_cursor(cursor, 2)
+        return datetime.fromisoformat(created_at), UUID(certificado_id)
+    except (InvalidCursorError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido") from exc
+
+
+def listar(
+    db: Session,
+    *,
+    tipo: CertificadoTipo | None = None,
+    oficina_id: UUID | None = None,
+    revogado: bool | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[Certificado], str | None]:
+    """Return the newest certificados first, one page per call, plus the next page's cursor."""
+    stmt = _listar_stmt(tipo=tipo, oficina_id=oficina_id, revogado=revogado).limit(limit + 1)
+    if cursor:
+        stmt = stmt.where(
+            tuple_(Certificado.created_at, Certificado.id) < tuple_(*_decode_certificado_cursor(cursor))
+        )
+    certificados = db.scalars(stmt).all()
+    if len(certificados) <= limit:
+        return list(certificados), None
+    page = list(certificados[:limit])
+    return page, encode_cursor(page[-1].created_at.isoformat(), page[-1].id)
+
+
+def iterar(
+    bind: Engine | Connection,
+    *,
+    tipo: CertificadoTipo | None = None,
+    oficina_id: UUID | None = None,
+    revogado: bool | None = None,
+) -> Iterator[Certificado]:
+    """Yield every matching certificado while the DB cursor advances, ``STREAM_BATCH_SIZE`` rows at a time.
+
+    Opens its own session: the request-scoped one is closed before a
+    streaming body starts being sent.
+    """
+    stmt = _listar_stmt(tipo=tipo, oficina_id=oficina_id, revogado=revogado)
+    with Session(bind=bind) as session:
+        yield from session.scalars(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
 
 
 def listar_por_tutor(db: Session, tutor_id: UUID) -> list[Certificado]:
@@ -204,6 +335,23 @@ def listar_por_tutor(db: Session, tutor_id: UUID) -> list[Certificado]:
     return db.scalars(stmt).all()
 
 
+def regenerar_pdf(db: Session, certificado_id: UUID) -> tuple[Certificado, bool]:
+    """Queue a fresh render/upload unless the stored PDF already matches the current inputs.
+
+    Returns the certificado and whether a job was queued; the current file
+    stays available until the new one is ready.
+    """
+    certificado = get_certificado(db, certificado_id)
+    invalidar_validacao(certificado)
+    if certificado_pdf_service.pdf_atualizado(certificado):
+        return certificado, False
+    certificado_pdf_service.enfileirar(db, certificado)
+    db.commit()
+    # Reload the columns with a plain SELECT: refreshing (or touching the expired instance)
+    # would re-run every selectin loader get_certificado attached to it.
+    return db.scalars(select(Certificado).where(Certificado.id == certificado_id)).one(), True
+
+
 def get_certificado(db: Session, certificado_id: UUID) -> Certificado:
     stmt = select(Certificado).options(*CERTIFICADO_RELATIONS).where(Certificado.id == certificado_id)
     certificado = db.scalars(stmt).first()
@@ -212,6 +360,22 @@ def get_certificado(db: Session, certificado_id: UUID) -> Certificado:
     return certificado
 
 
+def get_por_codigo(db: Session, codigo: str) -> Certificado:
+    codigo = normalizar_codigo(codigo)
+    # Codes are generated with a fixed length; anything else cannot match, so skip the query.
+    if len(codigo) != _CODE_LENGTH:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Certificado não encontrado")
+    stmt = (
+        select(Certificado)
+        .options(*CERTIFICADO_RELATIONS)
+        .where(Certificado.codigo_verificacao == codigo)
+    )
+    certificado = db.scalars(stmt).first()
+    if not certificado:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Certificado não encontrado")
+    return certificado
+
+
 def get_por_hash(db: Session, hash_validacao: str) -> Certificado:
     stmt = (
         select(Certificado)
@@ -222,3 +386,65 @@ def get_por_hash(db: Session, hash_validacao: str) -> Certificado:
     if not certificado:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Certificado não encontrado")
     return certificado
+
+
+def configure_validacao_cache(backend: CacheBackend) -> None:
+    """Swap the in-process validation cache for a shared backend."""
+    global _validacao_cache
+    _validacao_cache = backend
+
+
+def invalidar_validacao(certificado: Certificado | None = None) -> None:
+    """Drop the cached validation of one certificado (or all); call on revocation and regeneration."""
+    global _validacao_generation
+    _validacao_generation += 1
+    if certificado is None:
+        _validacao_cache.clear()
+    else:
+        _validacao_cache.delete(f"hash:{certificado.hash_validacao}")
+        _validacao_cache.delete(f"codigo:{certificado.codigo_verificacao}")
+
+
+def _validar(
+    chave: str,
+    buscar: Callable[[], Certificado],
+    serializar: Callable[[Certificado], T],
+) -> T:
+    settings = get_settings()
+    cached = _validacao_cache.get(chave)
+    if cached is None:
+        generation = _validacao_generation
+        try:
+            cached = serializar(buscar())
+            ttl = settings.validacao_cache_ttl_seconds
+        except HTTPException as exc:
+            if exc.status_code != status.HTTP_404_NOT_FOUND:
+                raise
+            cached = _NAO_ENCONTRADO
+            ttl = settings.validacao_cache_negative_ttl_seconds
+        if ttl > 0 and generation == _validacao_generation:
+            _validacao_cache.set(chave, cached, ttl)
+
+    if cached is _NAO_ENCONTRADO:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Certificado não encontrado",
+            headers={"Cache-Control": "no-store"},
+        )
+    return cached
+
+
+def validar_por_hash(db: Session, hash_validacao: str, serializar: Callable[[Certificado], T]) -> T:
+    """Public validation lookup, served from a bounded TTL cache.
+
+    ``serializar`` turns the certificado into the cached response model.
+    Unknown hashes are cached for the shorter negative TTL so scraping bursts
+    of bad links do not reach the database either.
+    """
+    return _validar(f"hash:{hash_validacao}", lambda: get_por_hash(db, hash_validacao), serializar)
+
+
+def validar_por_codigo(db: Session, codigo: str, serializar: Callable[[Certificado], T]) -> T:
+    """Same as ``validar_por_hash`` for the short code printed on the PDF, typed in any case."""
+    codigo = normalizar_codigo(codigo)
+    return _validar(f"codigo:{codigo}", lambda: get_por_codigo(db, codigo), serializar)
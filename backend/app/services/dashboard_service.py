@@ -1,60 +1,105 @@
 """Dashboard metrics service for RF-022."""
 from __future__ import annotations
 
+import threading
 from datetime import datetime, timezone
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select, true
 from sqlalchemy.orm import Session
 
+from ..config import get_settings
 from ..models import Certificado, Inscricao, Oficina
 from ..models.inscricao import InscricaoStatus
 from ..models.oficina import OficinaStatus
+from ..utils import CacheBackend, MemoryCache
 
 _ACTIVE_STATUSES = (OficinaStatus.INSCRICOES_ABERTAS, OficinaStatus.EM_ANDAMENTO)
+_CACHE_KEY = "dashboard:metricas_gerais"
 
+_cache: CacheBackend = MemoryCache()
+_refresh_lock = threading.Lock()
+# Bumped on every invalidation so a snapshot computed before a write is never stored after it.
+_generation = 0
+# Guards the bump-and-delete against the compare-and-store; unlike _refresh_lock it is never
+# held during the metrics query, so writers do not wait on a refresh.
+_generation_lock = threading.Lock()
 
-def _scalar_count(stmt, db: Session) -> int:
-    value = db.scalar(stmt)
-    return int(value or 0)
 
+def configure_cache(backend: CacheBackend) -> None:
+    """Swap the in-process cache for a shared backend."""
+    global _cache
+    _cache = backend
 
-def metricas_gerais(db: Session) -> dict:
-    oficinas_ativas = _scalar_count(
-        select(func.count()).select_from(Oficina).where(Oficina.status.in_(_ACTIVE_STATUSES)),
-        db,
-    )
-    oficinas_planejadas = _scalar_count(
-        select(func.count()).select_from(Oficina).where(Oficina.status == OficinaStatus.PLANEJADA),
-        db,
-    )
-    oficinas_concluidas = _scalar_count(
-        select(func.count()).select_from(Oficina).where(Oficina.status == OficinaStatus.CONCLUIDA),
-        db,
-    )
 
-    total_inscricoes = _scalar_count(select(func.count()).select_from(Inscricao), db)
-    inscritos_concluidos = _scalar_count(
-        select(func.count()).select_from(Inscricao).where(Inscricao.status == InscricaoStatus.CONCLUIDO),
-        db,
-    )
+def invalidar_cache() -> None:
+    """Drop the cached snapshot; called by every service that changes the metrics."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        _cache.delete(_CACHE_KEY)
 
-    certificados_emitidos = _scalar_count(
-        select(func.count()).select_from(Certificado).where(Certificado.revogado.is_(False)),
-        db,
-    )
 
-    presenca_media = db.scalar(
-        select(func.avg(Inscricao.percentual_presenca)).where(Inscricao.percentual_presenca.is_not(None))
+def _count_where(condition):
+    # count() skips NULLs, so this is the portable form of count(*) FILTER (WHERE ...).
+    return func.count(case((condition, 1)))
+
+
+def _metricas_stmt():
+    oficinas = select(
+        _count_where(Oficina.status.in_(_ACTIVE_STATUSES)).label("oficinas_ativas"),
+        _count_where(Oficina.status == OficinaStatus.PLANEJADA).label("oficinas_planejadas"),
+        _count_where(Oficina.status == OficinaStatus.CONCLUIDA).label("oficinas_concluidas"),
+    ).subquery("oficinas_stats")
+    inscricoes = select(
+        func.count().label("total_inscricoes"),
+        _count_where(Inscricao.status == InscricaoStatus.CONCLUIDO).label("inscritos_concluidos"),
+        func.avg(Inscricao.percentual_presenca).label("presenca_media_geral"),
+    ).subquery("inscricoes_stats")
+    certificados = select(
+        _count_where(Certificado.revogado.is_(False)).label("certificados_emitidos"),
+    ).subquery("certificados_stats")
+
+    # Each subquery yields exactly one row, so the cross join is one row too.
+    return select(oficinas, inscricoes, certificados).select_from(
+        oficinas.join(inscricoes, true()).join(certificados, true())
     )
-    presenca_media = float(presenca_media or 0)
+
+
+def _calcular_metricas(db: Session) -> dict:
+    row = db.execute(_metricas_stmt()).mappings().one()
 
     return {
-        "oficinas_ativas": oficinas_ativas,
-        "oficinas_planejadas": oficinas_planejadas,
-        "oficinas_concluidas": oficinas_concluidas,
-        "total_inscricoes": total_inscricoes,
-        "inscritos_concluidos": inscritos_concluidos,
-        "certificados_emitidos": certificados_emitidos,
-        "presenca_media_geral": round(presenca_media, 2),
+        "oficinas_ativas": int(row["oficinas_ativas"] or 0),
+        "oficinas_planejadas": int(row["oficinas_planejadas"] or 0),
+        "oficinas_concluidas": int(row["oficinas_concluidas"] or 0),
+        "total_inscricoes": int(row["total_inscricoes"] or 0),
+        "inscritos_concluidos": int(row["inscritos_concluidos"] or 0),
+        "certificados_emitidos": int(row["certificados_emitidos"] or 0),
+        "presenca_media_geral": round(float(row["presenca_media_geral"] or 0), 2),
         "ultima_atualizacao": datetime.now(timezone.utc),
     }
+
+
+def metricas_gerais(db: Session) -> dict:
+    """Return the cached snapshot, recomputing it once per TTL across concurrent callers.
+
+    ``ultima_atualizacao`` is the moment the snapshot was computed, not the request time.
+    """
+    ttl = get_settings().dashboard_cache_ttl_seconds
+    if ttl <= 0:
+        return _calcular_metricas(db)
+
+    cached = _cache.get(_CACHE_KEY)
+    if cached is not None:
+        return dict(cached)
+
+    with _refresh_lock:
+        cached = _cache.get(_CACHE_KEY)
+        if cached is not None:
+            return dict(cached)
+        generation = _generation
+        metricas = _calcular_metricas(db)
+        with _generation_lock:
+            if generation == _generation:
+                _cache.set(_CACHE_KEY, metricas, ttl)
+    return dict(metricas)
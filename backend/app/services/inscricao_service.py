@@ -12,6 +12,7 @@ from ..models import Aluno, Inscricao, Oficina, Pessoa
 from ..models.inscricao import InscricaoStatus
 from ..models.oficina import OficinaStatus
 from ..schemas import InscricaoCreate
+from . import dashboard_service, oficina_service
 
 INSCRICAO_WITH_USER = (
     selectinload(Inscricao.aluno)
@@ -112,7 +113,9 @@ def create_inscricao(db: Session, oficina_id: UUID, payload: InscricaoCreate) ->
         observacoes=payload.observacoes,
     )
     db.add(inscricao)
+    oficina_service.ajustar_totais(db, [(oficina.id, None, inscricao.status)])
     db.commit()
+    dashboard_service.invalidar_cache()
     db.refresh(inscricao)
     return inscricao
 
@@ -144,6 +147,7 @@ def update_status(db: Session, inscricao_id: UUID, novo_status: InscricaoStatus)
             detail="Presença mínima de 75% não atingida",
         )
 
+    oficina_service.ajustar_totais(db, [(inscricao.oficina_id, inscricao.status, novo_status)])
     inscricao.status = novo_status
     if novo_status == InscricaoStatus.CONCLUIDO:
         if not inscricao.data_conclusao:
@@ -156,5 +160,6 @@ def update_status(db: Session, inscricao_id: UUID, novo_status: InscricaoStatus)
 
     db.add(inscricao)
     db.commit()
+    dashboard_service.invalidar_cache()
     db.refresh(inscricao)
     return inscricao
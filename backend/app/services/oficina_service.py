@@ -1,17 +1,21 @@
 """Business logic for Oficina management (RF-003/RF-004)."""
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import date
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import case, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, case, func, select, tuple_, update
+from sqlalchemy.orm import Session, selectinload
 
 from ..models import Inscricao, Oficina, Professor, Tema, Tutor
 from ..models.inscricao import InscricaoStatus
 from ..models.oficina import OficinaStatus
+from ..models.tema import oficina_tema_table
 from ..schemas import OficinaCreate, OficinaUpdate
+from ..utils import InvalidCursorError, decode_cursor, encode_cursor
+from . import dashboard_service
 
 
 ACTIVE_INSCRICAO_STATUSES = (
@@ -21,35 +25,74 @@ ACTIVE_INSCRICAO_STATUSES = (
 )
 
 
-def _attach_enrollment_stats(db: Session, oficinas: list[Oficina]) -> None:
-    if not oficinas:
-        return
+def _status_weights(status_value: InscricaoStatus | None) -> tuple[int, int]:
+    return (
+        int(status_value in ACTIVE_INSCRICAO_STATUSES),
+        int(status_value == InscricaoStatus.CONCLUIDO),
+    )
+
 
-    oficina_ids = [oficina.id for oficina in oficinas]
-    active_case = case(
-        (Inscricao.status.in_(ACTIVE_INSCRICAO_STATUSES), 1),
-        else_=0,
+_AJUSTE_TOTAIS_STMT = (
+    update(Oficina.__table__)
+    .where(Oficina.__table__.c.id == bindparam("b_oficina_id"))
+    .values(
+        total_inscritos=Oficina.__table__.c.total_inscritos + bindparam("b_inscritos"),
+        total_concluintes=Oficina.__table__.c.total_concluintes + bindparam("b_concluintes"),
     )
+)
+
+
+def ajustar_totais(
+    db: Session,
+    transicoes: Iterable[tuple[UUID, InscricaoStatus | None, InscricaoStatus]],
+) -> None:
+    """Shift ``total_inscritos``/``total_concluintes`` for ``(oficina_id, anterior, atual)`` transitions.
+
+    ``anterior=None`` is a new inscrição. The increments run in SQL, so
+    concurrent writers never lose an update; the caller owns the commit.
+    """
+    deltas: dict[UUID, list[int]] = {}
+    for oficina_id, anterior, atual in transicoes:
+        ativo_antes, concluido_antes = _status_weights(anterior)
+        ativo_depois, concluido_depois = _status_weights(atual)
+        delta = deltas.setdefault(oficina_id, [0, 0])
+        delta[0] += ativo_depois - ativo_antes
+        delta[1] += concluido_depois - concluido_antes
+
+    params = [
+        {"b_oficina_id": oficina_id, "b_inscritos": inscritos, "b_concluintes": concluintes}
+        for oficina_id, (inscritos, concluintes) in deltas.items()
+        if inscritos or concluintes
+    ]
+    if params:
+        db.execute(_AJUSTE_TOTAIS_STMT, params)
+
+
+def recalcular_totais(db: Session, *, oficina_id: UUID | None = None) -> int:
+    """Rebuild the stored counters from ``inscricoes`` (backfill or drift repair)."""
+    active_case = case((Inscricao.status.in_(ACTIVE_INSCRICAO_STATUSES), 1), else_=0)
     concluded_case = case((Inscricao.status == InscricaoStatus.CONCLUIDO, 1), else_=0)
     stmt = (
-        select(Inscricao.oficina_id, func.sum(active_case), func.sum(concluded_case))
-        .where(Inscricao.oficina_id.in_(oficina_ids))
-        .group_by(Inscricao.oficina_id)
+        select(
+            Oficina.id,
+            func.coalesce(func.sum(active_case), 0),
+            func.coalesce(func.sum(concluded_case), 0),
+        )
+        .outerjoin(Inscricao, Inscricao.oficina_id == Oficina.id)
+        .group_by(Oficina.id)
     )
-    counts: dict[UUID, tuple[int, int]] = {}
-    for oficina_id, total_ativos, total_concluidos in db.execute(stmt):
-        ativos = int(total_ativos or 0)
-        concluidos = int(total_concluidos or 0)
-        counts[oficina_id] = (ativos, concluidos)
-
-    for oficina in oficinas:
-        ativos, concluidos = counts.get(oficina.id, (0, 0))
-        total = ativos
-        vagas = max(oficina.capacidade_maxima - total, 0)
-        oficina.total_inscritos = total
-        oficina.total_concluintes = concluidos
-        setattr(oficina, "vagas_disponiveis", vagas)
-        setattr(oficina, "lotada", vagas == 0)
+    if oficina_id:
+        get_oficina(db, oficina_id)
+        stmt = stmt.where(Oficina.id == oficina_id)
+
+    values = [
+        {"id": row_id, "total_inscritos": int(ativos), "total_concluintes": int(concluidos)}
+        for row_id, ativos, concluidos in db.execute(stmt)
+    ]
+    if values:
+        db.execute(update(Oficina), values)
+    db.commit()
+    return len(values)
 
 
 def _get_professor_or_404(db: Session, professor_id: UUID) -> Professor:
@@ -87,6 +130,18 @@ def _calculate_tutor_load(tutor: Tutor, *, exclude_oficina_id: UUID | None = Non
     return load
 
 
+def _oficina_sort_key(oficina: Oficina) -> tuple:
+    return (oficina.data_inicio, oficina.titulo, oficina.id)
+
+
+def _decode_oficina_cursor(cursor: str) -> tuple[date, str, UUID]:
+    try:
+        data_inicio, titulo, oficina_id = decode_cursor(cursor, 3)
+        return date.fromisoformat(data_inicio), str(titulo), UUID(oficina_id)
+    except (InvalidCursorError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido") from exc
+
+
 def list_oficinas(
     db: Session,
     *,
@@ -94,8 +149,12 @@ def list_oficinas(
     tema_id: UUID | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
-) -> list[Oficina]:
-    stmt = select(Oficina).order_by(Oficina.data_inicio.asc(), Oficina.titulo.asc())
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[Oficina], str | None]:
+    """Return one page ordered by ``(data_inicio, titulo, id)`` and the cursor of the next one."""
+    sort_key = (Oficina.data_inicio, Oficina.titulo, Oficina.id)
+    stmt = select(Oficina).options(selectinload(Oficina.temas)).order_by(*sort_key).limit(limit + 1)
     if status_filter:
         stmt = stmt.where(Oficina.status == status_filter)
     if start_date:
@@ -103,17 +162,28 @@ def list_oficinas(
     if end_date:
         stmt = stmt.where(Oficina.data_fim <= end_date)
     if tema_id:
-        stmt = stmt.join(Oficina.temas).where(Tema.id == tema_id).distinct()
+        stmt = stmt.where(
+            select(oficina_tema_table.c.oficina_id)
+            .where(
+                oficina_tema_table.c.oficina_id == Oficina.id,
+                oficina_tema_table.c.tema_id == tema_id,
+            )
+            .exists()
+        )
+    if cursor:
+        stmt = stmt.where(tuple_(*sort_key) > tuple_(*_decode_oficina_cursor(cursor)))
+
     oficinas = db.scalars(stmt).all()
-    _attach_enrollment_stats(db, oficinas)
-    return oficinas
+    if len(oficinas) <= limit:
+        return list(oficinas), None
+    page = list(oficinas[:limit])
+    return page, encode_cursor(*_oficina_sort_key(page[-1]))
 
 
 def get_oficina(db: Session, oficina_id: UUID) -> Oficina:
     oficina = db.get(Oficina, oficina_id)
     if not oficina:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Oficina não encontrada")
-    _attach_enrollment_stats(db, [oficina])
     return oficina
 
 
@@ -126,8 +196,8 @@ def create_oficina(db: Session, payload: OficinaCreate) -> Oficina:
     oficina = Oficina(**data, temas=temas)
     db.add(oficina)
     db.commit()
+    dashboard_service.invalidar_cache()
     db.refresh(oficina)
-    _attach_enrollment_stats(db, [oficina])
     return oficina
 
 
@@ -149,15 +219,28 @@ def update_oficina(db: Session, oficina_id: UUID, payload: OficinaUpdate) -> Ofi
 
     db.add(oficina)
     db.commit()
+    dashboard_service.invalidar_cache()
     db.refresh(oficina)
-    _attach_enrollment_stats(db, [oficina])
     return oficina
 
 
 def delete_oficina(db: Session, oficina_id: UUID) -> None:
-    oficina = get_oficina(db, oficina_id)
+    # The delete cascades through inscrições; loading their presenças and certificado up
+    # front keeps the unit of work from lazy-loading both for every inscrição.
+    stmt = (
+        select(Oficina)
+        .options(
+            selectinload(Oficina.inscricoes).selectinload(Inscricao.presencas),
+            selectinload(Oficina.inscricoes).selectinload(Inscricao.certificado),
+        )
+        .where(Oficina.id == oficina_id)
+    )
+    oficina = db.scalars(stmt).first()
+    if not oficina:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Oficina não encontrada")
     db.delete(oficina)
     db.commit()
+    dashboard_service.invalidar_cache()
 
 
 def list_oficina_tutores(db: Session, oficina_id: UUID) -> list[Tutor]:
@@ -208,5 +291,4 @@ def update_oficina_professor(db: Session, oficina_id: UUID, professor_id: UUID)
     db.add(oficina)
     db.commit()
     db.refresh(oficina)
-    _attach_enrollment_stats(db, [oficina])
     return oficina
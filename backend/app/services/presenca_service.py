@@ -5,12 +5,15 @@ from datetime import date, datetime, timezone
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, selectinload
 
+from ..config import get_settings
 from ..models import Aluno, Inscricao, Oficina, Pessoa, Presenca
 from ..models.inscricao import InscricaoStatus
 from ..schemas.presenca import PresencaRegistro, PresencaUpdate
+from . import dashboard_service, oficina_service
 
 PRESENCA_RELATIONS = (
     selectinload(Presenca.inscricao)
@@ -20,6 +23,20 @@ PRESENCA_RELATIONS = (
 )
 
 
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE; others fall back to the ORM.
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+_UPSERT_COLUMNS = (
+    "numero_aula",
+    "presente",
+    "justificativa",
+    "observacao_tutor",
+    "registrado_por_id",
+)
+
+
 def _with_relations(stmt):
     return stmt.options(
         PRESENCA_RELATIONS,
@@ -42,59 +59,184 @@ def _ensure_date_within_range(oficina: Oficina, data_aula: date) -> None:
         )
 
 
-def _load_inscricoes_or_raise(db: Session, oficina_id: UUID, inscricao_ids: set[UUID]) -> dict[UUID, Inscricao]:
+def _load_inscricoes_or_raise(
+    db: Session,
+    oficina_id: UUID,
+    inscricao_ids: set[UUID],
+    data_aula: date,
+) -> tuple[dict[UUID, Inscricao], dict[UUID, bool]]:
+    """Lock the inscrições of the batch, then read the ``presente`` already recorded for ``data_aula``.
+
+    Rows are locked in id order so overlapping batches cannot deadlock. The presenças are
+    read only once the locks are held, so a concurrent batch, edit or removal touching the
+    same inscrições has committed (or waits) and the deltas start from its result.
+    """
     if not inscricao_ids:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nenhum registro informado")
 
-    stmt = select(Inscricao).where(
-        Inscricao.oficina_id == oficina_id,
-        Inscricao.id.in_(inscricao_ids),
+    stmt = (
+        select(Inscricao)
+        .where(
+            Inscricao.oficina_id == oficina_id,
+            Inscricao.id.in_(inscricao_ids),
+        )
+        .order_by(Inscricao.id)
+        .with_for_update()
     )
     items = {inscricao.id: inscricao for inscricao in db.scalars(stmt)}
     missing = inscricao_ids - set(items.keys())
     if missing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inscrição não encontrada")
-    return items
 
-
-def _recalculate_inscricao_stats(db: Session, inscricao_id: UUID) -> None:
-    total_registros = db.scalar(
-        select(func.count(Presenca.id)).where(Presenca.inscricao_id == inscricao_id)
+    anteriores = dict(
+        db.execute(
+            select(Presenca.inscricao_id, Presenca.presente).where(
+                Presenca.inscricao_id.in_(inscricao_ids),
+                Presenca.data_aula == data_aula,
+            )
+        ).all()
     )
-    total_registros = total_registros or 0
-    total_presentes = db.scalar(
-        select(func.count(Presenca.id)).where(
-            Presenca.inscricao_id == inscricao_id,
-            Presenca.presente.is_(True),
-        )
+    return items, anteriores
+
+
+def _get_presenca_locked(db: Session, presenca_id: UUID) -> Presenca:
+    """Lock the inscrição of ``presenca_id`` first, then load the presença (same order as batches)."""
+    bloqueada = db.scalars(
+        select(Inscricao.id)
+        .join(Presenca, Presenca.inscricao_id == Inscricao.id)
+        .where(Presenca.id == presenca_id)
+        .with_for_update(of=Inscricao)
+    ).first()
+    # Re-read after the lock: a removal that held it may have committed meanwhile.
+    presenca = db.get(Presenca, presenca_id, populate_existing=True) if bloqueada else None
+    if not presenca:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Presença não encontrada")
+    return presenca
+
+
+def _aggregate_presencas(db: Session, inscricao_ids) -> dict[UUID, tuple[int, int]]:
+    """Return ``{inscricao_id: (total_registros, total_presentes)}`` in one grouped query."""
+    presentes = func.sum(case((Presenca.presente.is_(True), 1), else_=0))
+    stmt = (
+        select(Presenca.inscricao_id, func.count(Presenca.id), presentes)
+        .where(Presenca.inscricao_id.in_(list(inscricao_ids)))
+        .group_by(Presenca.inscricao_id)
     )
-    total_presentes = total_presentes or 0
+    return {
+        inscricao_id: (int(total_registros or 0), int(total_presentes or 0))
+        for inscricao_id, total_registros, total_presentes in db.execute(stmt)
+    }
+
+
+def _stats_values(inscricao: Inscricao, total_registros: int, total_presentes: int) -> dict:
     total_faltas = max(total_registros - total_presentes, 0)
     percentual = round((total_presentes / total_registros) * 100, 2) if total_registros else 0.0
 
-    inscricao = db.get(Inscricao, inscricao_id)
-    if not inscricao:
+    values = {
+        "total_presencas": total_presentes,
+        "total_faltas": total_faltas,
+        "total_aulas_previstas": max(total_registros, inscricao.total_aulas_previstas or 0),
+        "percentual_presenca": percentual,
+        "status": inscricao.status,
+        "data_conclusao": inscricao.data_conclusao,
+        "apto_certificado": bool(inscricao.status == InscricaoStatus.CONCLUIDO and percentual >= 75.0),
+    }
+    _auto_finalize_if_applicable(values, percentual)
+    return values
+
+
+def _incremental_mode() -> bool:
+    return get_settings().attendance_stats_mode == "incremental"
+
+
+def _delta(anterior: bool | None, atual: bool | None) -> tuple[int, int]:
+    """``(d_presencas, d_faltas)`` for one presença moving from ``anterior`` to ``atual``.
+
+    ``None`` means "no record" (creation or removal).
+    """
+    return (atual is True) - (anterior is True), (atual is False) - (anterior is False)
+
+
+_INCREMENTO_RETORNO = (
+    Inscricao.__table__.c.id,
+    Inscricao.__table__.c.oficina_id,
+    Inscricao.__table__.c.status,
+    Inscricao.__table__.c.data_conclusao,
+    Inscricao.__table__.c.total_aulas_previstas,
+    Inscricao.__table__.c.total_presencas,
+    Inscricao.__table__.c.total_faltas,
+)
+
+
+def _incrementar_estatisticas(
+    db: Session,
+    deltas: dict[UUID, tuple[int, int]],
+) -> list[tuple[UUID, InscricaoStatus, InscricaoStatus]]:
+    """Shift ``total_presencas``/``total_faltas`` by ``{inscricao_id: (d_presencas, d_faltas)}``.
+
+    The callers lock the inscrições before reading the previous ``presente``
+    values (``_load_inscricoes_or_raise``, ``_get_presenca_locked``), so two
+    writers never derive a delta from the same state. The increments run in
+    SQL and the derived columns are computed from the counters the UPDATE
+    returns, and no query touches the other presenças of the inscrição.
+    Two statements whatever the batch size;
+    returns the ``(oficina_id, anterior, atual)`` status transitions for
+    ``oficina_service.ajustar_totais``. The caller owns the commit.
+    """
+    tabela = Inscricao.__table__
+    d_presencas = {inscricao_id: delta[0] for inscricao_id, delta in deltas.items() if delta[0]}
+    d_faltas = {inscricao_id: delta[1] for inscricao_id, delta in deltas.items() if delta[1]}
+    incrementos = {}
+    if d_presencas:
+        incrementos["total_presencas"] = tabela.c.total_presencas + case(d_presencas, value=tabela.c.id, else_=0)
+    if d_faltas:
+        incrementos["total_faltas"] = tabela.c.total_faltas + case(d_faltas, value=tabela.c.id, else_=0)
+
+    stmt = update(tabela).where(tabela.c.id.in_(list(deltas)))
+    if incrementos:
+        rows = db.execute(stmt.values(**incrementos).returning(*_INCREMENTO_RETORNO)).all()
+    else:
+        # Same values re-sent: nothing to shift, but the derived columns are still refreshed.
+        rows = db.execute(select(*_INCREMENTO_RETORNO).where(tabela.c.id.in_(list(deltas)))).all()
+
+    values = []
+    for row in rows:
+        total_presentes = max(row.total_presencas or 0, 0)
+        item = _stats_values(row, total_presentes + max(row.total_faltas or 0, 0), total_presentes)
+        del item["total_presencas"], item["total_faltas"]
+        values.append({"id": row.id, **item})
+    db.execute(update(Inscricao), values)
+    return [(row.oficina_id, row.status, item["status"]) for row, item in zip(rows, values)]
+
+
+def _apply_presenca_change(
+    db: Session,
+    inscricao: Inscricao,
+    anterior: bool | None,
+    atual: bool | None,
+) -> None:
+    if _incremental_mode():
+        transicoes = _incrementar_estatisticas(db, {inscricao.id: _delta(anterior, atual)})
+        oficina_service.ajustar_totais(db, transicoes)
+        db.expire(inscricao)
         return
 
-    inscricao.total_presencas = total_presentes
-    inscricao.total_faltas = total_faltas
-    inscricao.total_aulas_previstas = max(total_registros, inscricao.total_aulas_previstas or 0)
-    inscricao.percentual_presenca = percentual
-    inscricao.apto_certificado = bool(
-        inscricao.status == InscricaoStatus.CONCLUIDO and percentual >= 75.0
-    )
-    _auto_finalize_if_applicable(inscricao, percentual)
+    stats = _aggregate_presencas(db, [inscricao.id])
+    values = _stats_values(inscricao, *stats.get(inscricao.id, (0, 0)))
+    oficina_service.ajustar_totais(db, [(inscricao.oficina_id, inscricao.status, values["status"])])
+    for field, value in values.items():
+        setattr(inscricao, field, value)
     db.add(inscricao)
 
 
-def _auto_finalize_if_applicable(inscricao: Inscricao, percentual: float) -> None:
-    if percentual >= 75.0 and inscricao.status == InscricaoStatus.EM_ANDAMENTO:
-        inscricao.status = InscricaoStatus.CONCLUIDO
-        if not inscricao.data_conclusao:
-            inscricao.data_conclusao = datetime.now(timezone.utc)
-        inscricao.apto_certificado = True
-    elif inscricao.status != InscricaoStatus.CONCLUIDO:
-        inscricao.apto_certificado = False
+def _auto_finalize_if_applicable(values: dict, percentual: float) -> None:
+    if percentual >= 75.0 and values["status"] == InscricaoStatus.EM_ANDAMENTO:
+        values["status"] = InscricaoStatus.CONCLUIDO
+        if not values["data_conclusao"]:
+            values["data_conclusao"] = datetime.now(timezone.utc)
+        values["apto_certificado"] = True
+    elif values["status"] != InscricaoStatus.CONCLUIDO:
+        values["apto_certificado"] = False
 
 
 def _fetch_presencas_by_ids(db: Session, presenca_ids: list[UUID]) -> list[Presenca]:
@@ -107,6 +249,53 @@ def _fetch_presencas_by_ids(db: Session, presenca_ids: list[UUID]) -> list[Prese
     return db.scalars(stmt).all()
 
 
+def _fetch_presencas_by_aula(db: Session, inscricao_ids: list[UUID], data_aula: date) -> list[Presenca]:
+    stmt = (
+        select(Presenca)
+        .where(Presenca.inscricao_id.in_(inscricao_ids), Presenca.data_aula == data_aula)
+        .order_by(Presenca.data_aula.asc(), Presenca.created_at.asc())
+    )
+    stmt = _with_relations(stmt)
+    return db.scalars(stmt).all()
+
+
+def _upsert_presencas(db: Session, data_aula: date, rows: list[dict]) -> None:
+    """Write every row of a class in a single statement, whatever the class size."""
+    insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        _upsert_presencas_orm(db, data_aula, rows)
+        return
+
+    stmt = insert(Presenca)
+    updates = {column: stmt.excluded[column] for column in _UPSERT_COLUMNS}
+    updates["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Presenca.inscricao_id, Presenca.data_aula],
+        set_=updates,
+    )
+    db.execute(stmt, rows)
+
+
+def _upsert_presencas_orm(db: Session, data_aula: date, rows: list[dict]) -> None:
+    existing = {
+        presenca.inscricao_id: presenca
+        for presenca in db.scalars(
+            select(Presenca).where(
+                Presenca.inscricao_id.in_([row["inscricao_id"] for row in rows]),
+                Presenca.data_aula == data_aula,
+            )
+        )
+    }
+    for row in rows:
+        presenca = existing.get(row["inscricao_id"])
+        if presenca is None:
+            presenca = Presenca(inscricao_id=row["inscricao_id"], data_aula=data_aula)
+        for column in _UPSERT_COLUMNS:
+            setattr(presenca, column, row[column])
+        db.add(presenca)
+    db.flush()
+
+
 def list_by_oficina(
     db: Session,
     oficina_id: UUID,
@@ -161,7 +350,7 @@ def registrar_lote(
             detail="Inscrições duplicadas no payload",
         )
 
-    inscricoes = _load_inscricoes_or_raise(db, oficina_id, set(inscricao_ids))
+    inscricoes, anteriores = _load_inscricoes_or_raise(db, oficina_id, set(inscricao_ids), data_aula)
     for inscricao in inscricoes.values():
         if inscricao.status in (InscricaoStatus.CANCELADO, InscricaoStatus.ABANDONOU):
             raise HTTPException(
@@ -169,39 +358,46 @@ def registrar_lote(
                 detail="Inscrição não permite registro de presença",
             )
 
-    touched: set[UUID] = set()
-    persisted: list[Presenca] = []
-
-    for registro in registros:
-        presenca = db.execute(
-            select(Presenca).where(
-                Presenca.inscricao_id == registro.inscricao_id,
-                Presenca.data_aula == data_aula,
-            )
-        ).scalar_one_or_none()
-
-        if presenca is None:
-            presenca = Presenca(
-                inscricao_id=registro.inscricao_id,
-                data_aula=data_aula,
-            )
-
-        presenca.numero_aula = registro.numero_aula
-        presenca.presente = registro.presente
-        presenca.justificativa = registro.justificativa
-        presenca.observacao_tutor = registro.observacao_tutor
-        presenca.registrado_por_id = registrador_id
-        db.add(presenca)
-        persisted.append(presenca)
-        touched.add(registro.inscricao_id)
-
-    db.flush()
+    rows = [
+        {
+            "inscricao_id": registro.inscricao_id,
+            "data_aula": data_aula,
+            "numero_aula": registro.numero_aula,
+            "presente": registro.presente,
+            "justificativa": registro.justificativa,
+            "observacao_tutor": registro.observacao_tutor,
+            "registrado_por_id": registrador_id,
+        }
+        for registro in registros
+    ]
+    _upsert_presencas(db, data_aula, rows)
+    if _incremental_mode():
+        transicoes = _incrementar_estatisticas(
+            db,
+            {
+                registro.inscricao_id: _delta(anteriores.get(registro.inscricao_id), registro.presente)
+                for registro in registros
+            },
+        )
+    else:
+        stats = _aggregate_presencas(db, inscricoes.keys())
+        values = {
+            inscricao_id: _stats_values(inscricao, *stats.get(inscricao_id, (0, 0)))
+            for inscricao_id, inscricao in inscricoes.items()
+        }
+        db.execute(
+            update(Inscricao),
+            [{"id": inscricao_id, **item} for inscricao_id, item in values.items()],
+        )
+        transicoes = [
+            (oficina_id, inscricoes[inscricao_id].status, item["status"]) for inscricao_id, item in values.items()
+        ]
 
-    for inscricao_id in touched:
-        _recalculate_inscricao_stats(db, inscricao_id)
+    oficina_service.ajustar_totais(db, transicoes)
 
     db.commit()
-    return _fetch_presencas_by_ids(db, [item.id for item in persisted])
+    dashboard_service.invalidar_cache()
+    return _fetch_presencas_by_aula(db, inscricao_ids, data_aula)
 
 
 def update_presenca(
@@ -211,9 +407,7 @@ def update_presenca(
     *,
     registrador_id: UUID,
 ) -> Presenca:
-    presenca = db.get(Presenca, presenca_id)
-    if not presenca:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Presença não encontrada")
+    presenca = _get_presenca_locked(db, presenca_id)
 
     data = payload.model_dump(exclude_unset=True)
     if not data:
@@ -235,6 +429,7 @@ def update_presenca(
             )
         presenca.data_aula = data["data_aula"]
 
+    anterior = presenca.presente
     if "numero_aula" in data:
         presenca.numero_aula = data["numero_aula"]
     if "presente" in data:
@@ -247,19 +442,86 @@ def update_presenca(
     presenca.registrado_por_id = registrador_id
     db.add(presenca)
     db.flush()
-    _recalculate_inscricao_stats(db, presenca.inscricao_id)
+    _apply_presenca_change(db, presenca.inscricao, anterior, presenca.presente)
     db.commit()
+    dashboard_service.invalidar_cache()
 
     return _fetch_presencas_by_ids(db, [presenca.id])[0]
 
 
 def delete_presenca(db: Session, presenca_id: UUID) -> None:
-    presenca = db.get(Presenca, presenca_id)
-    if not presenca:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Presença não encontrada")
+    presenca = _get_presenca_locked(db, presenca_id)
 
-    inscricao_id = presenca.inscricao_id
+    inscricao = presenca.inscricao
+    anterior = presenca.presente
     db.delete(presenca)
     db.flush()
-    _recalculate_inscricao_stats(db, inscricao_id)
-    db.commit()
\ No newline at end of file
+    _apply_presenca_change(db, inscricao, anterior, None)
+    db.commit()
+    dashboard_service.invalidar_cache()
+
+
+def _inscricao_stats_rows(db: Session, oficina_id: UUID | None):
+    """Stored counters next to the real ones, one grouped pass over ``presencas``."""
+    presentes = func.sum(case((Presenca.presente.is_(True), 1), else_=0))
+    stmt = (
+        select(
+            Inscricao.id,
+            Inscricao.oficina_id,
+            Inscricao.status,
+            Inscricao.data_conclusao,
+            Inscricao.total_aulas_previstas,
+            Inscricao.total_presencas,
+            Inscricao.total_faltas,
+            func.count(Presenca.id).label("total_registros"),
+            presentes.label("total_presentes"),
+        )
+        .outerjoin(Presenca, Presenca.inscricao_id == Inscricao.id)
+        .group_by(Inscricao.id)
+    )
+    if oficina_id:
+        _get_oficina_or_404(db, oficina_id)
+        stmt = stmt.where(Inscricao.oficina_id == oficina_id)
+    return db.execute(stmt)
+
+
+def _bulk_update_stats(db: Session, rows) -> list[UUID]:
+    values = [
+        {"id": row.id, **_stats_values(row, int(row.total_registros or 0), int(row.total_presentes or 0))}
+        for row in rows
+    ]
+    if values:
+        db.execute(update(Inscricao), values)
+        oficina_service.ajustar_totais(
+            db,
+            [(row.oficina_id, row.status, item["status"]) for row, item in zip(rows, values)],
+        )
+    db.commit()
+    dashboard_service.invalidar_cache()
+    return [item["id"] for item in values]
+
+
+def recalcular_estatisticas(db: Session, *, oficina_id: UUID | None = None) -> int:
+    """Rebuild attendance stats and ``apto_certificado`` for every inscrição of an oficina (or all).
+
+    One grouped aggregate plus one bulk UPDATE, independent of how many
+    inscrições are rebuilt.
+    """
+    return len(_bulk_update_stats(db, _inscricao_stats_rows(db, oficina_id).all()))
+
+
+def reconciliar_estatisticas(db: Session, *, oficina_id: UUID | None = None) -> dict:
+    """Compare the stored counters against the real presenças and repair any drift.
+
+    Meant to run on demand (admin endpoint) or from a scheduler, since the
+    incremental mode trusts the stored counters on every write.
+    """
+    rows = _inscricao_stats_rows(db, oficina_id).all()
+    divergentes = [
+        row
+        for row in rows
+        if (row.total_presencas or 0) != int(row.total_presentes or 0)
+        or (row.total_faltas or 0) != int(row.total_registros or 0) - int(row.total_presentes or 0)
+    ]
+    corrigidas = _bulk_update_stats(db, divergentes)
+    return {"inscricoes_verificadas": len(rows), "inscricoes_corrigidas": corrigidas}
@@ -1,15 +1,18 @@
 """Relatórios para RF-014 e RF-015."""
 from __future__ import annotations
 
+from collections.abc import Iterator
+from datetime import datetime
 from statistics import fmean
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Connection, Engine, case, func, select, tuple_
 from sqlalchemy.orm import Session, selectinload
 
-from ..models import Aluno, Certificado, Inscricao, Oficina, Pessoa, Tutor
+from ..models import Aluno, Certificado, Inscricao, Oficina, Pessoa, User
 from ..models.certificado import CertificadoTipo
+from ..utils import InvalidCursorError, decode_cursor, encode_cursor
 
 INSCRICAO_RELATIONS = (
     selectinload(Inscricao.aluno)
@@ -62,42 +65,181 @@ def relatorio_frequencia(db: Session, oficina_id: UUID) -> dict:
     }
 
 
-def relatorio_certificados(db: Session) -> dict:
-    certificados = db.scalars(
-        select(Certificado)
-        .options(
-            selectinload(Certificado.inscricao)
-            .selectinload(Inscricao.aluno)
-            .selectinload(Aluno.pessoa)
-            .selectinload(Pessoa.user),
-            selectinload(Certificado.tutor)
-            .selectinload(Tutor.pessoa)
-            .selectinload(Pessoa.user),
-            selectinload(Certificado.oficina),
+FREQUENCIA_EXPORT_COLUMNS = (
+    "inscricao_id",
+    "aluno_nome",
+    "aluno_email",
+    "status",
+    "percentual_presenca",
+    "total_presencas",
+    "total_faltas",
+    "apto_certificado",
+)
+EXPORT_BATCH_SIZE = 500
+
+
+class FrequenciaExport:
+    """Row source for the frequency export, read with a server-side cursor.
+
+    The rows are plain columns (no ORM entities), and ``resumo`` is
+    accumulated while they are consumed, so it is complete once the
+    iteration ends. Like ``certificado_service.iterar`` it opens its own
+    session, because streaming bodies outlive the request-scoped one.
+    """
+
+    def __init__(self, bind: Engine | Connection, oficina: Oficina) -> None:
+        self.bind = bind
+        self.oficina_id = oficina.id
+        self.oficina_titulo = oficina.titulo
+        self._total = 0
+        self._soma_percentual = 0.0
+        self._aptos = 0
+
+    def _stmt(self):
+        return (
+            select(
+                Inscricao.id,
+                Pessoa.nome_completo,
+                User.email,
+                Inscricao.status,
+                Inscricao.percentual_presenca,
+                Inscricao.total_presencas,
+                Inscricao.total_faltas,
+                Inscricao.apto_certificado,
+            )
+            .join(Aluno, Aluno.id == Inscricao.aluno_id)
+            .join(Pessoa, Pessoa.id == Aluno.pessoa_id)
+            .join(User, User.id == Pessoa.user_id)
+            .where(Inscricao.oficina_id == self.oficina_id)
+            .order_by(Inscricao.created_at.asc())
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
         )
-        .order_by(Certificado.created_at.desc())
-    ).all()
 
-    total_emitidos = len(certificados)
-    total_alunos = sum(1 for item in certificados if item.tipo == CertificadoTipo.CONCLUSAO_ALUNO)
-    total_tutores = sum(1 for item in certificados if item.tipo == CertificadoTipo.PARTICIPACAO_TUTOR)
-    total_revogados = sum(1 for item in certificados if item.revogado)
+    def __iter__(self) -> Iterator[tuple]:
+        with Session(bind=self.bind) as session:
+            for row in session.execute(self._stmt()):
+                percentual = _to_float(row.percentual_presenca)
+                apto = bool(row.apto_certificado)
+                self._total += 1
+                self._soma_percentual += percentual
+                self._aptos += apto
+                yield (
+                    str(row.id),
+                    row.nome_completo,
+                    row.email,
+                    row.status.value,
+                    percentual,
+                    int(row.total_presencas or 0),
+                    int(row.total_faltas or 0),
+                    apto,
+                )
+
+    @property
+    def resumo(self) -> dict:
+        media = self._soma_percentual / self._total if self._total else 0.0
+        return {
+            "total_inscricoes": self._total,
+            "media_presenca": round(media, 2),
+            "total_aptos_certificado": self._aptos,
+        }
+
+
+def exportar_frequencia(db: Session, oficina_id: UUID) -> FrequenciaExport:
+    oficina = _get_oficina_or_404(db, oficina_id)
+    return FrequenciaExport(db.get_bind(), oficina)
 
-    pendentes = db.scalars(
-        select(Inscricao)
-        .options(*INSCRICAO_WITH_OFICINA)
-        .where(Inscricao.apto_certificado.is_(True), ~Inscricao.certificado.has())
-        .order_by(Inscricao.updated_at.desc())
-    ).all()
+
+def _count_where(condition):
+    return func.count(case((condition, 1)))
+
+
+def _pendentes_filter():
+    return Inscricao.apto_certificado.is_(True), ~Inscricao.certificado.has()
+
+
+def resumo_certificados(db: Session) -> dict:
+    """Summary block only: one conditional aggregate plus one pending count."""
+    totais = db.execute(
+        select(
+            func.count(Certificado.id).label("total_emitidos"),
+            _count_where(Certificado.tipo == CertificadoTipo.CONCLUSAO_ALUNO).label("total_alunos"),
+            _count_where(Certificado.tipo == CertificadoTipo.PARTICIPACAO_TUTOR).label("total_tutores"),
+            _count_where(Certificado.revogado.is_(True)).label("total_revogados"),
+        )
+    ).one()
+    pendentes = db.execute(select(func.count(Inscricao.id)).where(*_pendentes_filter())).scalar_one()
+
+    return {
+        "total_emitidos": int(totais.total_emitidos),
+        "total_alunos": int(totais.total_alunos),
+        "total_tutores": int(totais.total_tutores),
+        "total_revogados": int(totais.total_revogados),
+        "pendentes_para_emitir": int(pendentes),
+    }
+
+
+def _decode_detalhe_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        momento, item_id = decode_cursor(cursor, 2)
+        return datetime.fromisoformat(momento), UUID(item_id)
+    except (InvalidCursorError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido") from exc
+
+
+def _pagina(db: Session, stmt, chave, limit: int | None, cursor: str | None) -> tuple[list, str | None]:
+    """Newest first by ``chave`` (a ``(timestamp, id)`` pair); one keyset page when ``limit`` is set."""
+    stmt = stmt.order_by(*(coluna.desc() for coluna in chave))
+    if cursor:
+        stmt = stmt.where(tuple_(*chave) < tuple_(*_decode_detalhe_cursor(cursor)))
+    if limit is None:
+        return list(db.scalars(stmt)), None
+    itens = db.scalars(stmt.limit(limit + 1)).all()
+    if len(itens) <= limit:
+        return list(itens), None
+    pagina = list(itens[:limit])
+    momento, item_id = (getattr(pagina[-1], coluna.key) for coluna in chave)
+    return pagina, encode_cursor(momento.isoformat(), item_id)
+
+
+def relatorio_certificados(
+    db: Session,
+    *,
+    incluir_detalhes: bool = True,
+    limit: int | None = None,
+    cursor: str | None = None,
+    cursor_pendentes: str | None = None,
+) -> dict:
+    """Summary plus, unless omitted, every certificado and pending inscrição, newest first.
+
+    With ``limit`` each list is one keyset page instead; ``next_cursor`` and
+    ``next_cursor_pendentes`` resume them and are ``None`` once a list is exhausted.
+    """
+    resumo = resumo_certificados(db)
+    if not incluir_detalhes:
+        return {
+            "certificados": [],
+            "pendentes": [],
+            "resumo": resumo,
+            "next_cursor": None,
+            "next_cursor_pendentes": None,
+        }
+
+    # serialize_certificado only reads columns, so no relations are loaded here.
+    certificados, next_cursor = _pagina(
+        db, select(Certificado), (Certificado.created_at, Certificado.id), limit, cursor
+    )
+    pendentes, next_cursor_pendentes = _pagina(
+        db,
+        select(Inscricao).options(*INSCRICAO_WITH_OFICINA).where(*_pendentes_filter()),
+        (Inscricao.updated_at, Inscricao.id),
+        limit,
+        cursor_pendentes,
+    )
 
     return {
         "certificados": certificados,
         "pendentes": pendentes,
-        "resumo": {
-            "total_emitidos": total_emitidos,
-            "total_alunos": total_alunos,
-            "total_tutores": total_tutores,
-            "total_revogados": total_revogados,
-            "pendentes_para_emitir": len(pendentes),
-        },
+        "resumo": resumo,
+        "next_cursor": next_cursor,
+        "next_cursor_pendentes": next_cursor_pendentes,
     }
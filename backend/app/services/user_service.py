@@ -1,16 +1,31 @@
 """Business rules for creating and listing users."""
 from __future__ import annotations
 
+import csv
+import io
+import uuid
 from datetime import date
-from typing import Iterable
+from typing import Any, Iterable
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
+from ..config import get_settings
 from ..models import Aluno, Pessoa, Professor, Tutor, User, UserRole
-from ..schemas import AdminCreate, AlunoCreate, ProfessorCreate, TutorCreate, UserRead
-from ..utils import get_password_hash
+from ..schemas import (
+    AdminCreate,
+    AlunoCreate,
+    ProfessorCreate,
+    TutorCreate,
+    UserImportRead,
+    UserImportResultado,
+    UserRead,
+)
+from ..schemas.user import BaseUserCreate
+from ..utils import PasswordHashingBusyError, get_password_hash, get_password_hashes
 
 
 ROLE_MAP = {
@@ -27,6 +42,14 @@ def _ensure_email_available(db: Session, email: str) -> None:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email já utilizado")
 
 
+def _servidor_ocupado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, tente novamente em instantes",
+        headers={"Retry-After": "1"},
+    )
+
+
 def _build_user_core(
     role: UserRole,
     *,
@@ -36,7 +59,11 @@ def _build_user_core(
     telefone: str | None,
     data_nascimento: date | None,
 ) -> tuple[User, Pessoa]:
-    user = User(email=email, senha_hash=get_password_hash(password), role=role.value)
+    try:
+        senha_hash = get_password_hash(password)
+    except PasswordHashingBusyError as exc:
+        raise _servidor_ocupado() from exc
+    user = User(email=email, senha_hash=senha_hash, role=role.value)
     pessoa = Pessoa(
         user=user,
         nome_completo=nome_completo,
@@ -138,8 +165,161 @@ def create_professor(db: Session, payload: ProfessorCreate) -> User:
     return user
 
 
+_IMPORT_SCHEMAS: dict[UserRole, type[BaseUserCreate]] = {
+    UserRole.ALUNO: AlunoCreate,
+    UserRole.TUTOR: TutorCreate,
+}
+_IMPORT_PROFILES: dict[UserRole, type[Aluno] | type[Tutor]] = {
+    UserRole.ALUNO: Aluno,
+    UserRole.TUTOR: Tutor,
+}
+_CORE_FIELDS = set(BaseUserCreate.model_fields)
+
+
+def ler_importacao_csv(conteudo: bytes) -> list[tuple[int, dict[str, Any]]]:
+    """Parse a CSV whose header row names the payload fields (``,`` or ``;`` separated)."""
+    try:
+        texto = conteudo.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV deve estar em UTF-8") from exc
+    try:
+        dialect: Any = csv.Sniffer().sniff(texto[:4096], delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(texto), dialect=dialect)
+    linhas = []
+    for row in reader:
+        # Blank cells fall back to the schema defaults, as if the field had been omitted.
+        dados = {
+            chave.strip(): valor.strip()
+            for chave, valor in row.items()
+            if chave and isinstance(valor, str) and valor.strip()
+        }
+        if dados:
+            linhas.append((reader.line_num, dados))
+    return linhas
+
+
+def ler_importacao_json(dados: Any) -> list[tuple[int, dict[str, Any]]]:
+    if not isinstance(dados, list) or not all(isinstance(item, dict) for item in dados):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Envie uma lista de objetos",
+        )
+    return list(enumerate(dados, start=1))
+
+
+def _format_erros(exc: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(part) for part in erro['loc'])}: {erro['msg']}" for erro in exc.errors()]
+
+
+def importar_usuarios(
+    db: Session,
+    role: UserRole,
+    linhas: list[tuple[int, dict[str, Any]]],
+    *,
+    dry_run: bool = False,
+) -> UserImportRead:
+    """Validate a batch of alunos/tutores and create the valid rows in one transaction.
+
+    E-mail uniqueness is checked for the whole batch with one ``IN`` query, passwords are
+    hashed in parallel on the hashing pool, and each table gets a single executemany
+    insert. Invalid rows are reported and skipped; ``dry_run`` validates without writing.
+    """
+    schema = _IMPORT_SCHEMAS[role]
+    if not linhas:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nenhum registro informado")
+    limite = get_settings().user_import_max_rows
+    if len(linhas) > limite:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Importação limitada a {limite} registros",
+        )
+
+    resultados: list[UserImportResultado] = []
+    validos: list[tuple[UserImportResultado, BaseUserCreate]] = []
+    linha_por_email: dict[str, int] = {}
+    for linha, dados in linhas:
+        try:
+            payload = schema.model_validate(dados)
+        except ValidationError as exc:
+            email = dados.get("email")
+            resultados.append(
+                UserImportResultado(
+                    linha=linha,
+                    email=email if isinstance(email, str) else None,
+                    status="erro",
+                    erros=_format_erros(exc),
+                )
+            )
+            continue
+        resultado = UserImportResultado(linha=linha, email=payload.email, status="valido")
+        resultados.append(resultado)
+        if payload.email in linha_por_email:
+            resultado.status = "erro"
+            resultado.erros.append(f"Email repetido na linha {linha_por_email[payload.email]}")
+            continue
+        linha_por_email[payload.email] = linha
+        validos.append((resultado, payload))
+
+    if linha_por_email:
+        existentes = set(db.scalars(select(User.email).where(User.email.in_(list(linha_por_email)))))
+        for resultado, _ in validos:
+            if resultado.email in existentes:
+                resultado.status = "erro"
+                resultado.erros.append("Email já utilizado")
+        validos = [(resultado, payload) for resultado, payload in validos if resultado.status == "valido"]
+
+    if validos and not dry_run:
+        try:
+            hashes = get_password_hashes([payload.password for _, payload in validos])
+        except PasswordHashingBusyError as exc:
+            raise _servidor_ocupado() from exc
+
+        users, pessoas, perfis = [], [], []
+        for (resultado, payload), senha_hash in zip(validos, hashes):
+            user_id, pessoa_id = uuid.uuid4(), uuid.uuid4()
+            users.append({"id": user_id, "email": payload.email, "senha_hash": senha_hash, "role": role.value})
+            pessoas.append(
+                {
+                    "id": pessoa_id,
+                    "user_id": user_id,
+                    "nome_completo": payload.nome_completo,
+                    "telefone": payload.telefone,
+                    "data_nascimento": payload.data_nascimento,
+                }
+            )
+            perfis.append({"pessoa_id": pessoa_id, **payload.model_dump(exclude=_CORE_FIELDS)})
+            resultado.status = "criado"
+            resultado.user_id = user_id
+
+        try:
+            db.execute(insert(User), users)
+            db.execute(insert(Pessoa), pessoas)
+            db.execute(insert(_IMPORT_PROFILES[role]), perfis)
+            db.commit()
+        except IntegrityError as exc:
+            # Only a concurrent insert of the same e-mail can get past the checks above.
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email já utilizado") from exc
+
+    return UserImportRead(
+        role=role.value,
+        dry_run=dry_run,
+        total=len(resultados),
+        criados=sum(1 for resultado in resultados if resultado.status == "criado"),
+        com_erro=sum(1 for resultado in resultados if resultado.status == "erro"),
+        resultados=resultados,
+    )
+
+
 def list_users_by_role(db: Session, role: str) -> Iterable[User]:
-    stmt = select(User).where(User.role == role).order_by(User.created_at.desc())
+    stmt = (
+        select(User)
+        .options(selectinload(User.pessoa))
+        .where(User.role == role)
+        .order_by(User.created_at.desc())
+    )
     return db.scalars(stmt).all()
 
 
@@ -1,25 +1,86 @@
 """Utility exports."""
+from .cache import CacheBackend, MemoryCache
+from .export import CSV_MEDIA_TYPE, XLSX_MEDIA_TYPE, stream_csv, stream_xlsx
+from .http_cache import RangeNotSatisfiableError, etag_matches, iter_file_range, parse_byte_range
+from .metrics import METRICS_CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram, counter, gauge, histogram
+from .pagination import (
+    NEXT_CURSOR_HEADER,
+    NEXT_CURSOR_PENDENTES_HEADER,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
 from .pdf_generator import (
+    PDF_RENDER_SECONDS,
+    PDF_TEMPLATE_VERSION,
     formatar_cpf,
     formatar_periodo,
     gerar_certificado_aluno,
     gerar_certificado_tutor,
 )
+from .query_budget import get_query_budget, query_budget
 from .security import (
     InvalidTokenError,
+    PasswordHashingBusyError,
     create_access_token,
     create_refresh_token,
     get_password_hash,
+    get_password_hashes,
     safe_decode,
+    shutdown_password_hashing,
     verify_password,
 )
-from .storage import delete_pdf_certificado, upload_pdf_certificado
+from .storage import (
+    LOCAL_STORAGE_ROUTE,
+    LocalStorageBackend,
+    StorageBackend,
+    SupabaseStorageBackend,
+    delete_pdf_certificado,
+    download_pdf_certificado,
+    get_storage_backend,
+    upload_pdf_certificado,
+)
 
 __all__ = [
+    "CSV_MEDIA_TYPE",
+    "CacheBackend",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MemoryCache",
+    "XLSX_MEDIA_TYPE",
+    "InvalidCursorError",
     "InvalidTokenError",
+    "LOCAL_STORAGE_ROUTE",
+    "LocalStorageBackend",
+    "METRICS_CONTENT_TYPE",
+    "NEXT_CURSOR_HEADER",
+    "NEXT_CURSOR_PENDENTES_HEADER",
+    "PDF_RENDER_SECONDS",
+    "PDF_TEMPLATE_VERSION",
+    "PasswordHashingBusyError",
+    "REGISTRY",
+    "RangeNotSatisfiableError",
+    "StorageBackend",
+    "SupabaseStorageBackend",
     "create_access_token",
+    "counter",
     "create_refresh_token",
+    "decode_cursor",
+    "encode_cursor",
+    "etag_matches",
+    "gauge",
     "get_password_hash",
+    "get_password_hashes",
+    "get_query_budget",
+    "get_storage_backend",
+    "histogram",
+    "iter_file_range",
+    "parse_byte_range",
+    "query_budget",
     "safe_decode",
+    "shutdown_password_hashing",
+    "stream_csv",
+    "stream_xlsx",
     "verify_password",
 ]
@@ -0,0 +1,66 @@
+"""Conditional-request (ETag) and byte-range helpers for file downloads."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiableError(ValueError):
+    """Raised for a syntactically valid ``Range`` that lies outside the file (HTTP 416)."""
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Resolve a single ``bytes=`` range to inclusive offsets.
+
+    Returns ``None`` when the whole file should be sent: no header, an
+    unknown unit, malformed syntax or several ranges (all of which a server
+    may answer with a plain 200).
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, sep, end_text = spec.strip().partition("-")
+    if not sep:
+        return None
+    partes = [part for part in (start_text, end_text) if part]
+    if not partes or not all(part.isascii() and part.isdigit() for part in partes):
+        return None
+    if not start_text:
+        suffix = int(end_text)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiableError(header)
+        return max(size - suffix, 0), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if end_text and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(header)
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path: Path, start: int, end: int, chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield bytes ``start..end`` (inclusive) of ``path`` in chunks."""
+    remaining = end - start + 1
+    with path.open("rb") as file:
+        file.seek(start)
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,32 @@
+"""Opaque cursors for keyset pagination."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Second list of GET /relatorios/certificados (pending inscrições), paged independently.
+NEXT_CURSOR_PENDENTES_HEADER = "X-Next-Cursor-Pendentes"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor that was not produced by ``encode_cursor``."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last row of a page; dates and UUIDs are stored as strings."""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError(cursor) from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError(cursor)
+    return values
@@ -2,266 +2,307 @@
 from __future__ import annotations
 
 import io
+import time
 from datetime import datetime
-from pathlib import Path
-from typing import Literal
+from functools import lru_cache
+from typing import NamedTuple
 
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Drawing, Line, Rect, String
 from reportlab.lib import colors
+from reportlab.lib.colors import Color
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
-from reportlab.platypus import Paragraph
 
-
-def _draw_border(c: canvas.Canvas, width: float, height: float) -> None:
-    """Desenha borda decorativa no certificado."""
-    c.setStrokeColor(colors.HexColor("#10b981"))
-    c.setLineWidth(3)
-    c.rect(1 * cm, 1 * cm, width - 2 * cm, height - 2 * cm)
-    
-    c.setStrokeColor(colors.HexColor("#059669"))
-    c.setLineWidth(1)
-    c.rect(1.2 * cm, 1.2 * cm, width - 2.4 * cm, height - 2.4 * cm)
-
-
-def _draw_header(c: canvas.Canvas, width: float, y_position: float) -> float:
-    """Desenha o cabeçalho do certificado."""
-    c.setFillColor(colors.HexColor("#10b981"))
-    c.setFont("Helvetica-Bold", 32)
-    c.drawCentredString(width / 2, y_position, "CERTIFICADO")
-    
-    return y_position - 1.5 * cm
+from .metrics import histogram
+
+# Incrementar sempre que o layout mudar: invalida a camada fixa em cache e os digests dos PDFs já gerados.
+PDF_TEMPLATE_VERSION = 2
+
+PAGE_SIZE = landscape(A4)
+WIDTH, HEIGHT = PAGE_SIZE
+
+# Cores interpretadas uma única vez no import.
+COR_DESTAQUE = colors.HexColor("#10b981")
+COR_DESTAQUE_ESCURA = colors.HexColor("#059669")
+COR_TITULO = colors.HexColor("#0f172a")
+COR_TEXTO = colors.HexColor("#1e293b")
+COR_CORPO = colors.HexColor("#475569")
+COR_SECUNDARIA = colors.HexColor("#64748b")
+
+MESES_PT = {
+    1: "janeiro", 2: "fevereiro", 3: "março", 4: "abril",
+    5: "maio", 6: "junho", 7: "julho", 8: "agosto",
+    9: "setembro", 10: "outubro", 11: "novembro", 12: "dezembro",
+}
+
+PDF_RENDER_SECONDS = histogram(
+    "pdf_render_seconds",
+    "Tempo de renderização de um certificado em PDF.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+_Y_CABECALHO = HEIGHT - 3 * cm
+_Y_ASSINATURA = 4 * cm
+_Y_RODAPE = 2 * cm
+
+
+class _Linha(NamedTuple):
+    """Texto fixo com a posição já calculada (sem ``stringWidth`` por certificado)."""
+
+    texto: str
+    x: float
+    y: float
+    fonte: str
+    tamanho: int
+    cor: Color
+
+
+def _linha_centralizada(texto: str, y: float, fonte: str, tamanho: int, cor: Color) -> _Linha:
+    return _Linha(texto, (WIDTH - stringWidth(texto, fonte, tamanho)) / 2, y, fonte, tamanho, cor)
+
+
+def _altura_linha(tamanho: int) -> float:
+    return tamanho / 72 * 2.54 * cm  # Converte pontos para cm
+
+
+_Y_SUBTITULO = _Y_CABECALHO - 1.5 * cm
+_Y_CERTIFICAMOS = _Y_SUBTITULO - _altura_linha(14) - 1 * cm
+_Y_NOME = _Y_CERTIFICAMOS - _altura_linha(14) - 0.3 * cm
+
+# Cabeçalho, bloco de assinaturas e linha fixa do rodapé, comuns aos dois modelos.
+_TEXTOS_ESTATICOS = (
+    _linha_centralizada("CERTIFICADO", _Y_CABECALHO, "Helvetica-Bold", 32, COR_DESTAQUE),
+    _linha_centralizada("Certificamos que", _Y_CERTIFICAMOS, "Helvetica", 14, COR_CORPO),
+    _linha_centralizada("Coordenação do Projeto ELLP", _Y_ASSINATURA - 0.5 * cm, "Helvetica", 10, COR_CORPO),
+    _linha_centralizada(
+        "Universidade Tecnológica Federal do Paraná", _Y_ASSINATURA - 1 * cm, "Helvetica", 10, COR_CORPO
+    ),
+    _linha_centralizada(
+        "Valide este certificado em: https://ellp.utfpr.edu.br/validar",
+        _Y_RODAPE - 0.8 * cm,
+        "Helvetica",
+        8,
+        COR_SECUNDARIA,
+    ),
+)
+_SUBTITULOS = {
+    "aluno": _linha_centralizada("de Conclusão", _Y_SUBTITULO, "Helvetica-Oblique", 14, COR_DESTAQUE_ESCURA),
+    "tutor": _linha_centralizada(
+        "de Participação como Tutor", _Y_SUBTITULO, "Helvetica-Oblique", 14, COR_DESTAQUE_ESCURA
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def _camada_estatica(modelo: str, versao: int, tamanho_pagina: tuple[float, float]) -> Drawing:
+    """Bordas, cabeçalho, assinaturas e rodapé fixo de um modelo.
+
+    Montada uma única vez por versão do layout e tamanho de página; cada
+    documento apenas a desenha num form XObject (``_carimbar_camada_estatica``).
+    """
+    largura, altura = tamanho_pagina
+    desenho = Drawing(largura, altura)
+    desenho.add(
+        Rect(1 * cm, 1 * cm, largura - 2 * cm, altura - 2 * cm, strokeColor=COR_DESTAQUE, strokeWidth=3, fillColor=None)
+    )
+    desenho.add(
+        Rect(
+            1.2 * cm,
+            1.2 * cm,
+            largura - 2.4 * cm,
+            altura - 2.4 * cm,
+            strokeColor=COR_DESTAQUE_ESCURA,
+            strokeWidth=1,
+            fillColor=None,
+        )
+    )
+    desenho.add(
+        Line(
+            largura / 2 - 6 * cm,
+            _Y_ASSINATURA,
+            largura / 2 + 6 * cm,
+            _Y_ASSINATURA,
+            strokeColor=COR_SECUNDARIA,
+            strokeWidth=1,
+        )
+    )
+    for linha in (*_TEXTOS_ESTATICOS, _SUBTITULOS[modelo]):
+        desenho.add(
+            String(linha.x, linha.y, linha.texto, fontName=linha.fonte, fontSize=linha.tamanho, fillColor=linha.cor)
+        )
+    return desenho
+
+
+def _carimbar_camada_estatica(c: canvas.Canvas, modelo: str) -> None:
+    """Desenha a camada fixa em cache como form XObject e a aplica na página."""
+    nome = f"camada-{modelo}"
+    c.beginForm(nome)
+    renderPDF.draw(_camada_estatica(modelo, PDF_TEMPLATE_VERSION, PAGE_SIZE), c, 0, 0)
+    c.endForm()
+    c.doForm(nome)
 
 
 def _draw_text_block(
     c: canvas.Canvas,
     text: str,
-    width: float,
     y_position: float,
     font: str = "Helvetica",
     size: int = 12,
-    color: str = "#1e293b",
-    center: bool = True,
+    color: Color = COR_TEXTO,
 ) -> float:
-    """Desenha um bloco de texto no certificado."""
+    """Desenha um bloco de texto centralizado no certificado."""
     c.setFont(font, size)
-    c.setFillColor(colors.HexColor(color))
-    
-    if center:
-        c.drawCentredString(width / 2, y_position, text)
-    else:
-        c.drawString(3 * cm, y_position, text)
-    
-    return y_position - (size / 72 * 2.54 * cm)  # Converte pontos para cm
+    c.setFillColor(color)
+    c.drawCentredString(WIDTH / 2, y_position, text)
+    return y_position - _altura_linha(size)
 
 
-def _draw_signature_block(c: canvas.Canvas, width: float, height: float) -> None:
-    """Desenha o bloco de assinaturas."""
-    y_position = 4 * cm
-    
-    # Linha de assinatura coordenador
-    c.setStrokeColor(colors.HexColor("#64748b"))
-    c.setLineWidth(1)
-    line_start = width / 2 - 6 * cm
-    line_end = width / 2 + 6 * cm
-    c.line(line_start, y_position, line_end, y_position)
-    
-    # Nome e cargo
-    c.setFont("Helvetica", 10)
-    c.setFillColor(colors.HexColor("#475569"))
-    c.drawCentredString(width / 2, y_position - 0.5 * cm, "Coordenação do Projeto ELLP")
-    c.drawCentredString(width / 2, y_position - 1 * cm, "Universidade Tecnológica Federal do Paraná")
+def _draw_footer(c: canvas.Canvas, hash_validacao: str, codigo: str) -> None:
+    """Desenha a parte variável do rodapé (código e hash de validação)."""
+    c.setFont("Helvetica", 8)
+    c.setFillColor(COR_SECUNDARIA)
+    c.drawCentredString(WIDTH / 2, _Y_RODAPE, f"Código de validação: {codigo}")
+    c.drawCentredString(WIDTH / 2, _Y_RODAPE - 0.4 * cm, f"Hash: {hash_validacao[:32]}...")
 
 
-def _draw_footer(c: canvas.Canvas, width: float, hash_validacao: str, codigo: str) -> None:
-    """Desenha o rodapé com código de validação."""
-    y_position = 2 * cm
-    
-    c.setFont("Helvetica", 8)
-    c.setFillColor(colors.HexColor("#64748b"))
-    c.drawCentredString(width / 2, y_position, f"Código de validação: {codigo}")
-    c.drawCentredString(width / 2, y_position - 0.4 * cm, f"Hash: {hash_validacao[:32]}...")
-    c.drawCentredString(width / 2, y_position - 0.8 * cm, "Valide este certificado em: https://ellp.utfpr.edu.br/validar")
+def _data_emissao(data: datetime | None) -> str:
+    data = data or datetime.now()
+    return f"{data.day:02d} de {MESES_PT[data.month]} de {data.year}"
+
+
+def _gerar_certificado(
+    modelo: str,
+    nome: str,
+    cpf: str | None,
+    texto_oficina: str,
+    titulo_oficina: str,
+    carga_horaria: int,
+    periodo: str,
+    complemento: str,
+    hash_validacao: str,
+    codigo_verificacao: str,
+    data_emissao: datetime | None,
+) -> bytes:
+    inicio = time.perf_counter()
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE, pageCompression=1)
+    _carimbar_camada_estatica(c, modelo)
+
+    # Apenas o texto variável é desenhado por certificado.
+    y_pos = _draw_text_block(c, nome.upper(), _Y_NOME, "Helvetica-Bold", 20, COR_TITULO)
+    y_pos -= 0.3 * cm
+
+    if cpf:
+        y_pos = _draw_text_block(c, f"CPF: {cpf}", y_pos, "Helvetica", 10, COR_SECUNDARIA)
+    y_pos -= 1 * cm
+
+    y_pos = _draw_text_block(c, texto_oficina, y_pos, "Helvetica", 14, COR_CORPO)
+    y_pos -= 0.3 * cm
+
+    y_pos = _draw_text_block(c, f'"{titulo_oficina}"', y_pos, "Helvetica-Bold", 16, COR_TITULO)
+    y_pos -= 1 * cm
+
+    info_oficina = f"com carga horária de {carga_horaria} horas, realizada no período de {periodo},"
+    y_pos = _draw_text_block(c, info_oficina, y_pos, "Helvetica", 12, COR_CORPO)
+    y_pos -= 0.3 * cm
+
+    y_pos = _draw_text_block(c, complemento, y_pos, "Helvetica", 12, COR_CORPO)
+    y_pos -= 1.5 * cm
+
+    _draw_text_block(c, f"Emitido em {_data_emissao(data_emissao)}", y_pos, "Helvetica", 10, COR_SECUNDARIA)
+
+    _draw_footer(c, hash_validacao, codigo_verificacao)
+
+    c.save()
+    PDF_RENDER_SECONDS.observe(time.perf_counter() - inicio)
+    return buffer.getvalue()
 
 
 def gerar_certificado_aluno(
     nome_aluno: str,
-    cpf_aluno: str,
+    cpf_aluno: str | None,
     titulo_oficina: str,
     carga_horaria: int,
     periodo: str,
     percentual_presenca: float,
     hash_validacao: str,
     codigo_verificacao: str,
+    data_emissao: datetime | None = None,
 ) -> bytes:
     """
     Gera certificado de conclusão para aluno.
     
     Args:
         nome_aluno: Nome completo do aluno
-        cpf_aluno: CPF do aluno (formatado)
+        cpf_aluno: CPF do aluno (formatado); a linha é omitida quando ausente
         titulo_oficina: Título da oficina concluída
         carga_horaria: Carga horária total em horas
         periodo: Período de realização (ex: "Janeiro a Março de 2025")
         percentual_presenca: Percentual de presença (0-100)
         hash_validacao: Hash único para validação
         codigo_verificacao: Código de 10 caracteres para validação
+        data_emissao: Data impressa no certificado (default: agora)
     
     Returns:
         Bytes do PDF gerado
     """
-    buffer = io.BytesIO()
-    width, height = landscape(A4)
-    c = canvas.Canvas(buffer, pagesize=landscape(A4))
-    
-    # Desenhar elementos decorativos
-    _draw_border(c, width, height)
-    
-    # Posição inicial
-    y_pos = height - 3 * cm
-    
-    # Cabeçalho
-    y_pos = _draw_header(c, width, y_pos)
-    
-    # Tipo de certificado
-    y_pos = _draw_text_block(c, "de Conclusão", width, y_pos, "Helvetica-Oblique", 14, "#059669")
-    y_pos -= 1 * cm
-    
-    # Texto principal
-    y_pos = _draw_text_block(c, "Certificamos que", width, y_pos, "Helvetica", 14, "#475569")
-    y_pos -= 0.3 * cm
-    
-    # Nome do aluno (destaque)
-    y_pos = _draw_text_block(c, nome_aluno.upper(), width, y_pos, "Helvetica-Bold", 20, "#0f172a")
-    y_pos -= 0.3 * cm
-    
-    # CPF
-    y_pos = _draw_text_block(c, f"CPF: {cpf_aluno}", width, y_pos, "Helvetica", 10, "#64748b")
-    y_pos -= 1 * cm
-    
-    # Texto da oficina
-    texto_oficina = f"concluiu com êxito a oficina"
-    y_pos = _draw_text_block(c, texto_oficina, width, y_pos, "Helvetica", 14, "#475569")
-    y_pos -= 0.3 * cm
-    
-    # Título da oficina (destaque)
-    y_pos = _draw_text_block(c, f'"{titulo_oficina}"', width, y_pos, "Helvetica-Bold", 16, "#0f172a")
-    y_pos -= 1 * cm
-    
-    # Informações da oficina
-    info_oficina = f"com carga horária de {carga_horaria} horas, realizada no período de {periodo},"
-    y_pos = _draw_text_block(c, info_oficina, width, y_pos, "Helvetica", 12, "#475569")
-    y_pos -= 0.3 * cm
-    
-    presenca_texto = f"obtendo {percentual_presenca:.1f}% de frequência."
-    y_pos = _draw_text_block(c, presenca_texto, width, y_pos, "Helvetica", 12, "#475569")
-    y_pos -= 1.5 * cm
-    
-    # Data de emissão
-    data_emissao = datetime.now().strftime("%d de %B de %Y")
-    meses_pt = {
-        "January": "janeiro", "February": "fevereiro", "March": "março",
-        "April": "abril", "May": "maio", "June": "junho",
-        "July": "julho", "August": "agosto", "September": "setembro",
-        "October": "outubro", "November": "novembro", "December": "dezembro"
-    }
-    for en, pt in meses_pt.items():
-        data_emissao = data_emissao.replace(en, pt)
-    
-    y_pos = _draw_text_block(c, f"Emitido em {data_emissao}", width, y_pos, "Helvetica", 10, "#64748b")
-    
-    # Assinaturas
-    _draw_signature_block(c, width, height)
-    
-    # Rodapé com validação
-    _draw_footer(c, width, hash_validacao, codigo_verificacao)
-    
-    c.save()
-    buffer.seek(0)
-    return buffer.read()
+    return _gerar_certificado(
+        "aluno",
+        nome_aluno,
+        cpf_aluno,
+        "concluiu com êxito a oficina",
+        titulo_oficina,
+        carga_horaria,
+        periodo,
+        f"obtendo {percentual_presenca:.1f}% de frequência.",
+        hash_validacao,
+        codigo_verificacao,
+        data_emissao,
+    )
 
 
 def gerar_certificado_tutor(
     nome_tutor: str,
-    cpf_tutor: str,
+    cpf_tutor: str | None,
     titulo_oficina: str,
     carga_horaria: int,
     periodo: str,
     hash_validacao: str,
     codigo_verificacao: str,
+    data_emissao: datetime | None = None,
 ) -> bytes:
     """
     Gera certificado de participação para tutor/voluntário.
     
     Args:
         nome_tutor: Nome completo do tutor
-        cpf_tutor: CPF do tutor (formatado)
+        cpf_tutor: CPF do tutor (formatado); a linha é omitida quando ausente
         titulo_oficina: Título da oficina ministrada
         carga_horaria: Carga horária total em horas
         periodo: Período de realização
         hash_validacao: Hash único para validação
         codigo_verificacao: Código de 10 caracteres
+        data_emissao: Data impressa no certificado (default: agora)
     
     Returns:
         Bytes do PDF gerado
     """
-    buffer = io.BytesIO()
-    width, height = landscape(A4)
-    c = canvas.Canvas(buffer, pagesize=landscape(A4))
-
-    _draw_border(c, width, height)
-
-    y_pos = height - 3 * cm
-
-    y_pos = _draw_header(c, width, y_pos)
-
-    y_pos = _draw_text_block(c, "de Participação como Tutor", width, y_pos, "Helvetica-Oblique", 14, "#059669")
-    y_pos -= 1 * cm
-
-    y_pos = _draw_text_block(c, "Certificamos que", width, y_pos, "Helvetica", 14, "#475569")
-    y_pos -= 0.3 * cm
-
-    y_pos = _draw_text_block(c, nome_tutor.upper(), width, y_pos, "Helvetica-Bold", 20, "#0f172a")
-    y_pos -= 0.3 * cm
-
-    y_pos = _draw_text_block(c, f"CPF: {cpf_tutor}", width, y_pos, "Helvetica", 10, "#64748b")
-    y_pos -= 1 * cm
-    
-    texto_oficina = f"atuou como tutor voluntário na oficina"
-    y_pos = _draw_text_block(c, texto_oficina, width, y_pos, "Helvetica", 14, "#475569")
-    y_pos -= 0.3 * cm
-    
-    y_pos = _draw_text_block(c, f'"{titulo_oficina}"', width, y_pos, "Helvetica-Bold", 16, "#0f172a")
-    y_pos -= 1 * cm
-    
-    info_oficina = f"com carga horária de {carga_horaria} horas, realizada no período de {periodo},"
-    y_pos = _draw_text_block(c, info_oficina, width, y_pos, "Helvetica", 12, "#475569")
-    y_pos -= 0.3 * cm
-
-    contribuicao = "contribuindo para a formação educacional e tecnológica de crianças e jovens."
-    y_pos = _draw_text_block(c, contribuicao, width, y_pos, "Helvetica", 12, "#475569")
-    y_pos -= 1.5 * cm
-
-    data_emissao = datetime.now().strftime("%d de %B de %Y")
-    meses_pt = {
-        "January": "janeiro", "February": "fevereiro", "March": "março",
-        "April": "abril", "May": "maio", "June": "junho",
-        "July": "julho", "August": "agosto", "September": "setembro",
-        "October": "outubro", "November": "novembro", "December": "dezembro"
-    }
-    for en, pt in meses_pt.items():
-        data_emissao = data_emissao.replace(en, pt)
-
-    y_pos = _draw_text_block(c, f"Emitido em {data_emissao}", width, y_pos, "Helvetica", 10, "#64748b")
-
-    _draw_signature_block(c, width, height)
-
-    _draw_footer(c, width, hash_validacao, codigo_verificacao)
-
-    c.save()
-    buffer.seek(0)
-    return buffer.read()
+    return _gerar_certificado(
+        "tutor",
+        nome_tutor,
+        cpf_tutor,
+        "atuou como tutor voluntário na oficina",
+        titulo_oficina,
+        carga_horaria,
+        periodo,
+        "contribuindo para a formação educacional e tecnológica de crianças e jovens.",
+        hash_validacao,
+        codigo_verificacao,
+        data_emissao,
+    )
 
 
 def formatar_cpf(cpf: str) -> str:
@@ -274,24 +315,16 @@ def formatar_cpf(cpf: str) -> str:
 
 def formatar_periodo(data_inicio: str, data_fim: str) -> str:
     """Formata período para exibição."""
-    from datetime import datetime
-    
     try:
         inicio = datetime.fromisoformat(data_inicio.replace("Z", "+00:00"))
         fim = datetime.fromisoformat(data_fim.replace("Z", "+00:00"))
-        
-        meses_pt = {
-            1: "janeiro", 2: "fevereiro", 3: "março", 4: "abril",
-            5: "maio", 6: "junho", 7: "julho", 8: "agosto",
-            9: "setembro", 10: "outubro", 11: "novembro", 12: "dezembro"
-        }
-        
+
         if inicio.year == fim.year:
             if inicio.month == fim.month:
-                return f"{meses_pt[inicio.month]} de {inicio.year}"
+                return f"{MESES_PT[inicio.month]} de {inicio.year}"
             else:
-                return f"{meses_pt[inicio.month]} a {meses_pt[fim.month]} de {inicio.year}"
+                return f"{MESES_PT[inicio.month]} a {MESES_PT[fim.month]} de {inicio.year}"
         else:
-            return f"{meses_pt[inicio.month]}/{inicio.year} a {meses_pt[fim.month]}/{fim.year}"
+            return f"{MESES_PT[inicio.month]}/{inicio.year} a {MESES_PT[fim.month]}/{fim.year}"
     except Exception:
         return f"{data_inicio} a {data_fim}"
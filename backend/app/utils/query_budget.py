@@ -0,0 +1,36 @@
+"""Per-endpoint SQL statement budgets.
+
+Routers declare how many statements one call may issue, authentication included::
+
+    @router.get("/oficinas/{oficina_id}")
+    @query_budget(3)
+    def list_presencas_oficina(...): ...
+
+The budget is a constant: list endpoints rely on eager loading (``selectinload`` or
+grouped queries), so the count must not grow with the number of rows returned. The test
+suite checks every route against its budget on datasets of different sizes, and
+``QueryInstrumentationMiddleware`` logs any request that goes over it in production.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+QUERY_BUDGET_ATTRIBUTE = "__query_budget__"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    if max_queries < 0:
+        raise ValueError("max_queries must not be negative")
+
+    def decorator(endpoint: F) -> F:
+        setattr(endpoint, QUERY_BUDGET_ATTRIBUTE, max_queries)
+        return endpoint
+
+    return decorator
+
+
+def get_query_budget(endpoint: Callable[..., Any] | None) -> int | None:
+    return getattr(endpoint, QUERY_BUDGET_ATTRIBUTE, None)
@@ -1,23 +1,115 @@
 """Security helpers for hashing and JWT handling."""
+import os
+import threading
 import uuid
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from ..config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 settings = get_settings()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+T = TypeVar("T")
+
+# bcrypt is CPU-bound (and releases the GIL), so hashing runs on a small dedicated pool instead of
+# whichever request thread asked for it; the semaphore caps running + queued work.
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_slots: threading.BoundedSemaphore | None = None
+_hash_lock = threading.Lock()
+
+
+class PasswordHashingBusyError(Exception):
+    """Raised when the hashing pool is saturated or a hash does not finish in time."""
+
+    pass
+
+
+def _hash_worker_count() -> int:
+    return settings.password_hash_workers or os.cpu_count() or 1
+
+
+def _get_hash_executor() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    global _hash_executor, _hash_slots
+    with _hash_lock:
+        if _hash_executor is None or _hash_slots is None:
+            workers = _hash_worker_count()
+            _hash_slots = threading.BoundedSemaphore(workers + settings.password_hash_max_pending)
+            _hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        return _hash_executor, _hash_slots
+
+
+def shutdown_password_hashing() -> None:
+    """Stop the hashing pool (recreated on next use)."""
+    global _hash_executor, _hash_slots
+    with _hash_lock:
+        executor, _hash_executor, _hash_slots = _hash_executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _submit_hashing(func: Callable[..., T], *args: Any, wait: float | None = None) -> "Future[T]":
+    executor, slots = _get_hash_executor()
+    acquired = slots.acquire(timeout=wait) if wait else slots.acquire(blocking=False)
+    if not acquired:
+        raise PasswordHashingBusyError("password hashing queue is full")
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _await_hashing(future: "Future[T]") -> T:
+    try:
+        return future.result(timeout=settings.password_hash_timeout_seconds)
+    except FutureTimeoutError as exc:
+        future.cancel()
+        raise PasswordHashingBusyError("password hashing timed out") from exc
+
+
+def _run_hashing(func: Callable[..., T], *args: Any) -> T:
+    return _await_hashing(_submit_hashing(func, *args))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(pwd_context.verify, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run_hashing(pwd_context.hash, password)
+
+
+def get_password_hashes(passwords: Sequence[str]) -> list[str]:
+    """Hash a batch across the pool, in order.
+
+    At most one task per worker is in flight, so interactive logins queue behind a
+    bounded slice of the batch; the batch itself waits for free slots instead of failing.
+    """
+    window: deque[Future[str]] = deque()
+    hashes: list[str] = []
+    try:
+        for password in passwords:
+            if len(window) >= _hash_worker_count():
+                hashes.append(_await_hashing(window.popleft()))
+            window.append(
+                _submit_hashing(pwd_context.hash, password, wait=settings.password_hash_timeout_seconds)
+            )
+        while window:
+            hashes.append(_await_hashing(window.popleft()))
+    finally:
+        for future in window:
+            future.cancel()
+    return hashes
 
 
 def _create_token(*, data: dict[str, Any], expires_minutes: int, secret: str) -> str:
@@ -1,20 +1,138 @@
-"""Upload de arquivos para Supabase Storage."""
+"""Armazenamento de arquivos (PDFs de certificados) com backends plugáveis."""
 from __future__ import annotations
 
 import logging
-from typing import Any
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import Protocol
 
 from supabase import Client, create_client
 
 from ..config import get_settings
+from .metrics import counter, histogram
 
 logger = logging.getLogger(__name__)
 
+# Rota em que a API serve os arquivos do backend "local".
+LOCAL_STORAGE_ROUTE = "/storage"
 
-def _get_supabase_client() -> Client:
-    """Cria cliente Supabase com service role."""
+STORAGE_UPLOAD_SECONDS = histogram(
+    "storage_upload_seconds",
+    "Duração dos uploads de PDF para o armazenamento.",
+    labelnames=("backend",),
+)
+STORAGE_UPLOAD_ERRORS = counter(
+    "storage_upload_errors_total",
+    "Uploads de PDF que falharam.",
+    labelnames=("backend",),
+)
+
+
+class StorageBackend(Protocol):
+    """Contrato mínimo de um backend de armazenamento; caminhos são relativos (``pasta/arquivo``)."""
+
+    def upload(self, data: bytes, path: str, content_type: str) -> str:
+        """Grava (sobrescrevendo) e devolve a URL pública do arquivo."""
+        ...
+
+    def download(self, path: str) -> bytes:
+        ...
+
+    def delete(self, path: str) -> None:
+        ...
+
+
+def _normalizar_caminho(path: str) -> PurePosixPath:
+    caminho = PurePosixPath(path)
+    if caminho.is_absolute() or ".." in caminho.parts or not caminho.parts:
+        raise ValueError(f"Caminho de armazenamento inválido: {path}")
+    return caminho
+
+
+class SupabaseStorageBackend:
+    """Supabase Storage com um único cliente (e sessão HTTP) reutilizado por todo o processo."""
+
+    def __init__(self, url: str, service_role_key: str, bucket: str) -> None:
+        self.url = url
+        self.service_role_key = service_role_key
+        self.bucket = bucket
+        self._client: Client | None = None
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = create_client(self.url, self.service_role_key)
+        return self._client
+
+    def upload(self, data: bytes, path: str, content_type: str) -> str:
+        bucket = self._get_client().storage.from_(self.bucket)
+        bucket.upload(
+            path=path,
+            file=data,
+            file_options={
+                "content-type": content_type,
+                "cache-control": "3600",
+                "upsert": "true",
+            },
+        )
+        return bucket.get_public_url(path)
+
+    def download(self, path: str) -> bytes:
+        return self._get_client().storage.from_(self.bucket).download(path)
+
+    def delete(self, path: str) -> None:
+        self._get_client().storage.from_(self.bucket).remove([path])
+
+
+class LocalStorageBackend:
+    """Grava em disco sob ``root``; os arquivos são servidos pela API em ``LOCAL_STORAGE_ROUTE``."""
+
+    def __init__(self, root: str | Path, base_url: str) -> None:
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def resolve(self, path: str) -> Path:
+        """Caminho em disco de ``path`` (sem garantir que exista)."""
+        return self.root.joinpath(*_normalizar_caminho(path).parts)
+
+    def upload(self, data: bytes, path: str, content_type: str) -> str:
+        destino = self.resolve(path)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        # Escrita atômica: quem estiver baixando nunca vê um arquivo pela metade.
+        fd, temporario = tempfile.mkstemp(dir=destino.parent, prefix=f".{destino.name}.")
+        try:
+            with os.fdopen(fd, "wb") as arquivo:
+                arquivo.write(data)
+            os.replace(temporario, destino)
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+        return f"{self.base_url}/{_normalizar_caminho(path)}"
+
+    def download(self, path: str) -> bytes:
+        return self.resolve(path).read_bytes()
+
+    def delete(self, path: str) -> None:
+        self.resolve(path).unlink(missing_ok=True)
+
+
+@lru_cache
+def get_storage_backend() -> StorageBackend:
+    """Backend configurado em ``STORAGE_BACKEND``, criado uma vez por processo."""
     settings = get_settings()
-    return create_client(settings.supabase_url, settings.supabase_service_role_key)
+    if settings.storage_backend == "local":
+        return LocalStorageBackend(settings.storage_local_root, settings.storage_local_base_url)
+    return SupabaseStorageBackend(
+        settings.supabase_url,
+        settings.supabase_service_role_key,
+        settings.storage_bucket,
+    )
 
 
 def upload_pdf_certificado(
@@ -23,70 +141,56 @@ def upload_pdf_certificado(
     folder: str = "certificados",
 ) -> str:
     """
-    Faz upload de PDF para Supabase Storage.
-    
+    Faz upload de PDF para o backend de armazenamento configurado.
+
     Args:
         pdf_bytes: Conteúdo do PDF em bytes
         filename: Nome do arquivo (deve incluir .pdf)
         folder: Pasta no bucket (default: certificados)
-    
+
     Returns:
         URL pública do arquivo
-    
+
     Raises:
         Exception: Se o upload falhar
     """
+    storage_path = f"{folder}/{filename}"
+    backend = get_settings().storage_backend
+    inicio = time.perf_counter()
     try:
-        supabase = _get_supabase_client()
-        bucket_name = "ellp-files"
-
-        storage_path = f"{folder}/{filename}"
-
-        response = supabase.storage.from_(bucket_name).upload(
-            path=storage_path,
-            file=pdf_bytes,
-            file_options={
-                "content-type": "application/pdf",
-                "cache-control": "3600",
-                "upsert": "true",
-            },
-        )
-
-        public_url = supabase.storage.from_(bucket_name).get_public_url(storage_path)
-        
-        logger.info(f"PDF uploaded successfully: {storage_path}")
-        return public_url
-        
+        public_url = get_storage_backend().upload(pdf_bytes, storage_path, "application/pdf")
     except Exception as e:
+        # Sem URL mock: a fila de PDFs (certificado_pdf_service) reagenda a tentativa.
+        STORAGE_UPLOAD_ERRORS.inc(backend=backend)
         logger.error(f"Erro ao fazer upload do PDF: {e}")
-
-        settings = get_settings()
-        if settings.environment == "development":
-            logger.warning("Usando URL mock devido a erro no upload (dev mode)")
-            return f"https://storage.dev/certificados/{filename}"
         raise
+    finally:
+        STORAGE_UPLOAD_SECONDS.observe(time.perf_counter() - inicio, backend=backend)
+    logger.info(f"PDF uploaded successfully: {storage_path}")
+    return public_url
+
+
+def download_pdf_certificado(filename: str, folder: str = "certificados") -> bytes:
+    """Lê o conteúdo de um PDF do backend de armazenamento configurado."""
+    return get_storage_backend().download(f"{folder}/{filename}")
 
 
 def delete_pdf_certificado(filename: str, folder: str = "certificados") -> bool:
     """
-    Remove PDF do Supabase Storage.
-    
+    Remove PDF do backend de armazenamento configurado.
+
     Args:
         filename: Nome do arquivo
         folder: Pasta no bucket
-    
+
     Returns:
         True se removido com sucesso, False caso contrário
     """
+    storage_path = f"{folder}/{filename}"
     try:
-        supabase = _get_supabase_client()
-        bucket_name = "ellp-files"
-        storage_path = f"{folder}/{filename}"
-        
-        supabase.storage.from_(bucket_name).remove([storage_path])
-        logger.info(f"PDF removed successfully: {storage_path}")
-        return True
-        
+        get_storage_backend().delete(storage_path)
     except Exception as e:
         logger.error(f"Erro ao remover PDF: {e}")
         return False
+    logger.info(f"PDF removed successfully: {storage_path}")
+    return True
@@ -0,0 +1 @@
+"""Benchmarks for hot paths of the API (run from ``backend/`` with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,248 @@
+"""Latency of the hot API endpoints against a large seeded database.
+
+    python -m benchmarks.endpoints --scale 0.1 --repeat 30 --output antes.json
+    python -m benchmarks.endpoints --scale 0.1 --repeat 30 --baseline antes.json
+
+Requests go through the whole ASGI stack (auth, middlewares, serialization) with
+``TestClient``; the database is seeded by ``benchmarks.seed`` on first use and
+reused while its volumes match. Each endpoint reports wall-clock percentiles and
+the SQL statement count from the ``Server-Timing`` header. With ``--baseline``
+the run exits with status 1 when an endpoint's p50 grew beyond ``--tolerance``
+or it issues more statements than before.
+
+Response caches are disabled unless ``--with-caches`` is given, so the numbers
+measure the queries rather than cache hits.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from itertools import cycle
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from fastapi.testclient import TestClient
+    from httpx import Response
+
+    from benchmarks.seed import Dataset
+
+Cenario = Callable[["TestClient", dict[str, str]], "Response"]
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def cenarios(dataset: Dataset) -> dict[str, Cenario]:
+    """One request factory per benchmarked endpoint; ids rotate through the dataset sample."""
+    concluidas = cycle(dataset.oficinas_concluidas)
+    alunos = cycle(dataset.alunos)
+    hashes = cycle(dataset.hashes_certificados)
+    chamadas = cycle(sorted(dataset.chamadas.items()))
+
+    def registrar_lote(client: TestClient, headers: dict[str, str]) -> Response:
+        data_aula, registros = next(chamadas)
+        return client.post(
+            f"/presencas/oficinas/{dataset.oficina_chamada}",
+            headers=headers,
+            json={
+                "data_aula": data_aula.isoformat(),
+                "registros": [
+                    {"inscricao_id": str(inscricao_id), "presente": presente}
+                    for inscricao_id, presente in registros.items()
+                ],
+            },
+        )
+
+    return {
+        "list_oficinas": lambda client, headers: client.get("/oficinas", params={"limit": 50}, headers=headers),
+        "registrar_lote": registrar_lote,
+        "relatorio_frequencia": lambda client, headers: client.get(
+            f"/relatorios/frequencia/{next(concluidas)}", headers=headers
+        ),
+        "relatorio_certificados": lambda client, headers: client.get(
+            "/relatorios/certificados", params={"limit": 50}, headers=headers
+        ),
+        "metricas_gerais": lambda client, headers: client.get("/dashboard/metricas", headers=headers),
+        "historico_aluno": lambda client, headers: client.get(f"/historicos/alunos/{next(alunos)}", headers=headers),
+        "validar": lambda client, headers: client.get(f"/certificados/validar/{next(hashes)}"),
+    }
+
+
+def _percentil(ordenados: list[float], fracao: float) -> float:
+    indice = min(len(ordenados) - 1, max(0, round(fracao * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def medir(
+    client: TestClient,
+    headers: dict[str, str],
+    cenario: Cenario,
+    *,
+    repeat: int,
+    warmup: int = 1,
+) -> dict[str, Any]:
+    """Time ``repeat`` calls of ``cenario`` after ``warmup`` unmeasured ones."""
+    for _ in range(warmup):
+        response = cenario(client, headers)
+        response.raise_for_status()
+    tempos: list[float] = []
+    queries: list[int] = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        response = cenario(client, headers)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        response.raise_for_status()
+        match = _QUERIES.search(response.headers.get("server-timing", ""))
+        if match:
+            queries.append(int(match.group(1)))
+    ordenados = sorted(tempos)
+    return {
+        "calls": repeat,
+        "p50_ms": round(statistics.median(ordenados), 3),
+        "p95_ms": round(_percentil(ordenados, 0.95), 3),
+        "mean_ms": round(statistics.fmean(ordenados), 3),
+        "min_ms": round(ordenados[0], 3),
+        "max_ms": round(ordenados[-1], 3),
+        "queries": max(queries) if queries else None,
+    }
+
+
+def executar(
+    client: TestClient,
+    headers: dict[str, str],
+    dataset: Dataset,
+    *,
+    repeat: int,
+    warmup: int = 1,
+    apenas: set[str] | None = None,
+) -> dict[str, dict[str, Any]]:
+    return {
+        nome: medir(client, headers, cenario, repeat=repeat, warmup=warmup)
+        for nome, cenario in cenarios(dataset).items()
+        if not apenas or nome in apenas
+    }
+
+
+def comparar(
+    atual: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    tolerancia: float,
+) -> list[str]:
+    """Human-readable regressions of ``atual`` against ``baseline`` (empty when none)."""
+    regressoes = []
+    for nome, resultado in atual.items():
+        anterior = baseline.get(nome)
+        if not anterior:
+            continue
+        if resultado["p50_ms"] > anterior["p50_ms"] * (1 + tolerancia):
+            regressoes.append(f"{nome}: p50 {anterior['p50_ms']:.1f} ms -> {resultado['p50_ms']:.1f} ms")
+        if None not in (resultado["queries"], anterior["queries"]) and resultado["queries"] > anterior["queries"]:
+            regressoes.append(f"{nome}: {anterior['queries']} -> {resultado['queries']} queries")
+    return regressoes
+
+
+def _commit() -> str | None:
+    try:
+        saida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+def _configurar_ambiente(database_url: str, *, caches: bool) -> None:
+    # Settings are read once at import time, so this must run before anything under ``app``.
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["PDF_WORKER_ENABLED"] = "false"
+    os.environ.setdefault("DB_SLOW_QUERY_MS", "60000")
+    if not caches:
+        os.environ["DASHBOARD_CACHE_TTL_SECONDS"] = "0"
+        os.environ["VALIDACAO_CACHE_TTL_SECONDS"] = "0"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="default: sqlite:///benchmarks/.data/bench-<scale>.db")
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", action="append", help="run just this endpoint (repeatable)")
+    parser.add_argument("--with-caches", action="store_true")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///benchmarks/.data/bench-{args.scale:g}.db"
+    _configurar_ambiente(database_url, caches=args.with_caches)
+
+    import sqlalchemy
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+
+    from app.database import engine
+    from app.main import app
+    from benchmarks.seed import ADMIN_EMAIL, ADMIN_PASSWORD, Volumes, contar, criar_engine, preparar
+
+    criar_engine(database_url).dispose()  # creates the sqlite directory
+    inicio = time.perf_counter()
+    dataset = preparar(engine, Volumes().escalar(args.scale), seed=args.seed, recriar=args.reseed)
+    print(f"dataset ready in {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+    with TestClient(app) as client:
+        login = client.post("/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        resultados = executar(
+            client, headers, dataset, repeat=args.repeat, warmup=args.warmup, apenas=set(args.only or ())
+        )
+
+    with Session(engine) as db:
+        tabelas = contar(db)
+    relatorio = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "dialect": engine.dialect.name,
+            "scale": args.scale,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "caches": args.with_caches,
+            "tables": tabelas,
+        },
+        "endpoints": resultados,
+    }
+
+    for nome, resultado in resultados.items():
+        print(
+            f"{nome:>24}: p50 {resultado['p50_ms']:8.1f} ms  p95 {resultado['p95_ms']:8.1f} ms  "
+            f"{resultado['queries']} queries"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(relatorio, indent=2) + "\n")
+
+    if args.baseline:
+        anterior = json.loads(args.baseline.read_text())
+        regressoes = comparar(resultados, anterior["endpoints"], args.tolerance)
+        for regressao in regressoes:
+            print(f"REGRESSION {regressao}", file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
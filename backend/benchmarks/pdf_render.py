@@ -0,0 +1,65 @@
+"""Certificate PDF rendering throughput.
+
+    python -m benchmarks.pdf_render --count 500
+
+Prints certificates per second for each template; compare runs before and
+after a change to ``app/utils/pdf_generator.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.utils.pdf_generator import gerar_certificado_aluno, gerar_certificado_tutor
+
+_WARMUP = 20
+
+
+def _aluno(index: int) -> bytes:
+    return gerar_certificado_aluno(
+        nome_aluno=f"Maria Silva Santos {index}",
+        cpf_aluno=None,
+        titulo_oficina="Introdução à Programação com Scratch",
+        carga_horaria=40,
+        periodo="janeiro a março de 2025",
+        percentual_presenca=92.5,
+        hash_validacao=f"{index:032x}",
+        codigo_verificacao="ABCD123456",
+    )
+
+
+def _tutor(index: int) -> bytes:
+    return gerar_certificado_tutor(
+        nome_tutor=f"João Pedro Oliveira {index}",
+        cpf_tutor=None,
+        titulo_oficina="Robótica Educacional com LEGO Mindstorms",
+        carga_horaria=30,
+        periodo="fevereiro a abril de 2025",
+        hash_validacao=f"{index:032x}",
+        codigo_verificacao="XYZ9876543",
+    )
+
+
+def medir(render, count: int) -> tuple[float, int]:
+    """Return (certificates per second, average PDF size in bytes)."""
+    for index in range(_WARMUP):
+        render(index)
+    total_bytes = 0
+    inicio = time.perf_counter()
+    for index in range(count):
+        total_bytes += len(render(index))
+    return count / (time.perf_counter() - inicio), total_bytes // count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+
+    for nome, render in (("aluno", _aluno), ("tutor", _tutor)):
+        por_segundo, tamanho = medir(render, args.count)
+        print(f"{nome}: {por_segundo:8.1f} certificados/s  ({tamanho} bytes/PDF)")
+
+
+if __name__ == "__main__":
+    main()
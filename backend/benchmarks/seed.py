@@ -0,0 +1,335 @@
+"""Deterministic large dataset for the endpoint benchmarks.
+
+    python -m benchmarks.seed --database-url sqlite:///benchmarks/.data/bench.db --scale 0.1
+
+Default volumes model a mature deployment (500 oficinas, 20k alunos, 100k
+inscrições, 2M presenças, 30k certificados); ``--scale`` shrinks every volume
+proportionally. Rows go in through chunked executemany inserts, and the same
+seed and volumes always produce the same data.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, func, insert, make_url, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Aluno,
+    Base,
+    Certificado,
+    CertificadoPdfStatus,
+    CertificadoTipo,
+    Inscricao,
+    InscricaoStatus,
+    Oficina,
+    OficinaStatus,
+    Pessoa,
+    Presenca,
+    Professor,
+    Tema,
+    Tutor,
+    User,
+    UserRole,
+)
+from app.models.oficina import oficina_tutor_table
+from app.models.tema import oficina_tema_table
+from app.services import oficina_service
+from app.utils import get_password_hash
+
+ADMIN_EMAIL = "bench-admin@ellp.test"
+ADMIN_PASSWORD = "benchmark123"
+
+_CHUNK = 20_000
+# Oficina status by index: 40% concluded, 20% running, the rest not started.
+_STATUS_CICLO = (
+    OficinaStatus.CONCLUIDA,
+    OficinaStatus.CONCLUIDA,
+    OficinaStatus.EM_ANDAMENTO,
+    OficinaStatus.INSCRICOES_ABERTAS,
+    OficinaStatus.PLANEJADA,
+)
+_COM_AULAS = (OficinaStatus.CONCLUIDA, OficinaStatus.EM_ANDAMENTO)
+_TUTORES_POR_OFICINA = 2
+
+
+@dataclass(frozen=True)
+class Volumes:
+    oficinas: int = 500
+    alunos: int = 20_000
+    inscricoes: int = 100_000
+    presencas: int = 2_000_000
+    certificados: int = 30_000
+    tutores: int = 400
+    professores: int = 60
+    temas: int = 24
+
+    def escalar(self, fator: float) -> Volumes:
+        return Volumes(**{nome: max(1, round(valor * fator)) for nome, valor in asdict(self).items()})
+
+
+@dataclass
+class Dataset:
+    """Ids the benchmark harness builds its requests from (a stable sample of each table)."""
+
+    oficinas_concluidas: list[uuid.UUID] = field(default_factory=list)
+    # The running oficina that registrar_lote writes to: stored attendance per class date, so
+    # replaying a roll call exercises the write path without drifting the dataset between runs.
+    oficina_chamada: uuid.UUID | None = None
+    chamadas: dict[date, dict[uuid.UUID, bool]] = field(default_factory=dict)
+    alunos: list[uuid.UUID] = field(default_factory=list)
+    hashes_certificados: list[str] = field(default_factory=list)
+
+
+def _inserir(db: Session, model, rows: list[dict]) -> None:
+    for inicio in range(0, len(rows), _CHUNK):
+        db.execute(insert(model), rows[inicio : inicio + _CHUNK])
+
+
+def _pessoas(
+    db: Session,
+    rng: random.Random,
+    role: UserRole,
+    quantidade: int,
+    senha_hash: str,
+) -> list[uuid.UUID]:
+    """Insert ``quantidade`` users of ``role`` with their pessoa rows; returns the pessoa ids."""
+    users, pessoas = [], []
+    for indice in range(quantidade):
+        user_id, pessoa_id = uuid.UUID(int=rng.getrandbits(128)), uuid.UUID(int=rng.getrandbits(128))
+        users.append(
+            {"id": user_id, "email": f"{role.value}{indice}@bench.test", "senha_hash": senha_hash, "role": role.value}
+        )
+        pessoas.append({"id": pessoa_id, "user_id": user_id, "nome_completo": f"{role.value.title()} {indice}"})
+    _inserir(db, User, users)
+    _inserir(db, Pessoa, pessoas)
+    return [row["id"] for row in pessoas]
+
+
+def popular(db: Session, volumes: Volumes, *, seed: int = 42) -> None:
+    """Insert the whole dataset through ``db`` and commit; the schema must already exist."""
+    rng = random.Random(seed)
+
+    def novo_id() -> uuid.UUID:
+        # Seeded stand-in for uuid4, so reruns produce the same ids.
+        return uuid.UUID(int=rng.getrandbits(128))
+
+    senha_hash = get_password_hash(ADMIN_PASSWORD)
+
+    admin_id = novo_id()
+    _inserir(db, User, [{"id": admin_id, "email": ADMIN_EMAIL, "senha_hash": senha_hash, "role": UserRole.ADMIN.value}])
+    _inserir(db, Pessoa, [{"id": novo_id(), "user_id": admin_id, "nome_completo": "Admin Benchmark"}])
+
+    professores = [
+        {"id": novo_id(), "pessoa_id": pessoa_id, "faculdade": "UTFPR"}
+        for pessoa_id in _pessoas(db, rng, UserRole.PROFESSOR, volumes.professores, senha_hash)
+    ]
+    tutores = [
+        {"id": novo_id(), "pessoa_id": pessoa_id, "faculdade": "UTFPR"}
+        for pessoa_id in _pessoas(db, rng, UserRole.TUTOR, volumes.tutores, senha_hash)
+    ]
+    alunos = [
+        {
+            "id": novo_id(),
+            "pessoa_id": pessoa_id,
+            "responsavel_nome": "Responsável",
+            "responsavel_telefone": "43999990000",
+            "escola": f"Escola {indice % 40}",
+        }
+        for indice, pessoa_id in enumerate(_pessoas(db, rng, UserRole.ALUNO, volumes.alunos, senha_hash))
+    ]
+    _inserir(db, Professor, professores)
+    _inserir(db, Tutor, tutores)
+    _inserir(db, Aluno, alunos)
+    aluno_ids = [row["id"] for row in alunos]
+    # Per-aluno attendance rate, so some inscrições end below the 75% certificate threshold.
+    assiduidade = {aluno_id: rng.uniform(0.55, 1.0) for aluno_id in aluno_ids}
+
+    temas = [{"id": novo_id(), "nome": f"Tema {indice}"} for indice in range(volumes.temas)]
+    _inserir(db, Tema, temas)
+
+    status_oficinas = [_STATUS_CICLO[indice % len(_STATUS_CICLO)] for indice in range(volumes.oficinas)]
+    base, resto = divmod(volumes.inscricoes, volumes.oficinas)
+    inscritos = [min(base + (indice < resto), volumes.alunos) for indice in range(volumes.oficinas)]
+    com_aulas = sum(n for n, situacao in zip(inscritos, status_oficinas) if situacao in _COM_AULAS)
+    aulas = max(1, round(volumes.presencas / com_aulas)) if com_aulas else 0
+
+    hoje = date.today()
+    oficinas, oficina_temas, oficina_tutores = [], [], []
+    inscricoes, presencas, certificados = [], [], []
+    codigos: set[str] = set()
+    for indice, (situacao, quantidade) in enumerate(zip(status_oficinas, inscritos)):
+        oficina_id = novo_id()
+        if situacao == OficinaStatus.CONCLUIDA:
+            data_inicio = hoje - timedelta(days=7 * aulas + 30 + indice % 300)
+        elif situacao == OficinaStatus.EM_ANDAMENTO:
+            data_inicio = hoje - timedelta(days=7 * aulas)
+        else:
+            data_inicio = hoje + timedelta(days=14 + indice % 60)
+        datas_aulas = [data_inicio + timedelta(days=7 * semana) for semana in range(aulas)]
+        oficinas.append(
+            {
+                "id": oficina_id,
+                "professor_id": professores[indice % len(professores)]["id"],
+                "titulo": f"Oficina {indice}",
+                "carga_horaria": 2 * max(aulas, 1),
+                "capacidade_maxima": quantidade + 10,
+                "numero_aulas": max(aulas, 1),
+                "data_inicio": data_inicio,
+                "data_fim": data_inicio + timedelta(days=7 * max(aulas, 1)),
+                "local": "Campus",
+                "status": situacao,
+            }
+        )
+        oficina_temas.append({"oficina_id": oficina_id, "tema_id": temas[indice % len(temas)]["id"]})
+        for deslocamento in range(min(_TUTORES_POR_OFICINA, len(tutores))):
+            tutor = tutores[(indice * _TUTORES_POR_OFICINA + deslocamento) % len(tutores)]
+            oficina_tutores.append({"oficina_id": oficina_id, "tutor_id": tutor["id"]})
+
+        primeiro_aluno = rng.randrange(volumes.alunos)
+        for posicao in range(quantidade):
+            aluno_id = aluno_ids[(primeiro_aluno + posicao) % volumes.alunos]
+            inscricao_id = novo_id()
+            row = {"id": inscricao_id, "aluno_id": aluno_id, "oficina_id": oficina_id, "status": InscricaoStatus.INSCRITO}
+            if situacao in _COM_AULAS:
+                presentes = 0
+                for data_aula in datas_aulas:
+                    presente = rng.random() < assiduidade[aluno_id]
+                    presentes += presente
+                    presencas.append({"inscricao_id": inscricao_id, "data_aula": data_aula, "presente": presente})
+                percentual = round(presentes / aulas * 100, 2)
+                concluida = situacao == OficinaStatus.CONCLUIDA
+                row.update(
+                    status=InscricaoStatus.CONCLUIDO if concluida else InscricaoStatus.EM_ANDAMENTO,
+                    total_aulas_previstas=aulas,
+                    total_presencas=presentes,
+                    total_faltas=aulas - presentes,
+                    percentual_presenca=percentual,
+                    apto_certificado=concluida and percentual >= 75.0,
+                )
+                if row["apto_certificado"] and len(certificados) < volumes.certificados:
+                    hash_validacao = hashlib.sha256(inscricao_id.bytes).hexdigest()
+                    codigo = next(
+                        hash_validacao[inicio : inicio + 10].upper()
+                        for inicio in range(0, 54, 10)
+                        if hash_validacao[inicio : inicio + 10].upper() not in codigos
+                    )
+                    codigos.add(codigo)
+                    certificados.append(
+                        {
+                            "inscricao_id": inscricao_id,
+                            "oficina_id": oficina_id,
+                            "tipo": CertificadoTipo.CONCLUSAO_ALUNO,
+                            "hash_validacao": hash_validacao,
+                            "codigo_verificacao": codigo,
+                            "pdf_status": CertificadoPdfStatus.PRONTO,
+                            "carga_horaria_certificada": 2 * aulas,
+                            "percentual_presenca_certificado": percentual,
+                            "revogado": False,
+                        }
+                    )
+            inscricoes.append(row)
+            # Flushed as they fill up so 2M presenças never sit in memory at once.
+            if len(presencas) >= _CHUNK * 5:
+                _flush_pendentes(db, oficinas, oficina_temas, oficina_tutores, inscricoes, presencas)
+
+    _flush_pendentes(db, oficinas, oficina_temas, oficina_tutores, inscricoes, presencas)
+    _inserir(db, Certificado, certificados)
+    db.commit()
+    oficina_service.recalcular_totais(db)
+
+
+def _flush_pendentes(db: Session, oficinas, oficina_temas, oficina_tutores, inscricoes, presencas) -> None:
+    # Parents first: every pending child row references an already pending or inserted parent.
+    _inserir(db, Oficina, oficinas)
+    if oficina_temas:
+        db.execute(insert(oficina_tema_table), oficina_temas)
+    if oficina_tutores:
+        db.execute(insert(oficina_tutor_table), oficina_tutores)
+    _inserir(db, Inscricao, inscricoes)
+    _inserir(db, Presenca, presencas)
+    for pendentes in (oficinas, oficina_temas, oficina_tutores, inscricoes, presencas):
+        pendentes.clear()
+
+
+def carregar(db: Session, *, amostra: int = 1000) -> Dataset:
+    """Read the harness ids back from a seeded database, in a stable order."""
+    dataset = Dataset()
+    dataset.oficinas_concluidas = list(
+        db.scalars(
+            select(Oficina.id).where(Oficina.status == OficinaStatus.CONCLUIDA).order_by(Oficina.id).limit(amostra)
+        )
+    )
+    dataset.oficina_chamada = db.scalar(
+        select(Oficina.id).where(Oficina.status == OficinaStatus.EM_ANDAMENTO).order_by(Oficina.id).limit(1)
+    )
+    if dataset.oficina_chamada is not None:
+        rows = db.execute(
+            select(Presenca.data_aula, Presenca.inscricao_id, Presenca.presente)
+            .join(Inscricao, Inscricao.id == Presenca.inscricao_id)
+            .where(Inscricao.oficina_id == dataset.oficina_chamada)
+            .order_by(Presenca.data_aula, Presenca.inscricao_id)
+        )
+        for data_aula, inscricao_id, presente in rows:
+            dataset.chamadas.setdefault(data_aula, {})[inscricao_id] = presente
+    dataset.alunos = list(db.scalars(select(Aluno.id).order_by(Aluno.id).limit(amostra)))
+    dataset.hashes_certificados = list(
+        db.scalars(select(Certificado.hash_validacao).order_by(Certificado.hash_validacao).limit(amostra))
+    )
+    return dataset
+
+
+def contar(db: Session) -> dict[str, int]:
+    return {
+        model.__tablename__: db.scalar(select(func.count()).select_from(model)) or 0
+        for model in (Oficina, Aluno, Inscricao, Presenca, Certificado)
+    }
+
+
+def preparar(engine: Engine, volumes: Volumes, *, seed: int = 42, recriar: bool = False) -> Dataset:
+    """Seed ``engine`` unless it already holds exactly these volumes; ``recriar`` always rebuilds."""
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        if not recriar and contar(db)["oficinas"] == volumes.oficinas and db.scalar(
+            select(func.count()).select_from(User).where(User.email == ADMIN_EMAIL)
+        ):
+            return carregar(db)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        popular(db, volumes, seed=seed)
+        return carregar(db)
+
+
+def criar_engine(database_url: str) -> Engine:
+    url = make_url(database_url)
+    if url.drivername.startswith("sqlite") and url.database not in (None, "", ":memory:"):
+        Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+    return create_engine(database_url)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite:///benchmarks/.data/bench.db")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = criar_engine(args.database_url)
+    inicio = time.perf_counter()
+    preparar(engine, Volumes().escalar(args.scale), seed=args.seed, recriar=True)
+    with Session(engine) as db:
+        for tabela, total in contar(db).items():
+            print(f"{tabela:>12}: {total}")
+    print(f"seeded in {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
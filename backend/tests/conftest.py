@@ -1,21 +1,31 @@
 """Pytest fixtures for backend tests."""
 from __future__ import annotations
 
+import os
 import uuid
 from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import date, timedelta
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+# Minimum bcrypt cost: hashing speed is not under test and dominates fixture setup otherwise.
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Render PDFs in-thread unless a test opts into the process pool: spawning workers dominates otherwise.
+os.environ.setdefault("PDF_RENDER_PROCESSES", "0")
+
+from app.config import get_settings
 from app.main import app
-from app.database import get_db
+from app.database import get_db, instrument_engine
+from app.middlewares.auth_middleware import invalidar_usuario
 from app.models import Aluno, Base, Inscricao, Oficina, Pessoa, Professor, Tema, Tutor, User
 from app.models.oficina import OficinaStatus
 from app.models.inscricao import InscricaoStatus
+from app.services import auth_service, certificado_service, dashboard_service
 from app.utils import get_password_hash
 
 TEST_DATABASE_URL = "sqlite+pysqlite:///:memory:"
@@ -26,6 +36,7 @@ engine = create_engine(
     poolclass=StaticPool,
     future=True,
 )
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
@@ -36,6 +47,25 @@ def prepare_database() -> Iterator[None]:
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_caches() -> Iterator[None]:
+    dashboard_service.invalidar_cache()
+    certificado_service.invalidar_validacao()
+    invalidar_usuario()
+    auth_service.reset_login_throttle()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolate_pdf_cache(tmp_path) -> Iterator[None]:
+    # Set directly (not via monkeypatch) so tests calling monkeypatch.undo() keep the isolation.
+    settings = get_settings()
+    original = settings.pdf_cache_dir
+    settings.pdf_cache_dir = str(tmp_path / "pdf-cache")
+    yield
+    settings.pdf_cache_dir = original
+
+
 @pytest.fixture()
 def db_session() -> Iterator[Session]:
     session = TestingSessionLocal()
@@ -64,6 +94,41 @@ def client() -> TestClient:
     return TestClient(app)
 
 
+@contextmanager
+def _capture_statements() -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@pytest.fixture()
+def capture_statements():
+    """Context manager factory recording every SQL statement sent to the test engine."""
+    return _capture_statements
+
+
+@contextmanager
+def _assert_max_queries(limit: int) -> Iterator[list[str]]:
+    with _capture_statements() as statements:
+        yield statements
+    assert len(statements) <= limit, f"{len(statements)} statements over a budget of {limit}:\n" + "\n".join(
+        statements
+    )
+
+
+@pytest.fixture()
+def assert_max_queries():
+    """Like ``capture_statements``, failing when the block issues more than ``limit`` statements."""
+    return _assert_max_queries
+
+
 def _seed_user(
     session: Session,
     *,
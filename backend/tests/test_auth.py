@@ -1,5 +1,12 @@
 """Authentication endpoint tests."""
+import threading
+import uuid
+
 from fastapi import status
+from sqlalchemy import update
+
+from app.config import get_settings
+from app.models import User
 
 
 def test_login_success(client, admin_user):
@@ -55,3 +62,143 @@ def test_me_returns_authenticated_profile(client, admin_user):
     payload = response.json()
     assert payload["email"] == admin_user.email
     assert payload["role"] == "admin"
+
+
+def _bearer(client, email, password):
+    token = client.post("/auth/login", json={"email": email, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _user_loads(statements):
+    return [stmt for stmt in statements if "FROM users" in stmt]
+
+
+def test_me_reuses_cached_user_for_same_token(client, admin_user, capture_statements):
+    headers = _bearer(client, admin_user.email, "admin12345")
+    assert client.get("/auth/me", headers=headers).status_code == status.HTTP_200_OK
+
+    with capture_statements() as statements:
+        response = client.get("/auth/me", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["email"] == admin_user.email
+    assert _user_loads(statements) == []
+
+
+def test_deactivated_user_is_rejected_despite_cache(client, admin_user, db_session):
+    headers = _bearer(client, admin_user.email, "admin12345")
+    assert client.get("/auth/me", headers=headers).status_code == status.HTTP_200_OK
+
+    admin_user.ativo = False
+    db_session.commit()
+
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()["detail"] == "Usuário desativado"
+
+
+def test_role_rejection_served_from_cached_user(client, tutor_user, capture_statements):
+    headers = _bearer(client, tutor_user.email, "tutor12345")
+    assert client.get("/users/admins", headers=headers).status_code == status.HTTP_403_FORBIDDEN
+
+    with capture_statements() as statements:
+        response = client.get("/users/admins", headers=headers)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert _user_loads(statements) == []
+
+
+def test_role_change_applies_to_existing_token(client, tutor_user, db_session):
+    headers = _bearer(client, tutor_user.email, "tutor12345")
+    assert client.get("/users/admins", headers=headers).status_code == status.HTTP_403_FORBIDDEN
+
+    tutor_user.role = "admin"
+    db_session.commit()
+
+    assert client.get("/users/admins", headers=headers).status_code == status.HTTP_200_OK
+
+
+def test_user_versions_are_bounded(monkeypatch):
+    from app.middlewares import auth_middleware
+    from app.utils import MemoryCache
+
+    monkeypatch.setattr(auth_middleware, "_user_versions", MemoryCache(maxsize=3))
+    for _ in range(10):
+        auth_middleware._user_version(str(uuid.uuid4()))
+
+    assert len(auth_middleware._user_versions) == 3
+
+
+def test_evicted_version_never_serves_an_older_snapshot(client, tutor_user, db_session, monkeypatch):
+    from app.middlewares import auth_middleware
+    from app.utils import MemoryCache
+
+    monkeypatch.setattr(auth_middleware, "_user_versions", MemoryCache(maxsize=1))
+    headers = _bearer(client, tutor_user.email, "tutor12345")
+    assert client.get("/users/admins", headers=headers).status_code == status.HTTP_403_FORBIDDEN
+
+    # Bulk UPDATE: no ORM change event, so only the eviction below can retire the snapshot.
+    db_session.execute(update(User).where(User.id == tutor_user.id).values(role="admin"))
+    db_session.commit()
+    auth_middleware._user_version(str(uuid.uuid4()))
+
+    assert client.get("/users/admins", headers=headers).status_code == status.HTTP_200_OK
+
+
+def test_login_throttled_per_email_before_hashing(client, admin_user, monkeypatch):
+    from app.services import auth_service
+
+    monkeypatch.setattr(get_settings(), "login_max_attempts", 3)
+    for _ in range(3):
+        response = client.post("/auth/login", json={"email": admin_user.email, "password": "wrong"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def _no_hashing(*_args):
+        raise AssertionError("bcrypt must not run for a throttled e-mail")
+
+    monkeypatch.setattr(auth_service, "verify_password", _no_hashing)
+    response = client.post("/auth/login", json={"email": admin_user.email.upper(), "password": "admin12345"})
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["retry-after"]) > 0
+
+
+def test_successful_login_resets_attempts(client, admin_user, monkeypatch):
+    monkeypatch.setattr(get_settings(), "login_max_attempts", 2)
+    client.post("/auth/login", json={"email": admin_user.email, "password": "wrong"})
+    assert client.post(
+        "/auth/login", json={"email": admin_user.email, "password": "admin12345"}
+    ).status_code == status.HTTP_200_OK
+
+    response = client.post("/auth/login", json={"email": admin_user.email, "password": "wrong"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_returns_503_when_hashing_pool_is_saturated(client, admin_user, monkeypatch):
+    from app.utils import security
+
+    security.shutdown_password_hashing()
+    monkeypatch.setattr(get_settings(), "password_hash_workers", 1)
+    monkeypatch.setattr(get_settings(), "password_hash_max_pending", 0)
+    started, release = threading.Event(), threading.Event()
+
+    def _slow_hash():
+        started.set()
+        release.wait()
+
+    # Occupy the only slot from another thread.
+    worker = threading.Thread(target=security._run_hashing, args=(_slow_hash,))
+    worker.start()
+    assert started.wait(5)
+    try:
+        response = client.post("/auth/login", json={"email": admin_user.email, "password": "admin12345"})
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"] == "1"
+    finally:
+        release.set()
+        worker.join()
+        security.shutdown_password_hashing()
+
+    assert client.post(
+        "/auth/login", json={"email": admin_user.email, "password": "admin12345"}
+    ).status_code == status.HTTP_200_OK
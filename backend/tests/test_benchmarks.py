@@ -0,0 +1,44 @@
+"""Smoke test for the endpoint benchmark harness (tiny volumes, one timed call each)."""
+from benchmarks.endpoints import cenarios, comparar, executar
+from benchmarks.seed import ADMIN_EMAIL, ADMIN_PASSWORD, Volumes, carregar, contar, popular
+
+
+def _auth_headers(client, email, password):
+    token = client.post(
+        "/auth/login",
+        json={"email": email, "password": password},
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_seed_e_cenarios_respondem(client, db_session):
+    volumes = Volumes(
+        oficinas=5, alunos=40, inscricoes=100, presencas=600, certificados=10, tutores=4, professores=2, temas=3
+    )
+    popular(db_session, volumes)
+    dataset = carregar(db_session)
+
+    assert contar(db_session) == {
+        "oficinas": 5,
+        "alunos": 40,
+        "inscricoes": 100,
+        "presencas": 600,
+        "certificados": 10,
+    }
+    assert dataset.oficina_chamada and dataset.chamadas and dataset.alunos
+
+    headers = _auth_headers(client, ADMIN_EMAIL, ADMIN_PASSWORD)
+    resultados = executar(client, headers, dataset, repeat=1)
+
+    assert set(resultados) == set(cenarios(dataset))
+    assert all(resultado["calls"] == 1 and resultado["queries"] is not None for resultado in resultados.values())
+
+
+def test_comparar_aponta_regressoes():
+    baseline = {"validar": {"p50_ms": 10.0, "queries": 2}}
+
+    assert comparar({"validar": {"p50_ms": 11.0, "queries": 2}}, baseline, 0.2) == []
+    assert comparar({"validar": {"p50_ms": 13.0, "queries": 3}}, baseline, 0.2) == [
+        "validar: p50 10.0 ms -> 13.0 ms",
+        "validar: 2 -> 3 queries",
+    ]
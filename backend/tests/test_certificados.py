@@ -1,8 +1,35 @@
 """API tests for RF-008/RF-033/RF-034/RF-035 (Certificados)."""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID
 
+import pytest
 from fastapi import status
+from sqlalchemy import select
 
+from app.config import Settings, get_settings
+from app.models import Certificado, CertificadoPdfJob, CertificadoTipo, PdfJobStatus
 from app.models.oficina import OficinaStatus
+from app.services import certificado_pdf_service, certificado_service
+
+
+@pytest.fixture
+def fake_storage(monkeypatch):
+    uploads = []
+
+    def _upload(pdf_bytes, filename, folder="certificados"):
+        uploads.append((folder, filename, pdf_bytes))
+        return f"https://storage.test/{folder}/{filename}"
+
+    def _download(filename, folder="certificados"):
+        return next(pdf for pasta, nome, pdf in reversed(uploads) if (pasta, nome) == (folder, filename))
+
+    monkeypatch.setattr(certificado_pdf_service, "upload_pdf_certificado", _upload)
+    monkeypatch.setattr(certificado_pdf_service, "download_pdf_certificado", _download)
+    monkeypatch.setattr(certificado_pdf_service, "delete_pdf_certificado", lambda filename, folder="certificados": True)
+    return uploads
 
 
 def _auth_headers(client, email, password):
@@ -111,6 +138,8 @@ def test_download_certificado_retorna_url(
     tutor_user,
     oficina,
     aluno_entity,
+    db_session,
+    fake_storage,
 ):
     admin_headers = _auth_headers(client, admin_user.email, "admin12345")
     inscricao_id = _criar_inscricao(client, admin_headers, oficina.id, aluno_entity.id)
@@ -134,6 +163,8 @@ def test_download_certificado_retorna_url(
         headers=tutor_headers,
     )
     certificado_id = emissao.json()["id"]
+    assert emissao.json()["pdf_status"] == "pdf_pendente"
+    assert certificado_pdf_service.processar_pendentes(db_session) == 1
 
     download = client.get(
         f"/certificados/{certificado_id}/download",
@@ -213,6 +244,7 @@ def test_tutor_lista_e_baixa_certificado_proprio(
     tutor_entity,
     oficina,
     db_session,
+    fake_storage,
 ):
     _preparar_certificado_tutor(db_session, oficina, tutor_entity)
     admin_headers = _auth_headers(client, admin_user.email, "admin12345")
@@ -227,6 +259,7 @@ def test_tutor_lista_e_baixa_certificado_proprio(
     itens = lista.json()
     assert len(itens) == 1
     assert itens[0]["id"] == emissao["id"]
+    certificado_pdf_service.processar_pendentes(db_session)
 
     download = client.get(
         f"/certificados/{emissao['id']}/download",
@@ -314,3 +347,361 @@ def test_validacao_publica_retorna_dados(
 def test_validacao_publica_hash_invalido(client):
     resposta = client.get("/certificados/validar/hash-invalido")
     assert resposta.status_code == status.HTTP_404_NOT_FOUND
+
+
+def _criar_certificados(db_session, oficina, quantidade) -> list[Certificado]:
+    base = datetime(2025, 12, 1, tzinfo=timezone.utc)
+    certificados = [
+        Certificado(
+            oficina_id=oficina.id,
+            tipo=CertificadoTipo.CONCLUSAO_ALUNO,
+            hash_validacao=f"hash-{indice}",
+            codigo_verificacao=f"COD{indice:07d}",
+            revogado=indice == 0,
+            created_at=base + timedelta(minutes=indice),
+        )
+        for indice in range(quantidade)
+    ]
+    db_session.add_all(certificados)
+    db_session.commit()
+    return certificados
+
+
+def test_listagem_paginada_por_cursor(client, admin_user, oficina, db_session):
+    certificados = _criar_certificados(db_session, oficina, 5)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+
+    ids = []
+    params = {"limit": 2, "revogado": "false", "oficina_id": str(oficina.id)}
+    while True:
+        resposta = client.get("/certificados", headers=headers, params=params)
+        assert resposta.status_code == status.HTTP_200_OK
+        ids.extend(item["id"] for item in resposta.json())
+        cursor = resposta.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+    assert ids == [str(item.id) for item in reversed(certificados[1:])]
+
+
+def test_listagem_em_streaming_ndjson(client, admin_user, oficina, db_session):
+    _criar_certificados(db_session, oficina, 4)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+
+    resposta = client.get(
+        "/certificados",
+        headers=headers,
+        params={"stream": "true", "tipo": CertificadoTipo.CONCLUSAO_ALUNO.value},
+    )
+
+    assert resposta.status_code == status.HTTP_200_OK
+    assert resposta.headers["content-type"].startswith("application/x-ndjson")
+    linhas = [json.loads(linha) for linha in resposta.text.splitlines()]
+    assert [linha["hash_validacao"] for linha in linhas] == ["hash-3", "hash-2", "hash-1", "hash-0"]
+
+
+def test_fila_pdf_reagenda_falhas_com_backoff(
+    client,
+    admin_user,
+    tutor_entity,
+    oficina,
+    db_session,
+    monkeypatch,
+):
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    certificado_id = client.post(
+        f"/certificados/oficinas/{oficina.id}/tutores/{tutor_entity.id}",
+        headers=headers,
+    ).json()["id"]
+
+    def _falha(*args, **kwargs):
+        raise RuntimeError("storage indisponível")
+
+    monkeypatch.setattr(certificado_pdf_service, "upload_pdf_certificado", _falha)
+    monkeypatch.setattr(get_settings(), "pdf_job_max_attempts", 2)
+    monkeypatch.setattr(get_settings(), "pdf_job_backoff_seconds", 0)
+
+    assert certificado_pdf_service.processar_pendentes(db_session) == 2
+
+    estado = client.get(f"/certificados/{certificado_id}/pdf", headers=headers).json()
+    assert estado["pdf_status"] == "pdf_falhou"
+    assert estado["job_status"] == PdfJobStatus.FALHOU.value
+    assert estado["tentativas"] == 2
+    assert estado["ultimo_erro"] == "storage indisponível"
+
+
+def test_fila_pdf_respeita_backoff_e_regeneracao(
+    client,
+    admin_user,
+    tutor_entity,
+    oficina,
+    db_session,
+    monkeypatch,
+    fake_storage,
+):
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    certificado_id = client.post(
+        f"/certificados/oficinas/{oficina.id}/tutores/{tutor_entity.id}",
+        headers=headers,
+    ).json()["id"]
+
+    def _falha(*args, **kwargs):
+        raise RuntimeError("timeout")
+
+    monkeypatch.setattr(certificado_pdf_service, "upload_pdf_certificado", _falha)
+    assert certificado_pdf_service.processar_pendentes(db_session) == 1
+    # The retry is scheduled pdf_job_backoff_seconds ahead, so nothing is due yet.
+    assert certificado_pdf_service.processar_pendentes(db_session) == 0
+    estado = client.get(f"/certificados/{certificado_id}/pdf", headers=headers).json()
+    assert estado["job_status"] == PdfJobStatus.PENDENTE.value
+    assert estado["proxima_tentativa_em"] is not None
+
+    monkeypatch.undo()
+    monkeypatch.setattr(certificado_pdf_service, "upload_pdf_certificado", lambda pdf, nome, folder: f"https://storage.test/{nome}")
+    regenerado = client.post(f"/certificados/{certificado_id}/regenerar", headers=headers)
+    assert regenerado.status_code == status.HTTP_200_OK
+    assert certificado_pdf_service.processar_pendentes(db_session) == 1
+
+    job = db_session.query(CertificadoPdfJob).filter_by(certificado_id=UUID(certificado_id)).one()
+    assert job.status == PdfJobStatus.CONCLUIDO
+    assert job.tentativas == 1
+    estado = client.get(f"/certificados/{certificado_id}/pdf", headers=headers).json()
+    assert estado["pdf_status"] == "pdf_pronto"
+    assert estado["arquivo_pdf_url"].endswith(".pdf")
+
+
+def test_emissao_em_lote_da_oficina_concluida(
+    client,
+    admin_user,
+    tutor_user,
+    tutor_entity,
+    oficina,
+    aluno_entity,
+    db_session,
+    monkeypatch,
+    fake_storage,
+):
+    admin_headers = _auth_headers(client, admin_user.email, "admin12345")
+    inscricao_id = _criar_inscricao(client, admin_headers, oficina.id, aluno_entity.id)
+    tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
+    client.patch(
+        f"/inscricoes/{inscricao_id}/status",
+        headers=tutor_headers,
+        json={"status": "em_andamento"},
+    )
+    _registrar_presenca_completa(client, tutor_headers, oficina.id, inscricao_id, oficina.data_inicio)
+
+    antecipada = client.post(f"/certificados/oficinas/{oficina.id}/emitir-lote", headers=admin_headers)
+    assert antecipada.status_code == status.HTTP_409_CONFLICT
+
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    response = client.post(f"/certificados/oficinas/{oficina.id}/emitir-lote", headers=admin_headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    payload = response.json()
+    assert payload["alunos_emitidos"] == 1
+    assert payload["tutores_emitidos"] == 1
+    assert {item["pdf_status"] for item in payload["certificados"]} == {"pdf_pendente"}
+
+    repetida = client.post(f"/certificados/oficinas/{oficina.id}/emitir-lote", headers=admin_headers).json()
+    assert repetida["alunos_emitidos"] == repetida["tutores_emitidos"] == 0
+
+    monkeypatch.setattr(get_settings(), "pdf_render_processes", 2)
+    try:
+        assert certificado_pdf_service.processar_pendentes(db_session) == 2
+    finally:
+        certificado_pdf_service.encerrar_render_pool()
+    assert sorted(folder for folder, _, _ in fake_storage) == ["certificados", "certificados/tutores"]
+    assert all(pdf.startswith(b"%PDF") for _, _, pdf in fake_storage)
+
+
+
+def test_lote_de_pdfs_renderizado_no_pool_de_processos(
+    client,
+    admin_user,
+    tutor_user,
+    tutor_entity,
+    oficina,
+    aluno_entity,
+    db_session,
+    monkeypatch,
+    fake_storage,
+):
+    admin_headers = _auth_headers(client, admin_user.email, "admin12345")
+    inscricao_id = _criar_inscricao(client, admin_headers, oficina.id, aluno_entity.id)
+    tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
+    client.patch(f"/inscricoes/{inscricao_id}/status", headers=tutor_headers, json={"status": "em_andamento"})
+    _registrar_presenca_completa(client, tutor_headers, oficina.id, inscricao_id, oficina.data_inicio)
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    client.post(f"/certificados/oficinas/{oficina.id}/emitir-lote", headers=admin_headers)
+
+    def _renderizar_no_processo_principal(tipo, kwargs):
+        raise AssertionError("lote renderizado fora do pool")
+
+    # Spawned workers import the module afresh, so only in-thread rendering hits this.
+    monkeypatch.setattr(certificado_pdf_service, "_renderizar", _renderizar_no_processo_principal)
+    monkeypatch.setattr(get_settings(), "pdf_render_processes", 2)
+    try:
+        assert certificado_pdf_service.processar_pendentes(db_session) == 2
+        assert certificado_pdf_service._render_pool is not None
+    finally:
+        certificado_pdf_service.encerrar_render_pool()
+
+    assert len(fake_storage) == 2
+    assert all(pdf.startswith(b"%PDF") for _, _, pdf in fake_storage)
+    jobs = db_session.scalars(select(CertificadoPdfJob)).all()
+    assert {job.status for job in jobs} == {PdfJobStatus.CONCLUIDO}
+
+
+def test_pool_de_renderizacao_ativo_por_padrao(monkeypatch):
+    monkeypatch.delenv("PDF_RENDER_PROCESSES", raising=False)
+    assert Settings().pdf_render_processes == min(4, os.cpu_count() or 1)
+    monkeypatch.setenv("PDF_RENDER_PROCESSES", "0")
+    assert Settings().pdf_render_processes == 0
+
+
+def test_regenerar_sem_mudancas_nao_reprocessa(
+    client,
+    admin_user,
+    tutor_entity,
+    oficina,
+    db_session,
+    fake_storage,
+):
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    certificado_id = client.post(
+        f"/certificados/oficinas/{oficina.id}/tutores/{tutor_entity.id}",
+        headers=headers,
+    ).json()["id"]
+    assert certificado_pdf_service.processar_pendentes(db_session) == 1
+    folder, nome, _ = fake_storage[0]
+    assert nome.endswith(".pdf") and len(nome) == 64 + len(".pdf")
+
+    regenerado = client.post(f"/certificados/{certificado_id}/regenerar", headers=headers)
+    assert regenerado.status_code == status.HTTP_200_OK
+    assert regenerado.json()["pdf_status"] == "pdf_pronto"
+    assert certificado_pdf_service.processar_pendentes(db_session) == 0
+    assert len(fake_storage) == 1
+
+    oficina.titulo = "Oficina renomeada"
+    db_session.commit()
+    regenerado = client.post(f"/certificados/{certificado_id}/regenerar", headers=headers)
+    assert regenerado.json()["pdf_status"] == "pdf_pendente"
+    assert certificado_pdf_service.processar_pendentes(db_session) == 1
+    assert len(fake_storage) == 2
+    assert fake_storage[1][1] != nome
+
+
+def test_download_direto_com_etag_e_range(
+    client,
+    admin_user,
+    tutor_entity,
+    oficina,
+    db_session,
+    fake_storage,
+):
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    certificado_id = client.post(
+        f"/certificados/oficinas/{oficina.id}/tutores/{tutor_entity.id}",
+        headers=headers,
+    ).json()["id"]
+
+    pendente = client.get(f"/certificados/{certificado_id}/arquivo", headers=headers)
+    assert pendente.status_code == status.HTTP_404_NOT_FOUND
+
+    certificado_pdf_service.processar_pendentes(db_session)
+    pdf = fake_storage[0][2]
+
+    response = client.get(f"/certificados/{certificado_id}/arquivo", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == pdf
+    assert response.headers["content-type"] == "application/pdf"
+    etag = response.headers["etag"]
+
+    repetido = client.get(f"/certificados/{certificado_id}/arquivo", headers={**headers, "If-None-Match": etag})
+    assert repetido.status_code == status.HTTP_304_NOT_MODIFIED
+    assert repetido.content == b""
+
+    parcial = client.get(f"/certificados/{certificado_id}/arquivo", headers={**headers, "Range": "bytes=0-3"})
+    assert parcial.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert parcial.content == b"%PDF"
+    assert parcial.headers["content-range"] == f"bytes 0-3/{len(pdf)}"
+
+    fora = client.get(f"/certificados/{certificado_id}/arquivo", headers={**headers, "Range": f"bytes={len(pdf)}-"})
+    assert fora.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+
+    # A cache miss is refilled from storage.
+    for arquivo in Path(get_settings().pdf_cache_dir).glob("*.pdf"):
+        arquivo.unlink()
+    refeito = client.get(f"/certificados/{certificado_id}/arquivo", headers=headers)
+    assert refeito.content == pdf
+
+
+def test_validacao_publica_usa_cache_e_invalida_ao_regenerar(
+    client,
+    admin_user,
+    tutor_entity,
+    oficina,
+    db_session,
+    capture_statements,
+):
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    emitido = client.post(
+        f"/certificados/oficinas/{oficina.id}/tutores/{tutor_entity.id}",
+        headers=headers,
+    ).json()
+    url = f"/certificados/validar/{emitido['hash_validacao']}"
+
+    primeira = client.get(url)
+    assert primeira.headers["cache-control"] == f"private, max-age={get_settings().validacao_http_max_age_seconds}"
+    with capture_statements() as statements:
+        assert client.get(url).json() == primeira.json()
+        inexistente = client.get("/certificados/validar/nao-existe")
+        assert client.get("/certificados/validar/nao-existe").status_code == status.HTTP_404_NOT_FOUND
+    assert len(statements) == 1  # only the first miss reaches the database
+    assert inexistente.headers["cache-control"] == "no-store"
+
+    certificado = db_session.get(Certificado, UUID(emitido["id"]))
+    certificado.revogado = True
+    db_session.commit()
+    assert client.get(url).json()["valido"] is True  # still cached
+
+    client.post(f"/certificados/{emitido['id']}/regenerar", headers=headers)
+    assert client.get(url).json()["valido"] is False
+
+
+def test_validacao_publica_por_codigo_normalizado(
+    client,
+    admin_user,
+    tutor_entity,
+    oficina,
+    db_session,
+):
+    _preparar_certificado_tutor(db_session, oficina, tutor_entity)
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    emitido = client.post(
+        f"/certificados/oficinas/{oficina.id}/tutores/{tutor_entity.id}",
+        headers=headers,
+    ).json()
+    codigo = emitido["codigo_verificacao"]
+    digitado = f"{codigo[:5].lower()}-{codigo[5:]}"
+
+    resposta = client.get(f"/certificados/validar/codigo/{digitado}")
+
+    assert resposta.status_code == status.HTTP_200_OK
+    assert resposta.json()["hash_validacao"] == emitido["hash_validacao"]
+    assert client.get("/certificados/validar/codigo/ZZZZZZZZZZ").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_geracao_de_codigo_evita_colisao(db_session, oficina, monkeypatch):
+    existente = _criar_certificados(db_session, oficina, 1)[0]
+    sorteios = iter([existente.codigo_verificacao, "NOVO234567"])
+    monkeypatch.setattr(certificado_service, "_random_code", lambda: next(sorteios))
+
+    assert certificado_service._generate_codes(db_session, 1) == ["NOVO234567"]
@@ -3,10 +3,12 @@ from uuid import uuid4
 
 from fastapi import status
 
+from app.config import get_settings
 from app.models import Certificado, Inscricao
 from app.models.certificado import CertificadoTipo
 from app.models.inscricao import InscricaoStatus
 from app.models.oficina import OficinaStatus
+from app.services import dashboard_service, inscricao_service
 
 
 def _auth_headers(client, email, password):
@@ -69,3 +71,62 @@ def test_dashboard_metricas_restrito_para_admin(client, tutor_user):
     tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
     response = client.get("/dashboard/metricas", headers=tutor_headers)
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_metricas_gerais_usa_uma_unica_query(db_session, oficina, aluno_entity, capture_statements):
+    oficina.status = OficinaStatus.CONCLUIDA
+    db_session.add(
+        Inscricao(
+            aluno_id=aluno_entity.id,
+            oficina_id=oficina.id,
+            status=InscricaoStatus.CONCLUIDO,
+            percentual_presenca=80,
+        )
+    )
+    db_session.commit()
+
+    with capture_statements() as statements:
+        metricas = dashboard_service.metricas_gerais(db_session)
+
+    assert len(statements) == 1
+    assert metricas["oficinas_concluidas"] == 1
+    assert metricas["oficinas_ativas"] == 0
+    assert metricas["inscritos_concluidos"] == 1
+    assert metricas["certificados_emitidos"] == 0
+    assert metricas["presenca_media_geral"] == 80.0
+
+
+def test_metricas_gerais_com_banco_vazio(db_session):
+    metricas = dashboard_service.metricas_gerais(db_session)
+
+    assert metricas["total_inscricoes"] == 0
+    assert metricas["presenca_media_geral"] == 0.0
+
+
+def test_metricas_servidas_do_cache_ate_uma_escrita(db_session, inscricao, capture_statements):
+    primeira = dashboard_service.metricas_gerais(db_session)
+
+    with capture_statements() as statements:
+        segunda = dashboard_service.metricas_gerais(db_session)
+
+    assert statements == []
+    assert segunda == primeira
+    assert segunda["ultima_atualizacao"] == primeira["ultima_atualizacao"]
+
+    inscricao_service.update_status(db_session, inscricao.id, InscricaoStatus.CANCELADO)
+
+    with capture_statements() as statements:
+        terceira = dashboard_service.metricas_gerais(db_session)
+
+    assert len(statements) == 1
+    assert terceira["ultima_atualizacao"] > primeira["ultima_atualizacao"]
+
+
+def test_cache_desligado_com_ttl_zero(db_session, monkeypatch, capture_statements):
+    monkeypatch.setattr(get_settings(), "dashboard_cache_ttl_seconds", 0)
+
+    with capture_statements() as statements:
+        dashboard_service.metricas_gerais(db_session)
+        dashboard_service.metricas_gerais(db_session)
+
+    assert len(statements) == 2
@@ -0,0 +1,184 @@
+"""The hot service queries are planned on the indexes declared for them.
+
+Each case runs a real service call, captures the statement it sends to the table under
+test and checks the ``EXPLAIN`` output names the expected index. SQLite runs always;
+Postgres runs when ``TEST_POSTGRES_URL`` points at a disposable database (its schema is
+created and dropped here). Sequential scans are disabled on that connection because
+the planner would rightly prefer them on a table this small.
+"""
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from sqlalchemy import Connection, create_engine, event, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Base, Certificado, Inscricao, Oficina, Tutor
+from app.models.oficina import OficinaStatus
+from app.services import (
+    auditoria_service,
+    certificado_service,
+    historico_service,
+    oficina_service,
+    presenca_service,
+)
+from benchmarks.seed import Volumes, carregar, popular
+
+VOLUMES = Volumes(oficinas=5, alunos=12, inscricoes=30, presencas=120, certificados=5, tutores=4, professores=2, temas=3)
+
+
+@dataclass(frozen=True)
+class Caso:
+    tabela: str
+    colunas: tuple[str, ...]
+    executar: Callable[[Session], Any]
+    # Marks the captured statement to explain among everything the call sends.
+    trechos: tuple[str, ...]
+
+
+def _primeiro(db: Session, stmt):
+    return db.scalars(stmt.limit(1)).one()
+
+
+CASOS = {
+    "presencas_inscricao_data": Caso(
+        "presencas",
+        ("inscricao_id", "data_aula"),
+        lambda db: presenca_service.list_by_inscricao(db, _primeiro(db, select(Inscricao.id).order_by(Inscricao.id))),
+        ("FROM presencas", "presencas.inscricao_id = "),
+    ),
+    "inscricoes_oficina_status": Caso(
+        "inscricoes",
+        ("oficina_id", "status"),
+        lambda db: certificado_service.emitir_lote_oficina(
+            db, _primeiro(db, select(Oficina.id).where(Oficina.status == OficinaStatus.CONCLUIDA))
+        ),
+        ("FROM inscricoes", "inscricoes.oficina_id = ", "inscricoes.status = "),
+    ),
+    "inscricoes_aluno_created": Caso(
+        "inscricoes",
+        ("aluno_id", "created_at"),
+        lambda db: historico_service.historico_aluno(db, _primeiro(db, select(Inscricao.aluno_id))),
+        ("FROM inscricoes", "inscricoes.aluno_id = "),
+    ),
+    "certificados_hash": Caso(
+        "certificados",
+        ("hash_validacao",),
+        lambda db: certificado_service.get_por_hash(db, _primeiro(db, select(Certificado.hash_validacao))),
+        ("FROM certificados", "certificados.hash_validacao = "),
+    ),
+    "certificados_tutor_oficina": Caso(
+        "certificados",
+        ("tutor_id", "oficina_id"),
+        lambda db: certificado_service.listar_por_tutor(db, _primeiro(db, select(Tutor.id))),
+        ("FROM certificados", "certificados.tutor_id = "),
+    ),
+    "auditoria_entidade_acao_created": Caso(
+        "auditoria",
+        ("entidade", "acao", "created_at"),
+        lambda db: auditoria_service.listar_eventos(db, entidade="oficina", acao="removida"),
+        ("FROM auditoria",),
+    ),
+    "oficinas_status_data_inicio": Caso(
+        "oficinas",
+        ("status", "data_inicio", "titulo", "id"),
+        lambda db: oficina_service.list_oficinas(db, status_filter=OficinaStatus.EM_ANDAMENTO, limit=10),
+        ("FROM oficinas", "oficinas.status = "),
+    ),
+}
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def banco(request, db_session: Session) -> Iterator[Session]:
+    if request.param == "sqlite":
+        yield db_session
+        return
+
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL não definido")
+    engine = create_engine(url, connect_args={"options": "-c enable_seqscan=off"})
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as session:
+            yield session
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+@contextmanager
+def _capturar(session: Session) -> Iterator[list[tuple[str, Any]]]:
+    engine = session.get_bind()
+    capturados: list[tuple[str, Any]] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            capturados.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield capturados
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def _nome_indice(conn: Connection, tabela: str, colunas: tuple[str, ...]) -> str:
+    """Name of the index (explicit or backing a UNIQUE constraint) on exactly ``colunas``."""
+    if conn.dialect.name == "sqlite":
+        for row in conn.exec_driver_sql(f"PRAGMA index_list({tabela})").all():
+            indice = row[1]
+            if tuple(info[2] for info in conn.exec_driver_sql(f"PRAGMA index_info({indice})")) == colunas:
+                return indice
+    else:
+        nomes = conn.execute(
+            text(
+                """
+                SELECT i.relname
+                FROM pg_index x
+                JOIN pg_class i ON i.oid = x.indexrelid
+                JOIN pg_class t ON t.oid = x.indrelid
+                WHERE t.relname = :tabela
+                  AND ARRAY(
+                      SELECT a.attname::text
+                      FROM unnest(x.indkey) WITH ORDINALITY AS k(attnum, posicao)
+                      JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+                      ORDER BY k.posicao
+                  ) = CAST(:colunas AS text[])
+                """
+            ),
+            {"tabela": tabela, "colunas": list(colunas)},
+        ).scalars()
+        for indice in nomes:
+            return indice
+    raise AssertionError(f"nenhum índice em {tabela}{colunas}")
+
+
+def _plano(conn: Connection, statement: str, parameters: Any) -> str:
+    if conn.dialect.name == "sqlite":
+        return "\n".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    return "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters))
+
+
+@pytest.mark.parametrize("nome", list(CASOS))
+def test_consulta_usa_o_indice(banco: Session, nome: str):
+    caso = CASOS[nome]
+    popular(banco, VOLUMES)
+    assert carregar(banco).hashes_certificados
+
+    with _capturar(banco) as capturados:
+        caso.executar(banco)
+    consultas = [item for item in capturados if all(trecho in item[0] for trecho in caso.trechos)]
+    assert consultas, f"{nome}: nenhuma consulta com {caso.trechos}"
+
+    with banco.get_bind().connect() as conn:
+        indice = _nome_indice(conn, caso.tabela, caso.colunas)
+        for statement, parameters in consultas:
+            plano = _plano(conn, statement, parameters)
+            assert indice in plano, f"{nome}: {indice} fora do plano\n{statement}\n{plano}"
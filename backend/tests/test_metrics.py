@@ -0,0 +1,76 @@
+"""Tests for the /metrics endpoint and the metric primitives."""
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+from app.database import POOL_WAIT_SECONDS, TimedQueuePool
+from app.main import create_app
+from app.utils import PDF_RENDER_SECONDS, formatar_periodo, gerar_certificado_tutor
+from app.utils.metrics import Histogram
+
+
+def _sample(body, linha_inicio):
+    linha = next(item for item in body.splitlines() if item.startswith(linha_inicio))
+    return float(linha.rsplit(" ", 1)[1])
+
+
+def test_metrics_count_requests_by_route_template(client, admin_user):
+    client.post("/auth/login", json={"email": admin_user.email, "password": "admin12345"})
+    client.get("/oficinas/00000000-0000-0000-0000-000000000000")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert _sample(body, 'http_requests_total{method="POST",route="/auth/login",status="200"}') >= 1
+    assert 'route="/oficinas/{oficina_id}"' in body
+    assert "00000000-0000" not in body
+    assert "# TYPE http_request_duration_seconds histogram" in body
+
+
+def test_metrics_token_is_required_when_configured(monkeypatch):
+    monkeypatch.setattr(get_settings(), "metrics_token", "segredo")
+    client = TestClient(create_app())
+
+    assert client.get("/metrics").status_code == status.HTTP_401_UNAUTHORIZED
+    autorizado = client.get("/metrics", headers={"Authorization": "Bearer segredo"})
+    assert autorizado.status_code == status.HTTP_200_OK
+
+
+def test_histogram_renders_cumulative_buckets():
+    histograma = Histogram("exemplo_seconds", "Exemplo.", labelnames=("rota",), buckets=(0.1, 1.0))
+    for valor in (0.05, 0.5, 0.5, 3):
+        histograma.observe(valor, rota="/a")
+
+    linhas = histograma.render().splitlines()
+
+    assert 'exemplo_seconds_bucket{rota="/a",le="0.1"} 1' in linhas
+    assert 'exemplo_seconds_bucket{rota="/a",le="1"} 3' in linhas
+    assert 'exemplo_seconds_bucket{rota="/a",le="+Inf"} 4' in linhas
+    assert 'exemplo_seconds_count{rota="/a"} 4' in linhas
+
+
+def test_pdf_render_is_timed():
+    antes = PDF_RENDER_SECONDS.count()
+    gerar_certificado_tutor(
+        nome_tutor="Tutor",
+        cpf_tutor=None,
+        titulo_oficina="Oficina",
+        carga_horaria=10,
+        periodo=formatar_periodo("2025-01-01", "2025-02-01"),
+        hash_validacao="hash",
+        codigo_verificacao="ABCDEFGHJK",
+    )
+    assert PDF_RENDER_SECONDS.count() == antes + 1
+
+
+def test_timed_pool_records_checkout_wait(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool)
+    antes = POOL_WAIT_SECONDS.count()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    engine.dispose()
+
+    assert POOL_WAIT_SECONDS.count() == antes + 1
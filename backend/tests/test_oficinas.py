@@ -322,11 +322,97 @@ def test_catalogo_exibe_lotacao(client, admin_user, oficina, aluno_entity, secon
         oficina_id=oficina.id,
         aluno_id=aluno_entity.id,
     ).first()
-    inscricao.status = InscricaoStatus.CANCELADO
-    db_session.add(inscricao)
-    db_session.commit()
+    cancel = client.patch(
+        f"/inscricoes/{inscricao.id}/status",
+        headers=headers,
+        json={"status": InscricaoStatus.CANCELADO.value},
+    )
+    assert cancel.status_code == status.HTTP_200_OK
 
     liberada = _fetch_catalog_entry()
     assert liberada["total_inscritos"] == 1
     assert liberada["vagas_disponiveis"] == 1
     assert liberada["lotada"] is False
+
+
+def test_catalogo_le_totais_materializados(
+    client, admin_user, oficina, aluno_entity, db_session, capture_statements
+):
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    enroll = client.post(
+        f"/oficinas/{oficina.id}/inscricoes",
+        headers=headers,
+        json={"aluno_id": str(aluno_entity.id)},
+    )
+    assert enroll.status_code == status.HTTP_201_CREATED
+    db_session.refresh(oficina)
+    assert oficina.total_inscritos == 1
+
+    with capture_statements() as statements:
+        response = client.get("/oficinas", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert not any("inscricoes" in statement for statement in statements)
+
+
+def test_recalcular_totais_corrige_contadores(client, admin_user, oficina, aluno_entity, db_session):
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    db_session.add(Inscricao(aluno_id=aluno_entity.id, oficina_id=oficina.id, status=InscricaoStatus.CONCLUIDO))
+    oficina.total_inscritos = 7
+    db_session.add(oficina)
+    db_session.commit()
+
+    response = client.post("/oficinas/estatisticas/recalcular", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"oficinas_recalculadas": 1}
+    db_session.refresh(oficina)
+    assert oficina.total_inscritos == 1
+    assert oficina.total_concluintes == 1
+
+
+def test_list_oficinas_keyset_pagination(client, admin_user, db_session, professor_entity, tema):
+    oficinas = [
+        Oficina(
+            professor_id=professor_entity.id,
+            titulo=titulo,
+            carga_horaria=6,
+            capacidade_maxima=10,
+            data_inicio=data_inicio,
+            data_fim=date(2025, 12, 20),
+            local="UTFPR",
+            status=OficinaStatus.PLANEJADA,
+            temas=[tema],
+        )
+        for titulo, data_inicio in (
+            ("Oficina B", date(2025, 2, 1)),
+            ("Oficina A", date(2025, 2, 1)),
+            ("Oficina C", date(2025, 1, 1)),
+            ("Oficina D", date(2025, 3, 1)),
+            ("Oficina E", date(2025, 4, 1)),
+        )
+    ]
+    db_session.add_all(oficinas)
+    db_session.commit()
+
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    titulos = []
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 2, "tema_id": str(tema.id)}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/oficinas", headers=headers, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        titulos.extend(item["titulo"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert titulos == ["Oficina C", "Oficina A", "Oficina B", "Oficina D", "Oficina E"]
+    assert cursor is None
+
+
+def test_list_oficinas_rejects_invalid_cursor(client, admin_user):
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    response = client.get("/oficinas", headers=headers, params={"cursor": "nao-e-um-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
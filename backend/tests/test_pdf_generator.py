@@ -0,0 +1,65 @@
+"""Certificate PDF rendering (utils/pdf_generator)."""
+import base64
+import re
+import zlib
+
+from reportlab import rl_config
+
+from app.utils import pdf_generator
+
+
+def _streams(pdf: bytes) -> list[tuple[bytes, str]]:
+    """Content streams with their dictionaries, decoded from the ASCII85 + Flate filters ReportLab writes."""
+    return [
+        (dicionario, zlib.decompress(base64.a85decode(dados.strip().removesuffix(b"~>"))).decode("latin-1"))
+        for dicionario, dados in re.findall(rb"<<(.*?)>>\s*stream\r?\n(.*?)endstream", pdf, re.S)
+        if b"/Filter [ /ASCII85Decode /FlateDecode ]" in dicionario
+    ]
+
+
+def _fontes(pdf: bytes) -> dict[str, str]:
+    return {
+        nome.decode(): fonte.decode()
+        for fonte, nome in re.findall(rb"/BaseFont /([\w-]+) /Encoding /\w+ /Name /(F\d+)", pdf)
+    }
+
+
+def _fonte_do_texto(conteudo: str, texto: str) -> str:
+    antes = conteudo[: conteudo.index(f"({texto}) Tj")]
+    return re.findall(r"/(F\d+) [\d.]+ Tf", antes)[-1]
+
+
+def test_camada_fixa_montada_uma_vez_e_aplicada_como_form_xobject():
+    pdf_generator._camada_estatica.cache_clear()
+    argumentos = {
+        "titulo_oficina": "Robótica",
+        "carga_horaria": 20,
+        "periodo": "março de 2026",
+        "hash_validacao": "a" * 64,
+        "codigo_verificacao": "ABCD123456",
+    }
+    pdfs = [
+        pdf_generator.gerar_certificado_aluno(
+            nome_aluno=f"Aluno {indice}", cpf_aluno=None, percentual_presenca=90, **argumentos
+        )
+        for indice in range(3)
+    ]
+    pdfs.append(pdf_generator.gerar_certificado_tutor(nome_tutor="Tutor", cpf_tutor=None, **argumentos))
+
+    assert pdf_generator._camada_estatica.cache_info().misses == 2  # aluno e tutor
+    assert rl_config.useA85 == 1  # nenhum ajuste global no ReportLab
+
+    # Non-ASCII characters are octal-escaped in the content stream, hence the prefixes.
+    for pdf, (modelo, subtitulo) in zip(pdfs, [("aluno", "(de Conclus")] * 3 + [("tutor", "(de Participa")]):
+        fontes = _fontes(pdf)
+        formulario = next(conteudo for dicionario, conteudo in _streams(pdf) if b"/Subtype /Form" in dicionario)
+        pagina = next(conteudo for dicionario, conteudo in _streams(pdf) if b"/Subtype /Form" not in dicionario)
+
+        assert f"/FormXob.camada-{modelo} Do" in pagina
+        assert "(CERTIFICADO) Tj" not in pagina
+        assert fontes[_fonte_do_texto(formulario, "CERTIFICADO")] == "Helvetica-Bold"
+        assert fontes[_fonte_do_texto(formulario, "Certificamos que")] == "Helvetica"
+        assert f" Tm {subtitulo}" in formulario
+
+    pagina = next(conteudo for dicionario, conteudo in _streams(pdfs[0]) if b"/Subtype /Form" not in dicionario)
+    assert _fontes(pdfs[0])[_fonte_do_texto(pagina, "ALUNO 0")] == "Helvetica-Bold"
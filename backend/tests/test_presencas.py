@@ -2,9 +2,17 @@
 from datetime import timedelta
 from uuid import UUID
 
+import pytest
 from fastapi import status
+from pydantic import ValidationError
+from sqlalchemy import update
+from sqlalchemy.orm import Session
 
-from app.models import Inscricao
+from app.config import Settings, get_settings
+from app.models import Aluno, Inscricao, Pessoa, Presenca, User
+from app.models.inscricao import InscricaoStatus
+from app.schemas import PresencaRegistro, PresencaUpdate
+from app.services import presenca_service
 
 
 def _auth_headers(client, email, password):
@@ -25,6 +33,18 @@ def _criar_inscricao(client, headers, oficina_id, aluno_id) -> str:
     return response.json()["id"]
 
 
+def _matricular_alunos(db_session, oficina, quantidade) -> list[Inscricao]:
+    inscricoes = []
+    for indice in range(quantidade):
+        user = User(email=f"lote{indice}@ellp.test", senha_hash="x", role="aluno", ativo=True)
+        pessoa = Pessoa(user=user, nome_completo=f"Aluno Lote {indice}")
+        aluno = Aluno(pessoa=pessoa, responsavel_nome="Responsável", responsavel_telefone="43900000000")
+        inscricoes.append(Inscricao(aluno=aluno, oficina_id=oficina.id))
+    db_session.add_all(inscricoes)
+    db_session.commit()
+    return inscricoes
+
+
 def test_tutor_registra_presencas_atualiza_percentual(
     client,
     admin_user,
@@ -185,3 +205,249 @@ def test_patch_e_delete_presenca_atualizam_metricas(
     assert float(inscricao.percentual_presenca) == 0.0
     assert inscricao.total_presencas == 0
     assert inscricao.total_faltas == 0
+
+
+def test_registrar_lote_custa_numero_constante_de_queries(
+    db_session,
+    oficina,
+    tutor_user,
+    capture_statements,
+):
+    inscricoes = _matricular_alunos(db_session, oficina, 15)
+    inscricao_ids = [item.id for item in inscricoes]
+    oficina_id, data_aula, registrador_id = oficina.id, oficina.data_inicio, tutor_user.id
+
+    def _registrar(ids, presente):
+        db_session.expire_all()
+        with capture_statements() as statements:
+            persisted = presenca_service.registrar_lote(
+                db_session,
+                oficina_id,
+                data_aula=data_aula,
+                registros=[PresencaRegistro(inscricao_id=item, presente=presente) for item in ids],
+                registrador_id=registrador_id,
+            )
+        return persisted, len(statements)
+
+    pequeno, queries_pequeno = _registrar(inscricao_ids[:2], True)
+    grande, queries_grande = _registrar(inscricao_ids, False)
+
+    assert len(pequeno) == 2
+    assert len(grande) == 15
+    assert queries_grande == queries_pequeno
+    assert all(item.presente is False for item in grande)
+
+    reescrita = db_session.get(Inscricao, inscricao_ids[0])
+    db_session.refresh(reescrita)
+    assert reescrita.total_presencas == 0
+    assert reescrita.total_faltas == 1
+
+
+@pytest.mark.parametrize("modo", ["incremental", "recount"])
+def test_contadores_acompanham_patch_e_delete_em_ambos_os_modos(
+    modo,
+    monkeypatch,
+    client,
+    admin_user,
+    tutor_user,
+    oficina,
+    aluno_entity,
+    db_session,
+):
+    monkeypatch.setattr(get_settings(), "attendance_stats_mode", modo)
+    admin_headers = _auth_headers(client, admin_user.email, "admin12345")
+    inscricao_id = _criar_inscricao(client, admin_headers, oficina.id, aluno_entity.id)
+
+    tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
+    presenca_ids = []
+    for offset, presente in enumerate((True, True, False)):
+        resposta = client.post(
+            f"/presencas/oficinas/{oficina.id}",
+            headers=tutor_headers,
+            json={
+                "data_aula": str(oficina.data_inicio + timedelta(days=offset)),
+                "registros": [{"inscricao_id": inscricao_id, "presente": presente}],
+            },
+        )
+        presenca_ids.append(resposta.json()[0]["id"])
+
+    reenvio = client.post(
+        f"/presencas/oficinas/{oficina.id}",
+        headers=tutor_headers,
+        json={
+            "data_aula": str(oficina.data_inicio),
+            "registros": [{"inscricao_id": inscricao_id, "presente": True}],
+        },
+    )
+    assert reenvio.status_code == status.HTTP_201_CREATED
+
+    inscricao = db_session.get(Inscricao, UUID(inscricao_id))
+    assert (inscricao.total_presencas, inscricao.total_faltas) == (2, 1)
+    assert float(inscricao.percentual_presenca) == 66.67
+
+    client.patch(f"/presencas/{presenca_ids[2]}", headers=tutor_headers, json={"presente": True})
+    db_session.refresh(inscricao)
+    assert (inscricao.total_presencas, inscricao.total_faltas) == (3, 0)
+    assert float(inscricao.percentual_presenca) == 100.0
+
+    client.delete(f"/presencas/{presenca_ids[0]}", headers=tutor_headers)
+    db_session.refresh(inscricao)
+    assert (inscricao.total_presencas, inscricao.total_faltas) == (2, 0)
+    assert inscricao.total_aulas_previstas == 3
+
+
+def test_reconciliacao_corrige_contadores_divergentes(
+    client,
+    admin_user,
+    tutor_user,
+    oficina,
+    aluno_entity,
+    second_aluno_entity,
+    db_session,
+):
+    admin_headers = _auth_headers(client, admin_user.email, "admin12345")
+    insc1 = _criar_inscricao(client, admin_headers, oficina.id, aluno_entity.id)
+    insc2 = _criar_inscricao(client, admin_headers, oficina.id, second_aluno_entity.id)
+
+    tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
+    client.post(
+        f"/presencas/oficinas/{oficina.id}",
+        headers=tutor_headers,
+        json={
+            "data_aula": str(oficina.data_inicio),
+            "registros": [
+                {"inscricao_id": insc1, "presente": True},
+                {"inscricao_id": insc2, "presente": False},
+            ],
+        },
+    )
+
+    divergente = db_session.get(Inscricao, UUID(insc1))
+    divergente.total_presencas = 7
+    divergente.percentual_presenca = 12
+    db_session.commit()
+
+    negado = client.post("/presencas/reconciliar", headers=tutor_headers)
+    assert negado.status_code == status.HTTP_403_FORBIDDEN
+
+    resposta = client.post(
+        "/presencas/reconciliar",
+        headers=admin_headers,
+        params={"oficina_id": str(oficina.id)},
+    )
+
+    assert resposta.status_code == status.HTTP_200_OK
+    payload = resposta.json()
+    assert payload["inscricoes_verificadas"] == 2
+    assert payload["inscricoes_corrigidas"] == [insc1]
+
+    db_session.refresh(divergente)
+    assert divergente.total_presencas == 1
+    assert float(divergente.percentual_presenca) == 100.0
+
+
+def test_recalculo_reconstroi_todas_as_inscricoes_da_oficina(
+    client,
+    admin_user,
+    oficina,
+    db_session,
+    capture_statements,
+):
+    inscricoes = _matricular_alunos(db_session, oficina, 12)
+    for indice, inscricao in enumerate(inscricoes):
+        inscricao.status = InscricaoStatus.CONCLUIDO if indice % 2 else InscricaoStatus.EM_ANDAMENTO
+        inscricao.apto_certificado = True
+        for dia in range(4):
+            db_session.add(
+                Presenca(
+                    inscricao_id=inscricao.id,
+                    data_aula=oficina.data_inicio + timedelta(days=dia),
+                    presente=dia < indice % 5,
+                )
+            )
+    db_session.commit()
+    oficina_id = oficina.id
+    db_session.expire_all()
+
+    with capture_statements() as statements:
+        total = presenca_service.recalcular_estatisticas(db_session, oficina_id=oficina_id)
+
+    assert total == 12
+    # SELECT oficina, grouped aggregate, bulk UPDATE inscrições, UPDATE oficina totals.
+    assert len(statements) == 4
+
+    for indice, inscricao in enumerate(inscricoes):
+        db_session.refresh(inscricao)
+        presentes = min(indice % 5, 4)
+        assert inscricao.total_presencas == presentes
+        assert inscricao.total_faltas == 4 - presentes
+        assert float(inscricao.percentual_presenca) == presentes * 25.0
+        assert inscricao.apto_certificado is (presentes >= 3)
+        if presentes >= 3:
+            assert inscricao.status == InscricaoStatus.CONCLUIDO
+
+    admin_headers = _auth_headers(client, admin_user.email, "admin12345")
+    resposta = client.post("/presencas/recalcular", headers=admin_headers)
+    assert resposta.status_code == status.HTTP_200_OK
+    assert resposta.json() == {"inscricoes_recalculadas": 12}
+
+
+def test_conclusao_automatica_atualiza_totais_da_oficina(client, admin_user, tutor_user, oficina, db_session):
+    inscricoes = _matricular_alunos(db_session, oficina, 2)
+    for inscricao in inscricoes:
+        inscricao.status = InscricaoStatus.EM_ANDAMENTO
+    oficina.total_inscritos = 2
+    db_session.commit()
+
+    tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
+    resposta = client.post(
+        f"/presencas/oficinas/{oficina.id}",
+        headers=tutor_headers,
+        json={
+            "data_aula": str(oficina.data_inicio),
+            "registros": [
+                {"inscricao_id": str(inscricoes[0].id), "presente": True},
+                {"inscricao_id": str(inscricoes[1].id), "presente": False},
+            ],
+        },
+    )
+    assert resposta.status_code == status.HTTP_201_CREATED
+
+    db_session.refresh(oficina)
+    assert (oficina.total_inscritos, oficina.total_concluintes) == (2, 1)
+
+
+def test_incrementos_nao_perdem_escrita_concorrente(db_session, oficina, tutor_user):
+    inscricao = _matricular_alunos(db_session, oficina, 1)[0]
+    inscricao_id, oficina_id, registrador_id = inscricao.id, oficina.id, tutor_user.id
+    presenca = presenca_service.registrar_lote(
+        db_session,
+        oficina_id,
+        data_aula=oficina.data_inicio,
+        registros=[PresencaRegistro(inscricao_id=inscricao_id, presente=True)],
+        registrador_id=registrador_id,
+    )[0]
+    assert (inscricao.total_presencas, inscricao.total_faltas) == (1, 0)
+
+    # Another writer commits two more presenças while this session still holds the row loaded above.
+    with Session(db_session.get_bind()) as outra:
+        outra.execute(
+            update(Inscricao.__table__)
+            .where(Inscricao.__table__.c.id == inscricao_id)
+            .values(total_presencas=Inscricao.__table__.c.total_presencas + 2)
+        )
+        outra.commit()
+
+    presenca_service.update_presenca(
+        db_session, presenca.id, PresencaUpdate(presente=False), registrador_id=registrador_id
+    )
+
+    db_session.expire_all()
+    atualizada = db_session.get(Inscricao, inscricao_id)
+    assert (atualizada.total_presencas, atualizada.total_faltas) == (2, 1)
+    assert float(atualizada.percentual_presenca) == 66.67
+
+
+def test_modo_de_estatisticas_invalido_e_rejeitado():
+    with pytest.raises(ValidationError):
+        Settings(attendance_stats_mode="incremetal")
@@ -0,0 +1,390 @@
+"""Per-route SQL statement budgets, checked on datasets of different sizes.
+
+Every route in ``app/routers`` declares ``@query_budget(n)``. The scenarios below seed a
+small and a larger dataset with ``benchmarks.seed`` and require each call to stay within
+its route's budget and to issue the same number of statements at both sizes, so a lost
+eager-load option (an N+1) fails here instead of in production. The count must also match
+``ESPERADO`` exactly, and budgets may sit at most ``MARGEM`` above it.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from fastapi import status
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.middlewares.auth_middleware import invalidar_usuario
+from app.models import Base, Certificado, Inscricao, Oficina, Presenca, Professor, Tema, Tutor
+from app.models.inscricao import InscricaoStatus
+from app.models.oficina import OficinaStatus
+from app.services import certificado_pdf_service, certificado_service, dashboard_service
+from app.utils import get_query_budget
+from benchmarks.seed import ADMIN_EMAIL, ADMIN_PASSWORD, Dataset, Volumes, carregar, popular
+
+PEQUENO = Volumes(
+    oficinas=5, alunos=8, inscricoes=10, presencas=30, certificados=2, tutores=4, professores=2, temas=3
+)
+GRANDE = Volumes(
+    oficinas=15, alunos=60, inscricoes=150, presencas=900, certificados=20, tutores=10, professores=4, temas=6
+)
+
+ROUTER_ROUTES = [
+    route
+    for route in app.routes
+    if isinstance(route, APIRoute) and route.endpoint.__module__.startswith("app.routers.")
+]
+
+
+@dataclass
+class Contexto:
+    db: Session
+    dataset: Dataset
+    tokens: dict[str, str]
+
+    def oficina(self, situacao: OficinaStatus) -> Oficina:
+        return self.db.scalars(select(Oficina).where(Oficina.status == situacao).order_by(Oficina.id)).first()
+
+    def inscricao(self, situacao: OficinaStatus) -> Inscricao:
+        return self.db.scalars(
+            select(Inscricao)
+            .join(Oficina, Oficina.id == Inscricao.oficina_id)
+            .where(Oficina.status == situacao)
+            .order_by(Inscricao.id)
+        ).first()
+
+    def certificado(self) -> Certificado:
+        return self.db.scalars(select(Certificado).order_by(Certificado.hash_validacao)).first()
+
+    def primeiro(self, model) -> Any:
+        return self.db.scalars(select(model).order_by(model.id)).first()
+
+
+# Builds the (url, extra client kwargs) of one route call from the seeded dataset.
+Cenario = Callable[[Contexto], tuple[str, dict[str, Any]]]
+
+
+def _registrar_lote(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    data_aula, registros = sorted(ctx.dataset.chamadas.items())[0]
+    payload = {
+        "data_aula": data_aula.isoformat(),
+        "registros": [{"inscricao_id": str(item), "presente": presente} for item, presente in registros.items()],
+    }
+    return f"/presencas/oficinas/{ctx.dataset.oficina_chamada}", {"json": payload}
+
+
+def _status_pdf(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    certificado = ctx.certificado()
+    certificado_pdf_service.enfileirar(ctx.db, certificado)
+    ctx.db.commit()
+    return f"/certificados/{certificado.id}/pdf", {}
+
+
+def _emitir_inscricao(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    certificado = ctx.certificado()
+    inscricao_id = certificado.inscricao_id
+    ctx.db.delete(certificado)
+    ctx.db.commit()
+    return f"/certificados/inscricoes/{inscricao_id}", {}
+
+
+def _emitir_lote(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    oficina_id = ctx.certificado().oficina_id
+    ctx.db.execute(delete(Certificado).where(Certificado.oficina_id == oficina_id))
+    ctx.db.commit()
+    return f"/certificados/oficinas/{oficina_id}/emitir-lote", {}
+
+
+def _emitir_tutor(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    oficina = ctx.oficina(OficinaStatus.CONCLUIDA)
+    return f"/certificados/oficinas/{oficina.id}/tutores/{oficina.tutores[0].id}", {}
+
+
+def _inscrever(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    oficina = ctx.oficina(OficinaStatus.INSCRICOES_ABERTAS)
+    inscritos = set(ctx.db.scalars(select(Inscricao.aluno_id).where(Inscricao.oficina_id == oficina.id)))
+    aluno_id = next(item for item in ctx.dataset.alunos if item not in inscritos)
+    return f"/oficinas/{oficina.id}/inscricoes", {"json": {"aluno_id": str(aluno_id)}}
+
+
+def _atribuir_tutor(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    oficina = ctx.oficina(OficinaStatus.PLANEJADA)
+    atribuidos = {tutor.id for tutor in oficina.tutores}
+    tutor = next(item for item in ctx.db.scalars(select(Tutor).order_by(Tutor.id)) if item.id not in atribuidos)
+    tutor.carga_horaria_maxima_semanal = 10_000
+    ctx.db.commit()
+    return f"/oficinas/{oficina.id}/tutores/{tutor.id}", {}
+
+
+def _presenca_chamada(ctx: Contexto) -> Presenca:
+    return ctx.db.scalars(
+        select(Presenca)
+        .join(Inscricao, Inscricao.id == Presenca.inscricao_id)
+        .where(Inscricao.oficina_id == ctx.dataset.oficina_chamada)
+        # Presença ids are random; the seeded (inscrição, date) pair makes the pick repeatable.
+        .order_by(Presenca.inscricao_id, Presenca.data_aula)
+    ).first()
+
+
+def _criar_oficina(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    payload = {
+        "titulo": "Oficina nova",
+        "carga_horaria": 8,
+        "capacidade_maxima": 20,
+        "data_inicio": "2030-03-01",
+        "data_fim": "2030-03-29",
+        "local": "Campus",
+        "professor_id": str(ctx.primeiro(Professor).id),
+        "tema_ids": [str(ctx.primeiro(Tema).id)],
+    }
+    return "/oficinas", {"json": payload}
+
+
+def _trocar_professor(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    oficina = ctx.oficina(OficinaStatus.PLANEJADA)
+    professor = next(item for item in ctx.db.scalars(select(Professor)) if item.id != oficina.professor_id)
+    return f"/oficinas/{oficina.id}/professor/{professor.id}", {}
+
+
+def _remover_tutor(ctx: Contexto) -> tuple[str, dict[str, Any]]:
+    oficina = ctx.oficina(OficinaStatus.PLANEJADA)
+    return f"/oficinas/{oficina.id}/tutores/{oficina.tutores[0].id}", {}
+
+
+RESPONSAVEL = {"responsavel_nome": "Mãe", "responsavel_telefone": "43999990000"}
+
+
+def _usuario(email: str, **campos: Any) -> dict[str, Any]:
+    return {"email": email, "password": "senha12345", "nome_completo": "Pessoa Nova", **campos}
+
+
+def _importar(role: str, **campos: Any) -> Cenario:
+    linhas = [_usuario(f"import{indice}-{role}@ellp.test", **campos) for indice in range(5)]
+    return lambda ctx: (f"/users/{role}/importar", {"json": linhas})
+
+
+CENARIOS: dict[tuple[str, str], Cenario] = {
+    ("POST", "/auth/login"): lambda ctx: ("/auth/login", {"json": {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}}),
+    ("POST", "/auth/refresh"): lambda ctx: ("/auth/refresh", {"json": {"refresh_token": ctx.tokens["refresh_token"]}}),
+    ("GET", "/auth/me"): lambda ctx: ("/auth/me", {}),
+    ("GET", "/certificados"): lambda ctx: ("/certificados", {}),
+    ("GET", "/certificados/{certificado_id}"): lambda ctx: (f"/certificados/{ctx.certificado().id}", {}),
+    ("GET", "/certificados/{certificado_id}/pdf"): _status_pdf,
+    ("GET", "/certificados/validar/{hash_certificado}"): lambda ctx: (
+        f"/certificados/validar/{ctx.dataset.hashes_certificados[0]}",
+        {},
+    ),
+    ("GET", "/certificados/validar/codigo/{codigo}"): lambda ctx: (
+        f"/certificados/validar/codigo/{ctx.certificado().codigo_verificacao}",
+        {},
+    ),
+    ("POST", "/certificados/{certificado_id}/regenerar"): lambda ctx: (
+        f"/certificados/{ctx.certificado().id}/regenerar",
+        {},
+    ),
+    ("POST", "/certificados/inscricoes/{inscricao_id}"): _emitir_inscricao,
+    ("POST", "/certificados/oficinas/{oficina_id}/emitir-lote"): _emitir_lote,
+    ("POST", "/certificados/oficinas/{oficina_id}/tutores/{tutor_id}"): _emitir_tutor,
+    ("GET", "/dashboard/metricas"): lambda ctx: ("/dashboard/metricas", {}),
+    ("GET", "/historicos/alunos/{aluno_id}"): lambda ctx: (f"/historicos/alunos/{ctx.dataset.alunos[0]}", {}),
+    ("GET", "/historicos/tutores/{tutor_id}"): lambda ctx: (f"/historicos/tutores/{ctx.primeiro(Tutor).id}", {}),
+    ("GET", "/historicos/professores/{professor_id}"): lambda ctx: (
+        f"/historicos/professores/{ctx.primeiro(Professor).id}",
+        {},
+    ),
+    ("GET", "/auditorias"): lambda ctx: ("/auditorias", {}),
+    ("PATCH", "/inscricoes/{inscricao_id}/status"): lambda ctx: (
+        f"/inscricoes/{ctx.inscricao(OficinaStatus.EM_ANDAMENTO).id}/status",
+        {"json": {"status": InscricaoStatus.ABANDONOU.value}},
+    ),
+    ("GET", "/oficinas"): lambda ctx: ("/oficinas", {}),
+    ("POST", "/oficinas"): _criar_oficina,
+    ("POST", "/oficinas/estatisticas/recalcular"): lambda ctx: ("/oficinas/estatisticas/recalcular", {}),
+    ("GET", "/oficinas/{oficina_id}"): lambda ctx: (f"/oficinas/{ctx.dataset.oficina_chamada}", {}),
+    ("PATCH", "/oficinas/{oficina_id}"): lambda ctx: (
+        f"/oficinas/{ctx.dataset.oficina_chamada}",
+        {"json": {"local": "Bloco B"}},
+    ),
+    ("DELETE", "/oficinas/{oficina_id}"): lambda ctx: (f"/oficinas/{ctx.oficina(OficinaStatus.PLANEJADA).id}", {}),
+    ("POST", "/oficinas/{oficina_id}/professor/{professor_id}"): _trocar_professor,
+    ("DELETE", "/oficinas/{oficina_id}/tutores/{tutor_id}"): _remover_tutor,
+    ("GET", "/oficinas/{oficina_id}/tutores"): lambda ctx: (f"/oficinas/{ctx.dataset.oficina_chamada}/tutores", {}),
+    ("POST", "/oficinas/{oficina_id}/tutores/{tutor_id}"): _atribuir_tutor,
+    ("GET", "/oficinas/{oficina_id}/inscricoes"): lambda ctx: (
+        f"/oficinas/{ctx.dataset.oficina_chamada}/inscricoes",
+        {},
+    ),
+    ("POST", "/oficinas/{oficina_id}/inscricoes"): _inscrever,
+    ("GET", "/presencas/oficinas/{oficina_id}"): lambda ctx: (
+        f"/presencas/oficinas/{ctx.dataset.oficina_chamada}",
+        {},
+    ),
+    ("GET", "/presencas/inscricoes/{inscricao_id}"): lambda ctx: (
+        f"/presencas/inscricoes/{ctx.inscricao(OficinaStatus.EM_ANDAMENTO).id}",
+        {},
+    ),
+    ("POST", "/presencas/oficinas/{oficina_id}"): _registrar_lote,
+    ("POST", "/presencas/reconciliar"): lambda ctx: ("/presencas/reconciliar", {}),
+    ("POST", "/presencas/recalcular"): lambda ctx: ("/presencas/recalcular", {}),
+    ("PATCH", "/presencas/{presenca_id}"): lambda ctx: (
+        f"/presencas/{_presenca_chamada(ctx).id}",
+        {"json": {"justificativa": "Atestado"}},
+    ),
+    ("DELETE", "/presencas/{presenca_id}"): lambda ctx: (f"/presencas/{_presenca_chamada(ctx).id}", {}),
+    ("GET", "/professores"): lambda ctx: ("/professores", {}),
+    ("GET", "/professores/{professor_id}"): lambda ctx: (f"/professores/{ctx.primeiro(Professor).id}", {}),
+    ("GET", "/relatorios/frequencia/{oficina_id}"): lambda ctx: (
+        f"/relatorios/frequencia/{ctx.dataset.oficinas_concluidas[0]}",
+        {},
+    ),
+    ("GET", "/relatorios/frequencia/{oficina_id}/export"): lambda ctx: (
+        f"/relatorios/frequencia/{ctx.dataset.oficinas_concluidas[0]}/export",
+        {},
+    ),
+    ("GET", "/relatorios/certificados"): lambda ctx: ("/relatorios/certificados", {}),
+    ("GET", "/temas"): lambda ctx: ("/temas", {}),
+    ("POST", "/temas"): lambda ctx: ("/temas", {"json": {"nome": "Tema novo"}}),
+    ("GET", "/temas/{tema_id}"): lambda ctx: (f"/temas/{ctx.primeiro(Tema).id}", {}),
+    ("PATCH", "/temas/{tema_id}"): lambda ctx: (f"/temas/{ctx.primeiro(Tema).id}", {"json": {"descricao": "Nova"}}),
+    ("DELETE", "/temas/{tema_id}"): lambda ctx: (f"/temas/{ctx.primeiro(Tema).id}", {}),
+    ("POST", "/users/admins"): lambda ctx: ("/users/admins", {"json": _usuario("novo-admin@ellp.test")}),
+    ("GET", "/users/admins"): lambda ctx: ("/users/admins", {}),
+    ("POST", "/users/alunos"): lambda ctx: (
+        "/users/alunos",
+        {"json": _usuario("novo-aluno@ellp.test", **RESPONSAVEL)},
+    ),
+    ("POST", "/users/alunos/importar"): _importar("alunos", **RESPONSAVEL),
+    ("POST", "/users/tutores"): lambda ctx: ("/users/tutores", {"json": _usuario("novo-tutor@ellp.test")}),
+    ("POST", "/users/tutores/importar"): _importar("tutores"),
+    ("POST", "/users/professores"): lambda ctx: (
+        "/users/professores",
+        {"json": _usuario("novo-professor@ellp.test", faculdade="UTFPR")},
+    ),
+    ("GET", "/users/alunos"): lambda ctx: ("/users/alunos", {}),
+    ("GET", "/users/tutores"): lambda ctx: ("/users/tutores", {}),
+    ("GET", "/users/professores"): lambda ctx: ("/users/professores", {}),
+}
+
+# Exact statement count of each scenario on the cold path, authentication included. Changing
+# one is a deliberate change to the route's queries; its budget may exceed it by MARGEM at most.
+ESPERADO: dict[tuple[str, str], int] = {
+    ("POST", "/auth/login"): 3,
+    ("POST", "/auth/refresh"): 1,
+    ("GET", "/auth/me"): 1,
+    ("GET", "/certificados"): 2,
+    ("GET", "/certificados/{certificado_id}"): 7,
+    ("GET", "/certificados/{certificado_id}/pdf"): 8,
+    ("GET", "/certificados/validar/{hash_certificado}"): 6,
+    ("GET", "/certificados/validar/codigo/{codigo}"): 6,
+    ("POST", "/certificados/{certificado_id}/regenerar"): 13,
+    ("POST", "/certificados/inscricoes/{inscricao_id}"): 9,
+    ("POST", "/certificados/oficinas/{oficina_id}/emitir-lote"): 10,
+    ("POST", "/certificados/oficinas/{oficina_id}/tutores/{tutor_id}"): 11,
+    ("GET", "/dashboard/metricas"): 2,
+    ("GET", "/historicos/alunos/{aluno_id}"): 5,
+    ("GET", "/historicos/tutores/{tutor_id}"): 3,
+    ("GET", "/historicos/professores/{professor_id}"): 3,
+    ("GET", "/auditorias"): 2,
+    ("PATCH", "/inscricoes/{inscricao_id}/status"): 11,
+    ("GET", "/oficinas"): 3,
+    ("POST", "/oficinas"): 9,
+    ("POST", "/oficinas/estatisticas/recalcular"): 3,
+    ("GET", "/oficinas/{oficina_id}"): 3,
+    ("PATCH", "/oficinas/{oficina_id}"): 7,
+    ("DELETE", "/oficinas/{oficina_id}"): 13,
+    ("POST", "/oficinas/{oficina_id}/professor/{professor_id}"): 8,
+    ("DELETE", "/oficinas/{oficina_id}/tutores/{tutor_id}"): 9,
+    ("GET", "/oficinas/{oficina_id}/tutores"): 7,
+    ("POST", "/oficinas/{oficina_id}/tutores/{tutor_id}"): 12,
+    ("GET", "/oficinas/{oficina_id}/inscricoes"): 6,
+    ("POST", "/oficinas/{oficina_id}/inscricoes"): 13,
+    ("GET", "/presencas/oficinas/{oficina_id}"): 7,
+    ("GET", "/presencas/inscricoes/{inscricao_id}"): 7,
+    ("POST", "/presencas/oficinas/{oficina_id}"): 14,
+    ("POST", "/presencas/reconciliar"): 2,
+    ("POST", "/presencas/recalcular"): 4,
+    ("PATCH", "/presencas/{presenca_id}"): 15,
+    ("DELETE", "/presencas/{presenca_id}"): 8,
+    ("GET", "/professores"): 4,
+    ("GET", "/professores/{professor_id}"): 5,
+    ("GET", "/relatorios/frequencia/{oficina_id}"): 6,
+    ("GET", "/relatorios/frequencia/{oficina_id}/export"): 3,
+    ("GET", "/relatorios/certificados"): 9,
+    ("GET", "/temas"): 2,
+    ("POST", "/temas"): 4,
+    ("GET", "/temas/{tema_id}"): 2,
+    ("PATCH", "/temas/{tema_id}"): 4,
+    ("DELETE", "/temas/{tema_id}"): 5,
+    ("POST", "/users/admins"): 6,
+    ("GET", "/users/admins"): 3,
+    ("POST", "/users/alunos"): 7,
+    ("POST", "/users/alunos/importar"): 5,
+    ("POST", "/users/tutores"): 7,
+    ("POST", "/users/tutores/importar"): 5,
+    ("POST", "/users/professores"): 7,
+    ("GET", "/users/alunos"): 3,
+    ("GET", "/users/tutores"): 3,
+    ("GET", "/users/professores"): 3,
+}
+MARGEM = 1
+
+
+# Budgeted routes exercised only by their own modules' tests: they need a rendered PDF in
+# storage or a tutor session, which the seeded dataset does not provide.
+SEM_CENARIO = {
+    ("GET", "/certificados/tutores/me"),
+    ("GET", "/certificados/{certificado_id}/download"),
+    ("GET", "/certificados/{certificado_id}/arquivo"),
+}
+
+
+def _route(method: str, path: str) -> APIRoute:
+    return next(route for route in ROUTER_ROUTES if route.path == path and method in route.methods)
+
+
+def _medir(client, db_session: Session, assert_max_queries, volumes: Volumes, method: str, path: str) -> int:
+    engine = db_session.get_bind()
+    db_session.close()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    popular(db_session, volumes)
+    tokens = client.post("/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    ctx = Contexto(db_session, carregar(db_session), tokens)
+    url, kwargs = CENARIOS[(method, path)](ctx)
+    db_session.expire_all()
+    # Measure the cold path: authentication lookup and response caches included.
+    invalidar_usuario()
+    dashboard_service.invalidar_cache()
+    certificado_service.invalidar_validacao()
+
+    budget = get_query_budget(_route(method, path).endpoint)
+    with assert_max_queries(budget) as statements:
+        response = client.request(method, url, headers=headers, **kwargs)
+    assert response.status_code < status.HTTP_400_BAD_REQUEST, response.text
+    return len(statements)
+
+
+def test_every_router_endpoint_declares_a_budget_and_a_scenario():
+    rotas = {(method, route.path): route for route in ROUTER_ROUTES for method in route.methods}
+
+    assert [rota for rota, route in rotas.items() if get_query_budget(route.endpoint) is None] == []
+    assert set(rotas) - set(CENARIOS) == SEM_CENARIO
+    assert set(ESPERADO) == set(CENARIOS)
+
+
+@pytest.mark.parametrize(("method", "path"), list(CENARIOS), ids=[f"{m} {p}" for m, p in CENARIOS])
+def test_route_stays_within_budget_as_data_grows(client, db_session, assert_max_queries, method, path):
+    pequeno = _medir(client, db_session, assert_max_queries, PEQUENO, method, path)
+    grande = _medir(client, db_session, assert_max_queries, GRANDE, method, path)
+
+    assert grande == pequeno, f"{method} {path}: {pequeno} statements on the small dataset, {grande} on the large one"
+    esperado = ESPERADO[(method, path)]
+    assert pequeno == esperado, f"{method} {path}: {pequeno} statements, expected {esperado}"
+    budget = get_query_budget(_route(method, path).endpoint)
+    assert budget - pequeno <= MARGEM, f"{method} {path}: budget {budget} is loose for {pequeno} statements"
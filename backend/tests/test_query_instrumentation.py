@@ -0,0 +1,81 @@
+"""Per-request SQL instrumentation tests."""
+import json
+import logging
+import re
+
+from fastapi import status
+
+from app.config import get_settings
+from app.database import track_queries
+
+_DB_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def _login(client, user, password):
+    return client.post("/auth/login", json={"email": user.email, "password": password})
+
+
+def test_server_timing_reports_statement_count(client, admin_user):
+    response = _login(client, admin_user, "admin12345")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert int(_DB_TIMING.search(response.headers["server-timing"]).group(2)) >= 1
+    assert "app;dur=" in response.headers["server-timing"]
+
+    health = client.get("/health")
+    assert _DB_TIMING.search(health.headers["server-timing"]).group(2) == "0"
+
+
+def test_track_queries_keeps_the_slowest_statements(db_session):
+    from sqlalchemy import text
+
+    with track_queries(keep=2) as stats:
+        for _ in range(5):
+            db_session.execute(text("SELECT 1"))
+
+    assert stats.count == 5
+    assert len(stats.slowest) == 2
+    assert stats.slowest[0][0] >= stats.slowest[1][0]
+
+
+def test_slow_requests_are_logged_with_their_statements(client, admin_user, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "db_slow_query_ms", 0)
+
+    with caplog.at_level(logging.WARNING):
+        _login(client, admin_user, "admin12345")
+
+    assert any(record.name == "app.database" and "Consulta lenta" in record.message for record in caplog.records)
+    resumo = [record for record in caplog.records if record.name == "app.middlewares.query_instrumentation"]
+    payload = json.loads(resumo[-1].message)
+    assert payload["path"] == "/auth/login"
+    assert payload["status"] == status.HTTP_200_OK
+    assert payload["query_count"] >= 1
+    assert "users" in payload["slowest"][0]["statement"]
+
+
+def test_request_summary_is_sampled(client, admin_user, monkeypatch, caplog):
+    def _resumos():
+        return [record for record in caplog.records if record.name == "app.middlewares.query_instrumentation"]
+
+    with caplog.at_level(logging.INFO):
+        _login(client, admin_user, "admin12345")
+        assert _resumos() == []
+
+        monkeypatch.setattr(get_settings(), "db_query_log_sample_rate", 1.0)
+        _login(client, admin_user, "admin12345")
+
+    assert json.loads(_resumos()[-1].message)["event"] == "request_queries"
+
+
+def test_requests_over_their_query_budget_are_logged(client, admin_user, monkeypatch, caplog):
+    from app.routers import auth
+
+    monkeypatch.setattr(auth.login, "__query_budget__", 0)
+    with caplog.at_level(logging.WARNING):
+        _login(client, admin_user, "admin12345")
+
+    resumo = [record for record in caplog.records if record.name == "app.middlewares.query_instrumentation"]
+    payload = json.loads(resumo[-1].message)
+    assert payload["path"] == "/auth/login"
+    assert payload["query_budget"] == 0
+    assert payload["query_count"] >= 1
@@ -1,8 +1,16 @@
 """API tests for RF-014/RF-015 (Relatórios)."""
-from datetime import timedelta
+import csv
+import io
+import zipfile
+from datetime import datetime, timedelta, timezone
 
 from fastapi import status
 
+from app.models import Aluno, Certificado, Inscricao, Pessoa, User
+from app.models.certificado import CertificadoTipo
+from app.models.inscricao import InscricaoStatus
+from app.services import relatorio_service
+
 def _auth_headers(client, email, password):
     token = client.post(
         "/auth/login",
@@ -127,6 +135,88 @@ def test_relatorio_certificados_resumo_e_pendentes(
     assert len(payload["pendentes"]) == 1
     assert payload["pendentes"][0]["id"] in {insc_pending, insc_emitido}
 
+    resumo = client.get("/relatorios/certificados", headers=admin_headers, params={"detalhes": "false"})
+    assert resumo.status_code == status.HTTP_200_OK
+    assert resumo.json()["resumo"] == payload["resumo"]
+    assert resumo.json()["certificados"] == []
+    assert resumo.json()["pendentes"] == []
+
+
+def test_resumo_certificados_usa_duas_consultas(db_session, capture_statements):
+    with capture_statements() as statements:
+        resumo = relatorio_service.resumo_certificados(db_session)
+
+    assert len(statements) == 2
+    assert resumo["total_emitidos"] == 0
+    assert resumo["pendentes_para_emitir"] == 0
+
+
+def _paginas(client, headers, params, lista, cursor_param, cursor_header):
+    ids, params = [], dict(params)
+    while True:
+        response = client.get("/relatorios/certificados", headers=headers, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(item["id"] for item in response.json()[lista])
+        cursor = response.headers.get(cursor_header)
+        if not cursor:
+            return ids
+        params[cursor_param] = cursor
+
+
+def test_relatorio_certificados_completo_por_padrao_e_paginado_por_cursor(
+    client,
+    admin_user,
+    oficina,
+    db_session,
+):
+    base = datetime(2025, 12, 1, tzinfo=timezone.utc)
+    certificados = [
+        Certificado(
+            oficina_id=oficina.id,
+            tipo=CertificadoTipo.CONCLUSAO_ALUNO,
+            hash_validacao=f"hash-{indice}",
+            codigo_verificacao=f"COD{indice:07d}",
+            created_at=base + timedelta(minutes=indice),
+        )
+        for indice in range(5)
+    ]
+    pendentes = [
+        Inscricao(
+            aluno=Aluno(
+                pessoa=Pessoa(
+                    user=User(email=f"pendente{indice}@ellp.test", senha_hash="x", role="aluno", ativo=True),
+                    nome_completo=f"Pendente {indice}",
+                ),
+                responsavel_nome="Responsável",
+                responsavel_telefone="43900000000",
+            ),
+            oficina_id=oficina.id,
+            status=InscricaoStatus.CONCLUIDO,
+            apto_certificado=True,
+            updated_at=base + timedelta(minutes=indice),
+        )
+        for indice in range(3)
+    ]
+    db_session.add_all([*certificados, *pendentes])
+    db_session.commit()
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+
+    completo = client.get("/relatorios/certificados", headers=headers)
+    assert len(completo.json()["certificados"]) == 5
+    assert len(completo.json()["pendentes"]) == 3
+    assert "X-Next-Cursor" not in completo.headers
+    assert "X-Next-Cursor-Pendentes" not in completo.headers
+
+    assert _paginas(client, headers, {"limit": 2}, "certificados", "cursor", "X-Next-Cursor") == [
+        str(item.id) for item in reversed(certificados)
+    ]
+    assert _paginas(client, headers, {"limit": 2}, "pendentes", "cursor_pendentes", "X-Next-Cursor-Pendentes") == [
+        str(item.id) for item in reversed(pendentes)
+    ]
+
+    invalido = client.get("/relatorios/certificados", headers=headers, params={"limit": 2, "cursor": "x"})
+    assert invalido.status_code == status.HTTP_400_BAD_REQUEST
+
 
 def test_relatorio_certificados_restrito_para_admin(
     client,
@@ -134,4 +224,113 @@ def test_relatorio_certificados_restrito_para_admin(
 ):
     tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
     response = client.get("/relatorios/certificados", headers=tutor_headers)
-    assert response.status_code == status.HTTP_403_FORBIDDEN
\ No newline at end of file
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+def _preparar_frequencia(client, admin_user, tutor_user, oficina, aluno_entity, second_aluno_entity):
+    admin_headers = _auth_headers(client, admin_user.email, "admin12345")
+    insc1 = _criar_inscricao(client, admin_headers, oficina.id, aluno_entity.id)
+    insc2 = _criar_inscricao(client, admin_headers, oficina.id, second_aluno_entity.id)
+    tutor_headers = _auth_headers(client, tutor_user.email, "tutor12345")
+    _registrar_presencas(
+        client,
+        tutor_headers,
+        oficina.id,
+        [
+            {"inscricao_id": insc1, "presente": True},
+            {"inscricao_id": insc2, "presente": False},
+        ],
+        oficina.data_inicio,
+    )
+    return admin_headers, insc1, insc2
+
+
+def test_exporta_frequencia_em_csv(
+    client,
+    admin_user,
+    tutor_user,
+    oficina,
+    aluno_entity,
+    second_aluno_entity,
+):
+    headers, insc1, insc2 = _preparar_frequencia(
+        client, admin_user, tutor_user, oficina, aluno_entity, second_aluno_entity
+    )
+
+    response = client.get(f"/relatorios/frequencia/{oficina.id}/export", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    linhas = list(csv.reader(io.StringIO(response.text)))
+    assert linhas[0][0] == "inscricao_id"
+    assert {linha[0]: float(linha[4]) for linha in linhas[1:3]} == {insc1: 100.0, insc2: 0.0}
+    resumo = dict(linha for linha in linhas[4:])
+    assert resumo["total_inscricoes"] == "2"
+    assert resumo["media_presenca"] == "50.0"
+
+
+def test_exporta_frequencia_em_xlsx(
+    client,
+    admin_user,
+    tutor_user,
+    oficina,
+    aluno_entity,
+    second_aluno_entity,
+):
+    headers, _, _ = _preparar_frequencia(
+        client, admin_user, tutor_user, oficina, aluno_entity, second_aluno_entity
+    )
+
+    response = client.get(
+        f"/relatorios/frequencia/{oficina.id}/export",
+        headers=headers,
+        params={"format": "xlsx"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    pacote = zipfile.ZipFile(io.BytesIO(response.content))
+    assert pacote.testzip() is None
+    planilha = pacote.read("xl/worksheets/sheet1.xml").decode()
+    assert planilha.count("<row>") == 3
+    resumo = pacote.read("xl/worksheets/sheet2.xml").decode()
+    assert "total_aptos_certificado" in resumo
+
+
+def test_exportacao_neutraliza_formulas_em_texto_do_usuario(
+    client,
+    admin_user,
+    tutor_user,
+    oficina,
+    aluno_entity,
+    second_aluno_entity,
+    db_session,
+):
+    headers, insc1, _ = _preparar_frequencia(
+        client, admin_user, tutor_user, oficina, aluno_entity, second_aluno_entity
+    )
+    aluno_entity.pessoa.nome_completo = '=HYPERLINK("http://evil.test","x")'
+    second_aluno_entity.pessoa.nome_completo = "@SUM(1+1)"
+    db_session.commit()
+
+    response = client.get(f"/relatorios/frequencia/{oficina.id}/export", headers=headers)
+    linhas = {linha[0]: linha for linha in csv.reader(io.StringIO(response.text)) if linha}
+    assert linhas[insc1][1] == """'=HYPERLINK("http://evil.test","x")"""
+    assert {linha[1] for linha in linhas.values()} >= {"'@SUM(1+1)"}
+
+    response = client.get(
+        f"/relatorios/frequencia/{oficina.id}/export",
+        headers=headers,
+        params={"format": "xlsx"},
+    )
+    planilha = zipfile.ZipFile(io.BytesIO(response.content)).read("xl/worksheets/sheet1.xml").decode()
+    assert "<f>" not in planilha
+    assert '<c t="inlineStr"><is><t xml:space="preserve">=HYPERLINK' in planilha
+
+
+def test_exporta_frequencia_oficina_inexistente(client, admin_user):
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    response = client.get(
+        "/relatorios/frequencia/00000000-0000-0000-0000-000000000000/export",
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
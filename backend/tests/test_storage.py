@@ -0,0 +1,72 @@
+"""Tests for the pluggable certificate storage backends."""
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import create_app
+from app.utils import storage
+from app.utils.storage import LocalStorageBackend, SupabaseStorageBackend, get_storage_backend
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "storage_backend", "local")
+    monkeypatch.setattr(get_settings(), "storage_local_root", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "storage_local_base_url", "http://testserver/storage/")
+    get_storage_backend.cache_clear()
+    yield tmp_path
+    get_storage_backend.cache_clear()
+
+
+def test_local_backend_grava_e_serve_pdf(local_storage):
+    url = storage.upload_pdf_certificado(b"%PDF-1.4 teste", "aluno-1.pdf", folder="certificados/tutores")
+
+    assert url == "http://testserver/storage/certificados/tutores/aluno-1.pdf"
+    assert (local_storage / "certificados" / "tutores" / "aluno-1.pdf").read_bytes() == b"%PDF-1.4 teste"
+
+    client = TestClient(create_app())
+    response = client.get("/storage/certificados/tutores/aluno-1.pdf")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == b"%PDF-1.4 teste"
+    assert response.headers["content-type"] == "application/pdf"
+
+    assert storage.delete_pdf_certificado("aluno-1.pdf", folder="certificados/tutores") is True
+    assert client.get("/storage/certificados/tutores/aluno-1.pdf").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_local_backend_rejeita_caminho_fora_da_raiz(tmp_path):
+    backend = LocalStorageBackend(tmp_path, "http://testserver/storage")
+
+    with pytest.raises(ValueError):
+        backend.upload(b"x", "../fora.pdf", "application/pdf")
+    assert not (tmp_path.parent / "fora.pdf").exists()
+
+
+def test_supabase_backend_reutiliza_cliente(monkeypatch):
+    criados = []
+
+    class _Bucket:
+        def upload(self, path, file, file_options):
+            return None
+
+        def get_public_url(self, path):
+            return f"https://supabase.test/{path}"
+
+    class _Client:
+        class storage:
+            @staticmethod
+            def from_(bucket):
+                return _Bucket()
+
+    def _create_client(url, key):
+        criados.append((url, key))
+        return _Client()
+
+    monkeypatch.setattr(storage, "create_client", _create_client)
+    backend = SupabaseStorageBackend("https://supabase.test", "service-key", "ellp-files")
+
+    urls = [backend.upload(b"%PDF", f"certificados/{indice}.pdf", "application/pdf") for indice in range(3)]
+
+    assert urls[-1] == "https://supabase.test/certificados/2.pdf"
+    assert criados == [("https://supabase.test", "service-key")]
@@ -83,3 +83,74 @@ def test_tutor_cannot_access_admin_endpoints(client, tutor_user):
 
     listing = client.get("/users/admins", headers=headers)
     assert listing.status_code == status.HTTP_403_FORBIDDEN
+
+
+def _aluno_row(indice):
+    return {
+        "email": f"importado{indice}@ellp.test",
+        "password": "Aluno123!",
+        "nome_completo": f"Aluno Importado {indice}",
+        "responsavel_nome": "Responsável",
+        "responsavel_telefone": "43988887777",
+    }
+
+
+def test_import_alunos_reports_each_row(client, admin_user, tutor_user):
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    rows = [
+        _aluno_row(1),
+        {**_aluno_row(2), "password": "curta"},
+        _aluno_row(1),
+        {**_aluno_row(3), "email": tutor_user.email},
+        _aluno_row(4),
+    ]
+
+    response = client.post("/users/alunos/importar", headers=headers, json=rows)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["total"], data["criados"], data["com_erro"]) == (5, 2, 3)
+    assert [item["status"] for item in data["resultados"]] == ["criado", "erro", "erro", "erro", "criado"]
+    assert data["resultados"][1]["erros"][0].startswith("password:")
+    assert data["resultados"][2]["erros"] == ["Email repetido na linha 1"]
+    assert data["resultados"][3]["erros"] == ["Email já utilizado"]
+
+    login = client.post("/auth/login", json={"email": "importado4@ellp.test", "password": "Aluno123!"})
+    assert login.status_code == status.HTTP_200_OK
+    emails = [item["email"] for item in client.get("/users/alunos", headers=headers).json()]
+    assert {"importado1@ellp.test", "importado4@ellp.test"} <= set(emails)
+
+
+def test_import_tutores_from_csv_dry_run_writes_nothing(client, admin_user):
+    headers = _auth_headers(client, admin_user.email, "admin12345")
+    csv_body = (
+        "email;password;nome_completo;faculdade;semestre\n"
+        "tutor.a@ellp.test;Tutor123!;Tutor A;UTFPR;3\n"
+        "tutor.b@ellp.test;Tutor123!;Tutor B;;zero\n"
+    )
+
+    response = client.post(
+        "/users/tutores/importar?dry_run=true",
+        headers={**headers, "Content-Type": "text/csv"},
+        content=csv_body.encode(),
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["dry_run"] is True
+    assert [(item["linha"], item["status"]) for item in data["resultados"]] == [(2, "valido"), (3, "erro")]
+    assert client.get("/users/tutores", headers=headers).json() == []
+
+
+def test_import_batch_query_count_is_constant(db_session, capture_statements):
+    from app.models import UserRole
+    from app.services import user_service
+
+    def _importar(inicio, quantidade):
+        linhas = [(indice, _aluno_row(indice)) for indice in range(inicio, inicio + quantidade)]
+        with capture_statements() as statements:
+            relatorio = user_service.importar_usuarios(db_session, UserRole.ALUNO, linhas)
+        assert relatorio.criados == quantidade
+        return len(statements)
+
+    assert _importar(0, 2) == _importar(100, 20)
@@ -195,7 +195,8 @@ CREATE TABLE oficinas (
     CONSTRAINT chk_capacidade CHECK (capacidade_maxima > 0)
 );
 
-CREATE INDEX idx_oficinas_status ON oficinas(status);
+-- status: filtro da listagem, na ordem do cursor (keyset)
+CREATE INDEX ix_oficinas_status_data_inicio ON oficinas(status, data_inicio, titulo, id);
 CREATE INDEX idx_oficinas_professor ON oficinas(professor_id);
 CREATE INDEX idx_oficinas_datas ON oficinas(data_inicio, data_fim);
 
@@ -247,8 +248,8 @@ CREATE TABLE inscricoes (
     UNIQUE (aluno_id, oficina_id)
 );
 
-CREATE INDEX idx_inscricoes_aluno ON inscricoes(aluno_id);
-CREATE INDEX idx_inscricoes_oficina ON inscricoes(oficina_id);
+CREATE INDEX ix_inscricoes_aluno_created ON inscricoes(aluno_id, created_at);
+CREATE INDEX ix_inscricoes_oficina_status ON inscricoes(oficina_id, status);
 CREATE INDEX idx_inscricoes_status ON inscricoes(status);
 CREATE INDEX idx_inscricoes_apto ON inscricoes(apto_certificado);
 
@@ -274,7 +275,7 @@ CREATE TABLE presencas (
     UNIQUE (inscricao_id, data_aula)
 );
 
-CREATE INDEX idx_presencas_inscricao ON presencas(inscricao_id);
+-- inscricao_id: coberto pelo índice da restrição UNIQUE (inscricao_id, data_aula)
 CREATE INDEX idx_presencas_data ON presencas(data_aula);
 
 -- ========== CERTIFICADOS ==========
@@ -297,6 +298,8 @@ CREATE TABLE certificados (
     -- Arquivo
     arquivo_pdf_url TEXT,
     arquivo_pdf_nome VARCHAR(255),
+    pdf_status VARCHAR(12) NOT NULL DEFAULT 'PRONTO',  -- PENDENTE/PRONTO/FALHOU (nome do membro do enum)
+    pdf_digest VARCHAR(64),  -- sha256 dos dados de renderização; nome do arquivo no storage ("<digest>.pdf")
     
     -- Datas
     data_emissao TIMESTAMP DEFAULT NOW(),
@@ -317,15 +320,31 @@ CREATE TABLE certificados (
     CONSTRAINT chk_certificado_tipo CHECK (
         (tipo = 'conclusao_aluno' AND inscricao_id IS NOT NULL AND tutor_id IS NULL) OR
         (tipo = 'participacao_tutor' AND tutor_id IS NOT NULL AND inscricao_id IS NULL)
-    )
+    ),
+    CONSTRAINT uq_certificados_tutor_oficina UNIQUE (tutor_id, oficina_id)
 );
 
-CREATE INDEX idx_certificados_hash ON certificados(hash_validacao);
-CREATE INDEX idx_certificados_codigo ON certificados(codigo_verificacao);
+-- hash_validacao: coberto pelo índice da restrição UNIQUE
+-- codigo_verificacao: coberto pelo índice da restrição UNIQUE (gravado normalizado em maiúsculas)
 CREATE INDEX idx_certificados_inscricao ON certificados(inscricao_id);
-CREATE INDEX idx_certificados_tutor ON certificados(tutor_id);
+-- tutor_id: coberto pelo índice da restrição uq_certificados_tutor_oficina
 CREATE INDEX idx_certificados_tipo ON certificados(tipo);
 
+-- Fila de geração assíncrona dos PDFs (certificado_pdf_service)
+CREATE TABLE certificado_pdf_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    certificado_id UUID NOT NULL UNIQUE REFERENCES certificados(id) ON DELETE CASCADE,
+    status VARCHAR(11) NOT NULL DEFAULT 'PENDENTE',  -- PENDENTE/PROCESSANDO/CONCLUIDO/FALHOU
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa_em TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    iniciado_em TIMESTAMPTZ,
+    ultimo_erro TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX ix_certificado_pdf_jobs_status ON certificado_pdf_jobs(status);
+
 -- ========== AUDITORIA ==========
 
 CREATE TABLE auditoria (
@@ -356,6 +375,7 @@ CREATE INDEX idx_auditoria_user ON auditoria(user_id);
 CREATE INDEX idx_auditoria_entidade ON auditoria(entidade, entidade_id);
 CREATE INDEX idx_auditoria_created ON auditoria(created_at DESC);
 CREATE INDEX idx_auditoria_acao ON auditoria(acao);
+CREATE INDEX ix_auditoria_entidade_acao_created ON auditoria(entidade, acao, created_at);
 
 -- ========== VIEWS ==========
 
@@ -443,41 +463,8 @@ SELECT
 
 -- ========== FUNÇÕES E TRIGGERS ==========
 
--- Função: Atualizar percentual de presença automaticamente
-CREATE OR REPLACE FUNCTION atualizar_percentual_presenca()
-RETURNS TRIGGER AS $$
-BEGIN
-    UPDATE inscricoes
-    SET 
-        percentual_presenca = (
-            SELECT 
-                CASE 
-                    WHEN COUNT(*) = 0 THEN 0
-                    ELSE (COUNT(*) FILTER (WHERE presente = true) * 100.0 / COUNT(*))
-                END
-            FROM presencas
-            WHERE inscricao_id = NEW.inscricao_id
-        ),
-        total_presencas = (
-            SELECT COUNT(*) FILTER (WHERE presente = true)
-            FROM presencas
-            WHERE inscricao_id = NEW.inscricao_id
-        ),
-        total_faltas = (
-            SELECT COUNT(*) FILTER (WHERE presente = false)
-            FROM presencas
-            WHERE inscricao_id = NEW.inscricao_id
-        )
-    WHERE id = NEW.inscricao_id;
-    
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER trigger_atualizar_presenca
-AFTER INSERT OR UPDATE ON presencas
-FOR EACH ROW
-EXECUTE FUNCTION atualizar_percentual_presenca();
+-- total_presencas / total_faltas / percentual_presenca em inscrições são mantidos pela API
+-- (presenca_service); ver supabase/migrations.
 
 -- Função: Verificar aptidão para certificado
 CREATE OR REPLACE FUNCTION verificar_apto_certificado()
@@ -500,52 +487,8 @@ FOR EACH ROW
 WHEN (NEW.status IS DISTINCT FROM OLD.status OR NEW.percentual_presenca IS DISTINCT FROM OLD.percentual_presenca)
 EXECUTE FUNCTION verificar_apto_certificado();
 
--- Função: Atualizar contador de inscritos na oficina
-CREATE OR REPLACE FUNCTION atualizar_total_inscritos()
-RETURNS TRIGGER AS $$
-BEGIN
-    IF TG_OP = 'INSERT' THEN
-        UPDATE oficinas
-        SET total_inscritos = total_inscritos + 1
-        WHERE id = NEW.oficina_id;
-    ELSIF TG_OP = 'DELETE' THEN
-        UPDATE oficinas
-        SET total_inscritos = total_inscritos - 1
-        WHERE id = OLD.oficina_id;
-    END IF;
-    
-    RETURN COALESCE(NEW, OLD);
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER trigger_atualizar_total_inscritos
-AFTER INSERT OR DELETE ON inscricoes
-FOR EACH ROW
-EXECUTE FUNCTION atualizar_total_inscritos();
-
--- Função: Atualizar contador de concluintes na oficina
-CREATE OR REPLACE FUNCTION atualizar_total_concluintes()
-RETURNS TRIGGER AS $$
-BEGIN
-    IF NEW.status = 'concluido' AND (OLD.status IS NULL OR OLD.status != 'concluido') THEN
-        UPDATE oficinas
-        SET total_concluintes = total_concluintes + 1
-        WHERE id = NEW.oficina_id;
-    ELSIF OLD.status = 'concluido' AND NEW.status != 'concluido' THEN
-        UPDATE oficinas
-        SET total_concluintes = total_concluintes - 1
-        WHERE id = NEW.oficina_id;
-    END IF;
-    
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER trigger_atualizar_total_concluintes
-AFTER UPDATE ON inscricoes
-FOR EACH ROW
-WHEN (NEW.status IS DISTINCT FROM OLD.status)
-EXECUTE FUNCTION atualizar_total_concluintes();
+-- total_inscritos / total_concluintes em oficinas são mantidos pela API
+-- (oficina_service.ajustar_totais); ver supabase/migrations.
 
 -- Função: Atualizar carga horária do tutor
 CREATE OR REPLACE FUNCTION atualizar_carga_horaria_tutor()
@@ -0,0 +1,23 @@
+-- total_inscritos / total_concluintes passam a ser mantidos pela API
+-- (oficina_service.ajustar_totais). Os triggers antigos contavam inscrições
+-- canceladas e duplicariam os incrementos feitos pela aplicação.
+
+DROP TRIGGER IF EXISTS trigger_atualizar_total_inscritos ON inscricoes;
+DROP TRIGGER IF EXISTS trigger_atualizar_total_concluintes ON inscricoes;
+DROP FUNCTION IF EXISTS atualizar_total_inscritos();
+DROP FUNCTION IF EXISTS atualizar_total_concluintes();
+
+-- Backfill com a mesma regra usada pela API: inscrito, em_andamento e concluido ocupam vaga.
+-- lower() cobre tanto os valores do enum do schema quanto os nomes gravados pelo ORM.
+UPDATE oficinas o
+SET
+    total_inscritos = (
+        SELECT COUNT(*) FROM inscricoes i
+        WHERE i.oficina_id = o.id
+          AND lower(i.status::text) IN ('inscrito', 'em_andamento', 'concluido')
+    ),
+    total_concluintes = (
+        SELECT COUNT(*) FROM inscricoes i
+        WHERE i.oficina_id = o.id
+          AND lower(i.status::text) = 'concluido'
+    );
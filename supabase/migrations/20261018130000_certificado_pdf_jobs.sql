@@ -0,0 +1,28 @@
+-- Geração assíncrona de PDFs de certificados (certificado_pdf_service).
+-- Os enums são gravados pelo ORM com o nome do membro (native_enum=False),
+-- por isso os valores abaixo estão em maiúsculas.
+
+ALTER TABLE certificados
+    ADD COLUMN IF NOT EXISTS pdf_status VARCHAR(12) NOT NULL DEFAULT 'PRONTO';
+
+-- Certificados antigos sem arquivo ficam pendentes; o job abaixo os gera.
+UPDATE certificados SET pdf_status = 'PENDENTE' WHERE arquivo_pdf_url IS NULL;
+
+CREATE TABLE IF NOT EXISTS certificado_pdf_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    certificado_id UUID NOT NULL UNIQUE REFERENCES certificados(id) ON DELETE CASCADE,
+    status VARCHAR(11) NOT NULL DEFAULT 'PENDENTE',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa_em TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    iniciado_em TIMESTAMPTZ,
+    ultimo_erro TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_certificado_pdf_jobs_status
+    ON certificado_pdf_jobs (status);
+
+INSERT INTO certificado_pdf_jobs (certificado_id)
+SELECT id FROM certificados WHERE pdf_status = 'PENDENTE'
+ON CONFLICT (certificado_id) DO NOTHING;
@@ -0,0 +1,21 @@
+-- PDFs de certificados endereçados por conteúdo (certificado_pdf_service.calcular_digest).
+-- pdf_digest é o sha256 dos dados de renderização e também o nome do arquivo
+-- no storage ("<digest>.pdf"); regenerar com os mesmos dados não faz nada.
+
+ALTER TABLE certificados
+    ADD COLUMN IF NOT EXISTS pdf_digest VARCHAR(64);
+
+-- Certificados já gerados não têm digest: enfileira todos eles (inclusive os que
+-- nunca tiveram job) para que passem a ter arquivo endereçado por conteúdo; o
+-- arquivo atual continua acessível até lá. Jobs ainda pendentes ou em
+-- processamento não são tocados.
+INSERT INTO certificado_pdf_jobs (certificado_id)
+SELECT id FROM certificados WHERE pdf_digest IS NULL
+ON CONFLICT (certificado_id) DO UPDATE
+SET status = 'PENDENTE',
+    tentativas = 0,
+    proxima_tentativa_em = NOW(),
+    iniciado_em = NULL,
+    ultimo_erro = NULL,
+    updated_at = NOW()
+WHERE certificado_pdf_jobs.status IN ('CONCLUIDO', 'FALHOU');
@@ -0,0 +1,28 @@
+-- Validação pelo código curto impresso no PDF (GET /certificados/validar/codigo/{codigo}).
+-- A API normaliza o código (sem espaços/hífens, maiúsculas) ao gravar e ao buscar,
+-- então a restrição UNIQUE da coluna atende a busca sem índice funcional.
+
+UPDATE certificados
+SET codigo_verificacao = upper(replace(regexp_replace(codigo_verificacao, '\s', '', 'g'), '-', ''))
+WHERE codigo_verificacao <> upper(replace(regexp_replace(codigo_verificacao, '\s', '', 'g'), '-', ''));
+
+-- idx_certificados_codigo duplicava o índice criado pela restrição UNIQUE.
+DROP INDEX IF EXISTS idx_certificados_codigo;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_constraint
+        WHERE conrelid = 'certificados'::regclass
+          AND contype = 'u'
+          AND conkey = ARRAY[(
+              SELECT attnum FROM pg_attribute
+              WHERE attrelid = 'certificados'::regclass AND attname = 'codigo_verificacao'
+          )]
+    ) THEN
+        ALTER TABLE certificados
+            ADD CONSTRAINT certificados_codigo_verificacao_key UNIQUE (codigo_verificacao);
+    END IF;
+END
+$$;
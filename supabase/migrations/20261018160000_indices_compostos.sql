@@ -0,0 +1,68 @@
+-- Índices compostos alinhados às consultas da camada de serviço.
+--   oficinas(status, data_inicio, titulo, id)   listagem filtrada por status, na ordem do cursor (keyset)
+--   inscricoes(oficina_id, status)              emissão em lote e relatórios por oficina
+--   inscricoes(aluno_id, created_at)            histórico do aluno
+--   auditoria(entidade, acao, created_at)       consulta de eventos por entidade/ação
+-- presencas(inscricao_id, data_aula), certificados(hash_validacao) e certificados(tutor_id, oficina_id)
+-- são atendidos pelos índices das restrições UNIQUE; os índices de coluna única que são prefixo
+-- (ou cópia) de um desses deixam de ser necessários.
+
+CREATE INDEX IF NOT EXISTS ix_oficinas_status_data_inicio ON oficinas(status, data_inicio, titulo, id);
+CREATE INDEX IF NOT EXISTS ix_inscricoes_oficina_status ON inscricoes(oficina_id, status);
+CREATE INDEX IF NOT EXISTS ix_inscricoes_aluno_created ON inscricoes(aluno_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_auditoria_entidade_acao_created ON auditoria(entidade, acao, created_at);
+
+-- O upsert de presenças (ON CONFLICT (inscricao_id, data_aula)) depende desta restrição.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_constraint
+        WHERE conrelid = 'presencas'::regclass
+          AND contype = 'u'
+          AND conkey = ARRAY(
+              SELECT attnum FROM pg_attribute
+              WHERE attrelid = 'presencas'::regclass AND attname IN ('inscricao_id', 'data_aula')
+              ORDER BY array_position(ARRAY['inscricao_id', 'data_aula']::name[], attname)
+          )
+    ) THEN
+        ALTER TABLE presencas
+            ADD CONSTRAINT uq_presenca_inscricao_data UNIQUE (inscricao_id, data_aula);
+    END IF;
+END
+$$;
+
+-- A API já trata (tutor_id, oficina_id) como único (uq_certificados_tutor_oficina no modelo).
+-- Bases com duplicatas antigas ficam com um índice comum até a limpeza dos dados.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_constraint
+        WHERE conrelid = 'certificados'::regclass
+          AND conname = 'uq_certificados_tutor_oficina'
+    ) THEN
+        IF EXISTS (
+            SELECT 1
+            FROM certificados
+            WHERE tutor_id IS NOT NULL
+            GROUP BY tutor_id, oficina_id
+            HAVING count(*) > 1
+        ) THEN
+            RAISE NOTICE 'certificados com (tutor_id, oficina_id) duplicados; criando índice não único';
+            CREATE INDEX IF NOT EXISTS ix_certificados_tutor_oficina ON certificados(tutor_id, oficina_id);
+        ELSE
+            ALTER TABLE certificados
+                ADD CONSTRAINT uq_certificados_tutor_oficina UNIQUE (tutor_id, oficina_id);
+        END IF;
+    END IF;
+END
+$$;
+
+-- Prefixos ou cópias dos índices acima.
+DROP INDEX IF EXISTS idx_oficinas_status;
+DROP INDEX IF EXISTS idx_inscricoes_oficina;
+DROP INDEX IF EXISTS idx_inscricoes_aluno;
+DROP INDEX IF EXISTS idx_presencas_inscricao;
+DROP INDEX IF EXISTS idx_certificados_hash;
+DROP INDEX IF EXISTS idx_certificados_tutor;
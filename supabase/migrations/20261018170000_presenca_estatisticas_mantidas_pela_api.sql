@@ -0,0 +1,33 @@
+-- total_presencas / total_faltas / percentual_presenca das inscrições passam a ser
+-- mantidos pela API (presenca_service, attendance_stats_mode). O trigger antigo
+-- recontava a inscrição a cada presença gravada e a API somava o incremento por
+-- cima, contando cada chamada duas vezes.
+
+DROP TRIGGER IF EXISTS trigger_atualizar_presenca ON presencas;
+DROP FUNCTION IF EXISTS atualizar_percentual_presenca();
+
+-- Backfill com a mesma regra usada pela API (presenca_service._stats_values), desfazendo
+-- as contagens em dobro gravadas enquanto o trigger e a API coexistiram.
+UPDATE inscricoes i
+SET
+    total_presencas = s.presentes,
+    total_faltas = s.registros - s.presentes,
+    total_aulas_previstas = GREATEST(s.registros, COALESCE(i.total_aulas_previstas, 0)),
+    percentual_presenca = CASE
+        WHEN s.registros = 0 THEN 0
+        ELSE ROUND(s.presentes * 100.0 / s.registros, 2)
+    END
+FROM (
+    SELECT
+        i2.id,
+        COUNT(p.id) AS registros,
+        COUNT(p.id) FILTER (WHERE p.presente) AS presentes
+    FROM inscricoes i2
+    LEFT JOIN presencas p ON p.inscricao_id = i2.id
+    GROUP BY i2.id
+) AS s
+WHERE s.id = i.id
+  AND (
+      i.total_presencas IS DISTINCT FROM s.presentes
+      OR i.total_faltas IS DISTINCT FROM s.registros - s.presentes
+  );